@@ -3,13 +3,78 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str
-    # Redis support planned for WS pub/sub at scale (>10k concurrent connections)
+    # WebSocket calls hold no connection while idle, so the pool sizes to
+    # write/read throughput rather than to the number of open calls.
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
     environment: str = "development"
     log_level: str = "INFO"
     openrouter_api_key: str = ""
     llm_primary_model: str = ""
     llm_fallback_model: str = ""
+    # One keep-alive pool is shared by every LLM call in the process.
+    llm_max_connections: int = 32
+    llm_max_keepalive_connections: int = 16
+    llm_keepalive_expiry_seconds: float = 30.0
+    llm_timeout_seconds: float = 30.0
+    llm_connect_timeout_seconds: float = 5.0
+    # Admission: global in-flight calls, each tenant's share while others wait,
+    # and per-priority caps so summaries always leave room for live guidance.
+    llm_max_in_flight: int = 16
+    llm_tenant_max_in_flight: int = 8
+    llm_priority_max_in_flight: dict[str, int] = {"summary": 12}
+    # Guidance starts once a session is quiet for the debounce, or once the
+    # oldest segment it has not covered is max_staleness old.
+    llm_guidance_debounce_seconds: float = 1.5
+    llm_guidance_max_staleness_seconds: float = 5.0
+    # Stream guidance, broadcasting the suggested reply as it is generated.
+    llm_guidance_streaming: bool = True
+    # Validated responses cached per (model, schema, messages); a TTL of 0 disables
+    # the cache. The shared tier uses redis_url and is off unless enabled here.
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl_seconds: float = 300.0
+    llm_cache_shared: bool = False
+    # A primary call still unanswered after the primary model's p95 latency (time
+    # to first token when streaming) is raced against llm_fallback_model. Until
+    # min_samples calls are recorded the default delay is used.
+    llm_hedge_enabled: bool = True
+    llm_hedge_quantile: float = 0.95
+    llm_hedge_min_samples: int = 20
+    llm_hedge_default_delay_seconds: float = 4.0
+    llm_hedge_min_delay_seconds: float = 0.25
     pii_redaction_mode: str = "basic"
+    # Entity types redacted unless pii_redaction_mode is "off"; see PII_ENTITIES.
+    pii_entity_types: list[str] = ["email", "phone", "card", "ssn", "address"]
+    # Raw text per speaker re-scanned with the next segment, so an entity split
+    # across segments (or read out digit by digit) is still found.
+    pii_carry_chars: int = 96
+    event_writer_batch_size: int = 500
+    event_writer_flush_interval_ms: float = 5.0
+    rule_pack_revalidate_seconds: float = 30.0
+    rule_alert_cooldown_seconds: float = 30.0
+    replay_buffer_max_events: int = 500
+    replay_buffer_max_bytes: int = 256_000
+    session_state_linger_seconds: float = 60.0
+    resync_gap_threshold: int = 200
+    # Non-final segments (is_final=false) are broadcast as ephemeral
+    # server.transcript_interim frames instead of being persisted.
+    transcript_interim_mode: bool = True
+    # Set to use Redis pub/sub between API workers; empty means single-process fanout.
+    redis_url: str = ""
+    ws_send_queue_max: int = 256
+    # Largest client.batch accepted; bigger batches are rejected unprocessed.
+    ws_batch_max_events: int = 200
+    ws_heartbeat_interval_seconds: float = 30.0
+    ws_heartbeat_tick_seconds: float = 1.0
+    # Connections silent for this long (no frames, no pongs) are closed by the reaper.
+    ws_idle_timeout_seconds: float = 90.0
+    # Overflow action per frame type (drop | coalesce | disconnect); others disconnect.
+    ws_overflow_policy: dict[str, str] = {
+        "system.ping": "drop",
+        "server.transcript_interim": "drop",
+        "server.guidance_update": "coalesce",
+        "server.guidance_delta": "coalesce",
+    }
     twilio_account_sid: str = ""
     twilio_auth_token: str = ""
     twilio_api_key_sid: str = ""
@@ -8,6 +8,10 @@ from app.config import settings
 from app.logging_config import setup_logging
 from app.middleware.correlation import CorrelationIdMiddleware
 from app.routers import health, sessions, twilio, ws
+from app.services.broker import broker
+from app.services.event_writer import event_writer
+from app.services.llm_client import close_llm_client
+from app.services.websocket_service import deliver_remote_frame, heartbeats, stop_writers
 
 logger = structlog.get_logger()
 
@@ -16,7 +20,14 @@ logger = structlog.get_logger()
 async def lifespan(app: FastAPI):
     setup_logging(settings.log_level)
     logger.info("csr_assist_starting", environment=settings.environment)
+    event_writer.start()
+    await broker.start(deliver_remote_frame)
+    heartbeats.start()
     yield
+    await heartbeats.stop()
+    await broker.stop()
+    await stop_writers()
+    await close_llm_client()
     logger.info("csr_assist_shutting_down")
 
 
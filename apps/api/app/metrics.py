@@ -0,0 +1,80 @@
+"""
+Lightweight in-process metrics: counters, gauges and latency histograms.
+"""
+
+import math
+
+HISTOGRAM_WINDOW = 1024
+
+
+class Histogram:
+    """Running count/sum/max plus a sliding window of samples for quantiles."""
+
+    __slots__ = ("count", "total", "max", "_samples", "_index")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples: list[float] = []
+        self._index = 0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if len(self._samples) < HISTOGRAM_WINDOW:
+            self._samples.append(value)
+        else:
+            self._samples[self._index] = value
+            self._index = (self._index + 1) % HISTOGRAM_WINDOW
+
+    def quantile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, math.ceil(q * len(ordered)) - 1)
+        return ordered[rank]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max if self.count else None,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.counters: dict[str, float] = {}
+        self.gauges: dict[str, float] = {}
+        self.histograms: dict[str, Histogram] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def observe(self, name: str, value: float) -> None:
+        self.histogram(name).observe(value)
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "histograms": {name: h.summary() for name, h in self.histograms.items()},
+        }
+
+
+metrics = MetricsRegistry()
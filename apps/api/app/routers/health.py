@@ -5,6 +5,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_db
+from app.metrics import metrics
 
 router = APIRouter()
 
@@ -16,3 +17,8 @@ async def health(db: Annotated[AsyncSession, Depends(get_db)]):
         return {"status": "ok", "db": "connected"}
     except Exception:
         return {"status": "degraded", "db": "disconnected"}
+
+
+@router.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
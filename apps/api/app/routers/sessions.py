@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db import get_db
 from app.models.call_session import CallSession
 from app.schemas.sessions import CallOutput, SessionCreate, SessionResponse
-from app.services.llm_client import LLMClient
+from app.services.llm_client import get_llm_client
 from app.services.llm_service import LLMService
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
@@ -48,7 +48,7 @@ async def end_session(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    llm_service = LLMService(db, LLMClient())
+    llm_service = LLMService(db, get_llm_client())
     try:
         return await llm_service.generate_summary(session_id)
     except ValueError as exc:
@@ -2,6 +2,8 @@
 WebSocket router - thin endpoint that delegates all logic to WebSocketService.
 """
 
+import asyncio
+import time
 import uuid
 
 import structlog
@@ -9,8 +11,10 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from pydantic import ValidationError
 
 from app.db import async_session
-from app.schemas.events import EventEnvelope
-from app.services.websocket_service import WebSocketService, _fanout
+from app.metrics import metrics
+from app.schemas.events import CLIENT_TRANSCRIPT_TYPES, EventBatch, inbound_frame_adapter
+from app.services.rule_service import rule_scope
+from app.services.websocket_service import WebSocketService, is_interim_segment
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -18,69 +22,88 @@ logger = structlog.get_logger()
 
 @router.websocket("/ws/session/{session_id}")
 async def session_ws(websocket: WebSocket, session_id: uuid.UUID):
-    async with async_session() as db:
-        service = WebSocketService(db)
-
-        session = await service.accept_and_register(websocket, session_id)
-        if session is None:
-            return
-        tenant_id = session.tenant_id
-
-        try:
-            while True:
-                structlog.contextvars.bind_contextvars(session_id=str(session_id))
-                raw_message = await websocket.receive_text()
-
-                try:
-                    envelope = EventEnvelope.model_validate_json(raw_message)
-                except ValidationError as exc:
-                    logger.warning("ws_invalid_event_envelope", error=str(exc))
-                    continue
-
-                if envelope.type == "system.pong":
-                    logger.debug("ws_pong_received", session_id=str(session_id))
-                    continue
-
-                if envelope.type == "client.resume":
-                    await service.handle_resume(websocket, session_id, envelope.payload)
-                    continue
-
-                if envelope.type not in {
-                    "client.transcript_segment",
-                    "client.transcript_final",
-                }:
-                    logger.warning("ws_unsupported_event_type", event_type=envelope.type)
-                    continue
-
-                assigned_seq = await service.persist_event(session_id, envelope)
-
-                outbound_payload = envelope.payload
-                if envelope.type in {"client.transcript_segment", "client.transcript_final"}:
-                    outbound_payload = service.pii_service.redact_dict(envelope.payload)
-
-                outbound = envelope.model_copy(
-                    update={
-                        "session_id": session_id,
-                        "server_seq": assigned_seq,
-                        "payload": outbound_payload,
-                    }
-                )
-                await _fanout(session_id, outbound.model_dump(mode="json"))
-
-                if envelope.type == "client.transcript_segment":
-                    text_content = str(envelope.payload.get("text", ""))
-                    await service.evaluate_and_broadcast_rules(
-                        session_id, tenant_id, text_content
+    # No DB session is held for the life of the call: the service opens one per
+    # unit of work and events go through the shared batched writer.
+    service = WebSocketService(async_session)
+
+    session = await service.accept_and_register(websocket, session_id)
+    if session is None:
+        return
+    scope = rule_scope(session)
+
+    try:
+        while True:
+            structlog.contextvars.bind_contextvars(session_id=str(session_id))
+            raw_message = await websocket.receive_text()
+            received_at = time.perf_counter()
+            service.touch()
+
+            try:
+                envelope = inbound_frame_adapter.validate_json(raw_message)
+            except ValidationError as exc:
+                logger.warning("ws_invalid_event_envelope", error=str(exc))
+                if any(error["type"] == "batch_too_large" for error in exc.errors()):
+                    if not service.send_batch_rejection(websocket, session_id, raw_message):
+                        return
+                continue
+
+            if isinstance(envelope, EventBatch):
+                persist_started = time.perf_counter()
+                assigned_seqs = list(
+                    await asyncio.gather(
+                        *service.ingest_batch(session_id, scope, envelope)
                     )
-                service.schedule_llm_guidance(session_id)
-
-                ok = await service.send_ack(
-                    websocket, envelope, session_id, assigned_seq
+                )
+                metrics.observe("ws.ingest.batch_size", len(assigned_seqs))
+                metrics.observe(
+                    "ws.ingest.persist_ms", (time.perf_counter() - persist_started) * 1000
+                )
+                ok = await service.send_batch_ack(
+                    websocket, envelope, session_id, assigned_seqs
+                )
+                metrics.observe(
+                    "ws.ingest.ack_latency_ms", (time.perf_counter() - received_at) * 1000
                 )
                 if not ok:
                     return
+                continue
+
+            if envelope.type == "system.pong":
+                logger.debug("ws_pong_received", session_id=str(session_id))
+                continue
+
+            if envelope.type == "client.resume":
+                await service.handle_resume(websocket, session_id, envelope.payload)
+                continue
 
-        except WebSocketDisconnect:
-            logger.info("ws_disconnected", session_id=str(session_id))
-        finally:
-            await service.cleanup_connection(websocket, session_id)
+            if envelope.type not in CLIENT_TRANSCRIPT_TYPES:
+                logger.warning("ws_unsupported_event_type", event_type=envelope.type)
+                continue
+
+            if is_interim_segment(envelope):
+                service.publish_interim(session_id, envelope)
+                if not await service.send_ack(websocket, envelope, session_id, None):
+                    return
+                continue
+
+            # Ack as soon as the event is durable; broadcast, rules and
+            # guidance follow on the session's ordered worker.
+            persist_started = time.perf_counter()
+            assigned_seq = await service.ingest_event(session_id, scope, envelope)
+            metrics.observe(
+                "ws.ingest.persist_ms", (time.perf_counter() - persist_started) * 1000
+            )
+
+            ok = await service.send_ack(
+                websocket, envelope, session_id, assigned_seq
+            )
+            metrics.observe(
+                "ws.ingest.ack_latency_ms", (time.perf_counter() - received_at) * 1000
+            )
+            if not ok:
+                return
+
+    except WebSocketDisconnect:
+        logger.info("ws_disconnected", session_id=str(session_id))
+    finally:
+        await service.cleanup_connection(websocket, session_id)
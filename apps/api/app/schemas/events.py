@@ -1,15 +1,21 @@
 import uuid
 from datetime import datetime
-from typing import Literal
+from typing import Annotated, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+from pydantic_core import PydanticCustomError
+
+from app.config import settings
 
 EventType = Literal[
     "client.transcript_segment",
     "client.transcript_final",
     "client.resume",
     "server.ack",
+    "server.transcript_interim",
+    "server.redaction_correction",
     "server.rule_alert",
+    "server.guidance_delta",
     "server.guidance_update",
     "server.required_question_status",
     "system.ping",
@@ -27,3 +33,51 @@ class EventEnvelope(BaseModel):
     payload: dict = Field(default_factory=dict)
     client_seq: int | None = None
     server_seq: int | None = None
+
+
+CLIENT_TRANSCRIPT_TYPES = frozenset({"client.transcript_segment", "client.transcript_final"})
+
+
+class EventBatch(BaseModel):
+    """Several client transcript events in one frame, acknowledged with one ack."""
+
+    event_id: uuid.UUID = Field(default_factory=uuid.uuid4)
+    session_id: uuid.UUID
+    type: Literal["client.batch"]
+    ts_created: datetime
+    schema_version: str = "1.0"
+    events: list[EventEnvelope] = Field(min_length=1)
+    client_seq: int | None = None
+
+    @field_validator("events", mode="before")
+    @classmethod
+    def _at_most_max_events(cls, events: object) -> object:
+        # Checked before any event is validated, so an oversized batch is cheap to refuse.
+        if isinstance(events, list) and len(events) > settings.ws_batch_max_events:
+            raise PydanticCustomError(
+                "batch_too_large",
+                "at most {max_events} events per batch",
+                {"max_events": settings.ws_batch_max_events},
+            )
+        return events
+
+    @field_validator("events")
+    @classmethod
+    def _transcript_events_only(cls, events: list[EventEnvelope]) -> list[EventEnvelope]:
+        for event in events:
+            if event.type not in CLIENT_TRANSCRIPT_TYPES:
+                raise ValueError(f"unsupported event type in batch: {event.type}")
+        return events
+
+
+class BatchHeader(BaseModel):
+    """The fields of a rejected batch that its negative ack echoes back."""
+
+    event_id: uuid.UUID = Field(default_factory=uuid.uuid4)
+    client_seq: int | None = None
+
+
+# One validation pass for anything a client may send, single event or batch.
+inbound_frame_adapter: TypeAdapter[EventEnvelope | EventBatch] = TypeAdapter(
+    Annotated[EventEnvelope | EventBatch, Field(discriminator="type")]
+)
@@ -0,0 +1,198 @@
+"""
+Pub/sub backplane so any API worker holding a subscriber receives a session's frames.
+
+Frames are published already encoded and carry the id of the publishing
+process. The publisher delivers to its own connections directly, so brokers
+only forward frames to *other* processes and drop their own echoes.
+"""
+
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+import structlog
+
+from app.config import settings
+from app.metrics import metrics
+
+logger = structlog.get_logger()
+
+# (session_id, event_type, server_seq, frame) for a frame published elsewhere.
+RemoteFrameHandler = Callable[[uuid.UUID, str, int | None, str], None]
+
+CHANNEL_PREFIX = "csr:session:"
+
+
+def encode_message(origin: str, event_type: str, server_seq: int | None, frame: str) -> str:
+    seq = "" if server_seq is None else str(server_seq)
+    return f"{origin}|{event_type}|{seq}|{frame}"
+
+
+def decode_message(message: str) -> tuple[str, str, int | None, str]:
+    origin, event_type, seq, frame = message.split("|", 3)
+    return origin, event_type, int(seq) if seq else None, frame
+
+
+class Broker(ABC):
+    """Interface shared by the in-process and Redis brokers."""
+
+    def __init__(self) -> None:
+        self.origin = uuid.uuid4().hex
+        self._handler: RemoteFrameHandler | None = None
+
+    async def start(self, handler: RemoteFrameHandler) -> None:
+        self._handler = handler
+
+    async def stop(self) -> None:
+        self._handler = None
+
+    @abstractmethod
+    async def subscribe(self, session_id: uuid.UUID) -> None: ...
+
+    @abstractmethod
+    async def unsubscribe(self, session_id: uuid.UUID) -> None: ...
+
+    @abstractmethod
+    def publish(
+        self, session_id: uuid.UUID, event_type: str, server_seq: int | None, frame: str
+    ) -> None:
+        """Hand a frame to other processes without waiting on the network."""
+
+    def _deliver(self, session_id: uuid.UUID, message: str) -> None:
+        origin, event_type, server_seq, frame = decode_message(message)
+        if origin == self.origin or self._handler is None:
+            return
+        metrics.increment("broker.received")
+        self._handler(session_id, event_type, server_seq, frame)
+
+
+class InProcessBroker(Broker):
+    """Single-process broker; brokers sharing ``peers`` behave like separate workers."""
+
+    def __init__(self, peers: list["InProcessBroker"] | None = None) -> None:
+        super().__init__()
+        self._sessions: set[uuid.UUID] = set()
+        self._peers = peers if peers is not None else []
+        self._peers.append(self)
+
+    async def subscribe(self, session_id: uuid.UUID) -> None:
+        self._sessions.add(session_id)
+
+    async def unsubscribe(self, session_id: uuid.UUID) -> None:
+        self._sessions.discard(session_id)
+
+    def publish(
+        self, session_id: uuid.UUID, event_type: str, server_seq: int | None, frame: str
+    ) -> None:
+        message = None
+        for peer in self._peers:
+            if peer is self or session_id not in peer._sessions:
+                continue
+            message = message or encode_message(self.origin, event_type, server_seq, frame)
+            peer._deliver(session_id, message)
+        if message is not None:
+            metrics.increment("broker.published")
+
+
+class RedisBroker(Broker):
+    """Redis pub/sub broker with one channel per session.
+
+    ``redis`` is imported lazily so it is only required when ``REDIS_URL`` is
+    set; tests pass a stand-in ``client``.
+    """
+
+    def __init__(self, url: str = "", client=None) -> None:
+        super().__init__()
+        self._url = url
+        self._client = client
+        self._pubsub = None
+        self._outbox: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._has_subscriptions = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self, handler: RemoteFrameHandler) -> None:
+        await super().start(handler)
+        if self._client is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self._url)
+        self._pubsub = self._client.pubsub()
+        self._tasks = [
+            asyncio.create_task(self._publish_loop()),
+            asyncio.create_task(self._listen_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+        await super().stop()
+
+    async def subscribe(self, session_id: uuid.UUID) -> None:
+        await self._pubsub.subscribe(f"{CHANNEL_PREFIX}{session_id}")
+        self._has_subscriptions.set()
+
+    async def unsubscribe(self, session_id: uuid.UUID) -> None:
+        await self._pubsub.unsubscribe(f"{CHANNEL_PREFIX}{session_id}")
+
+    def publish(
+        self, session_id: uuid.UUID, event_type: str, server_seq: int | None, frame: str
+    ) -> None:
+        # A single publisher task keeps this process's frames in order.
+        self._outbox.put_nowait(
+            (
+                f"{CHANNEL_PREFIX}{session_id}",
+                encode_message(self.origin, event_type, server_seq, frame),
+            )
+        )
+
+    async def _publish_loop(self) -> None:
+        while True:
+            channel, message = await self._outbox.get()
+            try:
+                await self._client.publish(channel, message)
+                metrics.increment("broker.published")
+            except Exception as exc:
+                metrics.increment("broker.publish_failures")
+                logger.error("broker_publish_failed", channel=channel, error=str(exc))
+
+    async def _listen_loop(self) -> None:
+        await self._has_subscriptions.wait()
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error("broker_receive_failed", error=str(exc))
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            channel = _as_str(message["channel"])
+            try:
+                session_id = uuid.UUID(channel.removeprefix(CHANNEL_PREFIX))
+                self._deliver(session_id, _as_str(message["data"]))
+            except Exception as exc:
+                logger.error("broker_message_invalid", channel=channel, error=str(exc))
+
+
+def _as_str(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def create_broker() -> Broker:
+    if settings.redis_url:
+        return RedisBroker(settings.redis_url)
+    return InProcessBroker()
+
+
+broker = create_broker()
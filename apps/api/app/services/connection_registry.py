@@ -0,0 +1,117 @@
+"""
+Registry of this process's live sessions and their WebSocket connections.
+"""
+
+import asyncio
+import uuid
+
+from fastapi import WebSocket
+
+from app.services.connection_sender import ConnectionSender
+from app.services.guidance_coalescer import GuidanceCoalescer
+from app.services.replay_buffer import ReplayBuffer
+from app.services.rule_service import SessionRuleState
+from app.services.session_pipeline import SessionPipeline
+from app.services.session_snapshot import SessionSnapshot
+from app.services.streaming_redactor import StreamingRedactor
+
+
+class SessionEntry:
+    """Everything held in memory for one session."""
+
+    __slots__ = (
+        "connections",
+        "rule_state",
+        "replay_buffer",
+        "snapshot",
+        "release_handle",
+        "guidance",
+        "pipeline",
+        "interim",
+        "redactor",
+        "tenant_id",
+    )
+
+    def __init__(
+        self,
+        rule_state: SessionRuleState,
+        replay_buffer: ReplayBuffer,
+        snapshot: SessionSnapshot,
+        tenant_id: str | None = None,
+    ) -> None:
+        self.connections: dict[WebSocket, ConnectionSender] = {}
+        self.rule_state = rule_state
+        self.replay_buffer = replay_buffer
+        self.snapshot = snapshot
+        self.release_handle: asyncio.TimerHandle | None = None
+        self.guidance: GuidanceCoalescer | None = None
+        self.pipeline: SessionPipeline | None = None
+        # Latest unpersisted interim frame per speaker, replayed on resume.
+        self.interim: dict[str, str] = {}
+        # Per-speaker carry-over so PII split across segments is still redacted.
+        self.redactor = StreamingRedactor()
+        # Whose share of the LLM scheduler this session's guidance counts against.
+        self.tenant_id = tenant_id
+
+
+class ConnectionRegistry:
+    """Single owner of per-session and per-connection state.
+
+    A session entry exists only while the session has connections or is inside
+    its linger window, and lookups never create entries, so memory is bounded
+    by live connections plus recently ended sessions.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: dict[uuid.UUID, SessionEntry] = {}
+        self._connection_count = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def connection_count(self) -> int:
+        return self._connection_count
+
+    def get(self, session_id: uuid.UUID) -> SessionEntry | None:
+        return self._sessions.get(session_id)
+
+    def sender(self, session_id: uuid.UUID, websocket: WebSocket) -> ConnectionSender | None:
+        entry = self._sessions.get(session_id)
+        return entry.connections.get(websocket) if entry is not None else None
+
+    def add_session(self, session_id: uuid.UUID, entry: SessionEntry) -> SessionEntry:
+        """Store ``entry`` unless a concurrent connect already created one."""
+        return self._sessions.setdefault(session_id, entry)
+
+    def add_connection(
+        self,
+        session_id: uuid.UUID,
+        entry: SessionEntry,
+        websocket: WebSocket,
+        sender: ConnectionSender,
+    ) -> None:
+        entry = self._sessions.setdefault(session_id, entry)
+        if entry.release_handle is not None:
+            entry.release_handle.cancel()
+            entry.release_handle = None
+        if websocket not in entry.connections:
+            self._connection_count += 1
+        entry.connections[websocket] = sender
+
+    def remove_connection(
+        self, session_id: uuid.UUID, websocket: WebSocket
+    ) -> tuple[ConnectionSender | None, SessionEntry | None]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None, None
+        sender = entry.connections.pop(websocket, None)
+        if sender is not None:
+            self._connection_count -= 1
+        return sender, entry
+
+    def pop_session(self, session_id: uuid.UUID) -> SessionEntry | None:
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._connection_count -= len(entry.connections)
+        return entry
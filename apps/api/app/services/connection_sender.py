@@ -0,0 +1,141 @@
+"""
+Per-connection outbound queue with a dedicated writer task.
+
+Fanout only enqueues, so one slow browser cannot delay frames for the other
+connections of a session or block the receive loop. When a queue is full the
+configured overflow action for the frame type applies: ``drop`` the frame,
+``coalesce`` it with an already queued frame of the same type, or
+``disconnect`` the slow consumer with close code 1013.
+"""
+
+import asyncio
+from collections import deque
+
+import structlog
+from fastapi import WebSocket
+
+from app.config import settings
+from app.metrics import metrics
+
+logger = structlog.get_logger()
+
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Frames that only ever matter in their latest version are coalesced even
+# before the queue is full. The stale frame is dropped and the new one goes to
+# the tail: taking the old slot would put its server_seq ahead of lower seqs
+# queued since, which the client then discards as already seen.
+_COALESCED_TYPES = {"server.guidance_update", "server.guidance_delta"}
+
+# The event loop only holds tasks weakly; closes in flight are kept here.
+_close_tasks: set[asyncio.Task] = set()
+
+
+class ConnectionSender:
+    __slots__ = ("websocket", "_queue", "_max_queue", "_ready", "_task", "closed")
+
+    def __init__(self, websocket: WebSocket, max_queue: int | None = None) -> None:
+        self.websocket = websocket
+        self._queue: deque[tuple[str | None, str]] = deque()
+        self._max_queue = max_queue or settings.ws_send_queue_max
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.closed = False
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def send(self, frame: str, event_type: str | None = None) -> bool:
+        """Enqueue one encoded frame without waiting; False if the connection is gone."""
+        if self.closed:
+            return False
+        if event_type in _COALESCED_TYPES and self._drop_queued(event_type):
+            metrics.increment("ws.send.coalesced")
+        if len(self._queue) >= self._max_queue and not self._handle_overflow(event_type, frame):
+            return not self.closed
+        self._queue.append((event_type, frame))
+        self._ready.set()
+        return True
+
+    def send_many(self, frames: list[str]) -> bool:
+        """Enqueue a resume replay; bypasses the bound since it is requested by the client."""
+        if self.closed:
+            return False
+        self._queue.extend((None, frame) for frame in frames)
+        self._ready.set()
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._queue.clear()
+
+    def _drop_queued(self, event_type: str) -> bool:
+        """Remove the newest queued frame of ``event_type``; True if there was one."""
+        for index in range(len(self._queue) - 1, -1, -1):
+            if self._queue[index][0] == event_type:
+                del self._queue[index]
+                return True
+        return False
+
+    def _handle_overflow(self, event_type: str | None, frame: str) -> bool:
+        """Apply the overflow policy; True if ``frame`` should still be enqueued."""
+        policy = settings.ws_overflow_policy
+        action = policy.get(event_type or "", "disconnect")
+        if action == "coalesce" and self._drop_queued(event_type):
+            metrics.increment("ws.send.coalesced")
+            return True
+        # Make room by discarding a queued frame that is itself droppable (a ping).
+        for index, (queued_type, _frame) in enumerate(self._queue):
+            if policy.get(queued_type or "") == "drop" and queued_type != event_type:
+                del self._queue[index]
+                metrics.increment("ws.send.dropped")
+                return True
+        if action in {"drop", "coalesce"}:
+            metrics.increment("ws.send.dropped")
+            return False
+
+        metrics.increment("ws.send.slow_consumer_disconnects")
+        logger.warning(
+            "ws_slow_consumer_disconnected",
+            queued=len(self._queue),
+            event_type=event_type,
+        )
+        self.closed = True
+        self._queue.clear()
+        if self._task is not None:
+            self._task.cancel()
+        task = asyncio.create_task(self._close_slow_consumer())
+        _close_tasks.add(task)
+        task.add_done_callback(_close_tasks.discard)
+        return False
+
+    async def _close_slow_consumer(self) -> None:
+        try:
+            await self.websocket.close(
+                code=SLOW_CONSUMER_CLOSE_CODE, reason="Slow consumer: send queue overflow"
+            )
+        except Exception:
+            pass
+
+    async def _run(self) -> None:
+        queue = self._queue
+        try:
+            while True:
+                if not queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                _event_type, frame = queue.popleft()
+                await self.websocket.send_text(frame)
+        except asyncio.CancelledError:
+            return
+        except Exception:
+            # The receive loop sees the disconnect and runs cleanup_connection.
+            self.closed = True
+        queue.clear()
@@ -0,0 +1,324 @@
+"""
+Group-commit write-behind writer for call_events.
+
+Rows from every session are queued and flushed as one multi-row INSERT per
+tick (or as soon as a full batch is waiting). Callers await a future that is
+resolved only after the batch containing their row has been committed. Rows
+submitted together (a client batch) are queued as one unit and always land in
+the same transaction.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import UTC, datetime
+
+import structlog
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db import async_session
+from app.metrics import metrics
+from app.models.call_event import CallEvent
+from app.services.sequence_service import get_allocator, reseed_allocator, seed_allocator
+
+logger = structlog.get_logger()
+
+MAX_SEQ_CONFLICT_RETRIES = 3
+
+
+class PendingEvent:
+    """Rows that must be committed together; the future resolves to their server_seqs."""
+
+    __slots__ = ("rows", "future")
+
+    def __init__(self, rows: list[dict], future: asyncio.Future) -> None:
+        self.rows = rows
+        self.future = future
+
+
+class EventWriter:
+    """Batches CallEvent inserts across sessions into group commits."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = async_session,
+        batch_size: int | None = None,
+        flush_interval_ms: float | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._batch_size = batch_size or settings.event_writer_batch_size
+        interval_ms = (
+            flush_interval_ms
+            if flush_interval_ms is not None
+            else settings.event_writer_flush_interval_ms
+        )
+        self._flush_interval = interval_ms / 1000.0
+        self._queue: asyncio.Queue[PendingEvent] = asyncio.Queue()
+        self._queued_rows = 0
+        self._wakeup = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the flusher task."""
+        self._stopping = True
+        self._wakeup.set()
+        self._batch_ready.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def write(self, row: dict) -> int:
+        """Queue one row and wait until it is durable; returns its server_seq.
+
+        If the row's ``event_id`` is already stored for the session, the existing
+        server_seq is returned instead.
+        """
+        return (await self._enqueue([row]))[0]
+
+    async def append(
+        self,
+        session_id: uuid.UUID,
+        event_id: uuid.UUID,
+        event_type: str,
+        payload: dict,
+        created_at: datetime | None = None,
+    ) -> int:
+        """Assign the next server_seq for the session and write the event."""
+        if get_allocator(session_id) is None:
+            async with self._session_factory() as db:
+                await seed_allocator(db, session_id)
+        return await self.submit(session_id, event_id, event_type, payload, created_at)
+
+    def submit(
+        self,
+        session_id: uuid.UUID,
+        event_id: uuid.UUID,
+        event_type: str,
+        payload: dict,
+        created_at: datetime | None = None,
+    ) -> asyncio.Future[int]:
+        """Assign the event's server_seq and queue it without yielding.
+
+        Callers that submit in some order get increasing server_seqs in that
+        order. The returned future resolves to the stored server_seq once the
+        row is durable. A ``uq_session_seq`` conflict means another process
+        wrote to the session; the allocator is reseeded from the DB and the
+        write retried.
+        """
+        return self.submit_many(session_id, [(event_id, event_type, payload, created_at)])[0]
+
+    def submit_many(
+        self,
+        session_id: uuid.UUID,
+        events: list[tuple[uuid.UUID, str, dict, datetime | None]],
+    ) -> list[asyncio.Future[int]]:
+        """Like ``submit`` for several ``(event_id, type, payload, created_at)`` events.
+
+        The events get consecutive server_seqs and are committed in a single
+        transaction; one future per event is returned, in order.
+        """
+        allocator = get_allocator(session_id)
+        if allocator is None:
+            stored = asyncio.ensure_future(self._seed_and_submit(session_id, events))
+        else:
+            rows = [
+                _build_row(session_id, event_id, allocator.next(), event_type, payload, created_at)
+                for event_id, event_type, payload, created_at in events
+            ]
+            stored = asyncio.ensure_future(self._await_with_retry(rows, self._enqueue(rows)))
+
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in events]
+        stored.add_done_callback(lambda done: _resolve_each(futures, done))
+        return futures
+
+    async def _seed_and_submit(
+        self,
+        session_id: uuid.UUID,
+        events: list[tuple[uuid.UUID, str, dict, datetime | None]],
+    ) -> list[int]:
+        async with self._session_factory() as db:
+            await seed_allocator(db, session_id)
+        return list(await asyncio.gather(*self.submit_many(session_id, events)))
+
+    def _enqueue(self, rows: list[dict]) -> asyncio.Future[list[int]]:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(PendingEvent(rows, future))
+        self._queued_rows += len(rows)
+        self._wakeup.set()
+        if self._queued_rows >= self._batch_size:
+            self._batch_ready.set()
+        return future
+
+    async def _await_with_retry(
+        self, rows: list[dict], future: asyncio.Future[list[int]]
+    ) -> list[int]:
+        session_id = rows[0]["session_id"]
+        for attempt in range(MAX_SEQ_CONFLICT_RETRIES + 1):
+            try:
+                return await future
+            except IntegrityError as exc:
+                if "uq_session_seq" not in str(exc.orig) or attempt >= MAX_SEQ_CONFLICT_RETRIES:
+                    raise
+                logger.warning(
+                    "server_seq_conflict",
+                    session_id=str(session_id),
+                    server_seq=rows[0]["server_seq"],
+                    attempt=attempt + 1,
+                )
+                async with self._session_factory() as db:
+                    allocator = await reseed_allocator(db, session_id)
+                rows = [
+                    {**row, "id": uuid.uuid4(), "server_seq": allocator.next()} for row in rows
+                ]
+                future = self._enqueue(rows)
+        raise RuntimeError("Unreachable server_seq retry state")
+
+    async def _run(self) -> None:
+        while True:
+            if self._queue.empty():
+                if self._stopping:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            if self._queued_rows < self._batch_size and not self._stopping:
+                # Give concurrent writers one tick to join this batch.
+                self._batch_ready.clear()
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self._flush_interval)
+                except TimeoutError:
+                    pass
+
+            # Whole PendingEvents only, so a client batch is never split.
+            batch: list[PendingEvent] = []
+            size = 0
+            while not self._queue.empty() and (not batch or size < self._batch_size):
+                item = self._queue.get_nowait()
+                batch.append(item)
+                size += len(item.rows)
+            self._queued_rows -= size
+            metrics.set_gauge("event_writer.queue_depth", self._queued_rows)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[PendingEvent]) -> None:
+        started = time.perf_counter()
+        rows = [row for item in batch for row in item.rows]
+        try:
+            seqs = await self._insert_rows(rows)
+        except IntegrityError:
+            # One bad row (server_seq conflict) must not fail the whole batch:
+            # retry caller by caller so only the offending one sees the error.
+            metrics.increment("event_writer.batch_conflicts")
+            for item in batch:
+                try:
+                    item_seqs = await self._insert_rows(item.rows)
+                except Exception as exc:
+                    _set_exception(item.future, exc)
+                else:
+                    _set_result(item.future, item_seqs)
+        except Exception as exc:
+            metrics.increment("event_writer.flush_failures")
+            logger.error("event_writer_flush_failed", size=len(rows), error=str(exc))
+            for item in batch:
+                _set_exception(item.future, exc)
+        else:
+            offset = 0
+            for item in batch:
+                _set_result(item.future, seqs[offset : offset + len(item.rows)])
+                offset += len(item.rows)
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        metrics.observe("event_writer.flush_size", len(rows))
+        metrics.observe("event_writer.flush_latency_ms", latency_ms)
+        metrics.increment("event_writer.events_flushed", len(rows))
+        logger.debug("event_writer_flushed", size=len(rows), latency_ms=round(latency_ms, 2))
+
+    async def _insert_rows(self, rows: list[dict]) -> list[int]:
+        """Insert rows in one statement and return each row's stored server_seq."""
+        async with self._session_factory() as db:
+            stmt = (
+                insert(CallEvent)
+                .values(rows)
+                .on_conflict_do_nothing(constraint="uq_session_event")
+                .returning(CallEvent.session_id, CallEvent.event_id, CallEvent.server_seq)
+            )
+            stored = {
+                (session_id, event_id): server_seq
+                for session_id, event_id, server_seq in (await db.execute(stmt)).all()
+            }
+            missing = [
+                (row["session_id"], row["event_id"])
+                for row in rows
+                if (row["session_id"], row["event_id"]) not in stored
+            ]
+            if missing:
+                # Duplicate event_ids (client retries) keep their original seq.
+                existing = await db.execute(
+                    select(
+                        CallEvent.session_id, CallEvent.event_id, CallEvent.server_seq
+                    ).where(tuple_(CallEvent.session_id, CallEvent.event_id).in_(missing))
+                )
+                for session_id, event_id, server_seq in existing.all():
+                    stored[(session_id, event_id)] = server_seq
+            await db.commit()
+        return [stored[(row["session_id"], row["event_id"])] for row in rows]
+
+
+def _build_row(
+    session_id: uuid.UUID,
+    event_id: uuid.UUID,
+    server_seq: int,
+    event_type: str,
+    payload: dict,
+    created_at: datetime | None,
+) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "session_id": session_id,
+        "event_id": event_id,
+        "server_seq": server_seq,
+        "type": event_type,
+        "payload": payload,
+        "created_at": created_at or datetime.now(UTC),
+    }
+
+
+def _resolve_each(futures: list[asyncio.Future[int]], stored: asyncio.Future[list[int]]) -> None:
+    if stored.cancelled():
+        for future in futures:
+            future.cancel()
+        return
+    exc = stored.exception()
+    if exc is not None:
+        for future in futures:
+            _set_exception(future, exc)
+        return
+    for future, seq in zip(futures, stored.result(), strict=True):
+        _set_result(future, seq)
+
+
+def _set_result(future: asyncio.Future, value) -> None:
+    if not future.done():
+        future.set_result(value)
+
+
+def _set_exception(future: asyncio.Future, exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+event_writer = EventWriter()
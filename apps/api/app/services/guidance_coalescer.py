@@ -0,0 +1,105 @@
+"""
+Non-preemptive scheduling of one session's guidance generation.
+
+Each new final segment triggers guidance, but generating it is a paid LLM
+call that takes longer than the gap between segments in a fast exchange.
+Triggers are therefore coalesced rather than pre-empted: a run starts once
+the session has been quiet for the debounce, at most one run is in flight,
+and triggers that arrive during a run collapse into a single trailing run
+after it. A run in flight is never cancelled, so its tokens are not wasted
+and guidance always lands eventually. Because quiet may never come while
+segments keep arriving, a run also starts once the oldest pending trigger
+has waited max_staleness, however recent the last one is.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import structlog
+
+from app.config import settings
+from app.metrics import metrics
+
+logger = structlog.get_logger()
+
+
+class GuidanceCoalescer:
+    """At most one in-flight run and one trailing run for one session."""
+
+    __slots__ = (
+        "_run",
+        "_debounce",
+        "_max_staleness",
+        "_task",
+        "_running",
+        "_pending_since",
+        "_last_trigger",
+    )
+
+    def __init__(
+        self,
+        run: Callable[[], Awaitable[None]],
+        debounce_seconds: float | None = None,
+        max_staleness_seconds: float | None = None,
+    ) -> None:
+        self._run = run
+        self._debounce = (
+            settings.llm_guidance_debounce_seconds if debounce_seconds is None else debounce_seconds
+        )
+        self._max_staleness = (
+            settings.llm_guidance_max_staleness_seconds
+            if max_staleness_seconds is None
+            else max_staleness_seconds
+        )
+        self._task: asyncio.Task | None = None
+        self._running = False
+        # Loop time of the oldest and newest triggers not yet covered by a run.
+        self._pending_since: float | None = None
+        self._last_trigger = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def pending(self) -> bool:
+        return self._pending_since is not None
+
+    def trigger(self) -> None:
+        """Ask for guidance that covers everything received so far."""
+        now = asyncio.get_running_loop().time()
+        if self._pending_since is None:
+            self._pending_since = now
+        else:
+            metrics.increment("llm.guidance.coalesced")
+        self._last_trigger = now
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    def cancel_pending(self) -> None:
+        """Drop triggers not yet running; a run in flight still finishes."""
+        self._pending_since = None
+        if self._task is not None and not self._running:
+            self._task.cancel()
+            self._task = None
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending_since is not None:
+            start_at = min(
+                self._last_trigger + self._debounce, self._pending_since + self._max_staleness
+            )
+            delay = start_at - loop.time()
+            if delay > 0:
+                # Triggers during the sleep only move start_at; it is re-read after.
+                await asyncio.sleep(delay)
+                continue
+            metrics.observe("llm.guidance.staleness_ms", (loop.time() - self._pending_since) * 1000)
+            self._pending_since = None
+            self._running = True
+            try:
+                await self._run()
+            except Exception as exc:
+                logger.error("llm_guidance_run_failed", error=str(exc))
+            finally:
+                self._running = False
@@ -0,0 +1,139 @@
+"""
+Process-wide heartbeat scheduler for WebSocket connections.
+
+A hashed timer wheel whose period is the heartbeat interval: every connection
+lives in one slot, and a single task visits one slot per tick. Wakeups are
+therefore batched (one per tick rather than one per session) and a connection
+is never re-slotted after registration, so scheduling, cancelling and
+``touch`` are all O(1). Idle deadlines are checked when a connection's slot
+comes up, i.e. on the heartbeat cadence.
+"""
+
+import asyncio
+import math
+import time
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+import structlog
+
+from app.metrics import metrics
+from app.schemas.events import EventEnvelope
+from app.services.connection_sender import ConnectionSender
+
+logger = structlog.get_logger()
+
+
+class HeartbeatEntry:
+    __slots__ = ("session_id", "sender", "slot", "last_seen")
+
+    def __init__(
+        self, session_id: uuid.UUID, sender: ConnectionSender, slot: int, last_seen: float
+    ) -> None:
+        self.session_id = session_id
+        self.sender = sender
+        self.slot = slot
+        self.last_seen = last_seen
+
+
+class HeartbeatScheduler:
+    """Pings every registered connection once per interval and reports idle ones."""
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        tick_seconds: float = 1.0,
+        idle_timeout_seconds: float | None = None,
+        on_idle: Callable[[list[HeartbeatEntry]], None] | None = None,
+    ) -> None:
+        self.tick_seconds = tick_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.on_idle = on_idle
+        self._slots: list[dict[ConnectionSender, HeartbeatEntry]] = [
+            {} for _ in range(max(1, math.ceil(interval_seconds / tick_seconds)))
+        ]
+        self._entries: dict[ConnectionSender, HeartbeatEntry] = {}
+        self._tick = 0
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def add(self, session_id: uuid.UUID, sender: ConnectionSender) -> None:
+        if sender in self._entries:
+            return
+        # The slot just visited comes up again one full interval from now.
+        slot = (self._tick - 1) % len(self._slots)
+        entry = HeartbeatEntry(session_id, sender, slot, time.monotonic())
+        self._entries[sender] = entry
+        self._slots[slot][sender] = entry
+
+    def remove(self, sender: ConnectionSender) -> None:
+        entry = self._entries.pop(sender, None)
+        if entry is None:
+            return
+        self._slots[entry.slot].pop(sender, None)
+
+    def touch(self, sender: ConnectionSender, now: float | None = None) -> None:
+        entry = self._entries.get(sender)
+        if entry is not None:
+            entry.last_seen = time.monotonic() if now is None else now
+
+    def run_tick(self, now: float | None = None) -> None:
+        """Visit the next slot: ping its connections and collect idle ones."""
+        now = time.monotonic() if now is None else now
+        slot = self._slots[self._tick % len(self._slots)]
+        self._tick += 1
+        if not slot:
+            return
+
+        idle: list[HeartbeatEntry] = []
+        # Pings carry nothing connection-specific: one fresh frame per session per tick.
+        ping_frames: dict[uuid.UUID, str] = {}
+        idle_timeout = self.idle_timeout_seconds
+        pings = 0
+        for entry in list(slot.values()):
+            if idle_timeout is not None and now - entry.last_seen > idle_timeout:
+                idle.append(entry)
+                continue
+            frame = ping_frames.get(entry.session_id)
+            if frame is None:
+                frame = ping_frames[entry.session_id] = EventEnvelope(
+                    session_id=entry.session_id,
+                    type="system.ping",
+                    ts_created=datetime.now(UTC),
+                    payload={},
+                ).model_dump_json()
+            entry.sender.send(frame, "system.ping")
+            pings += 1
+
+        metrics.increment("heartbeat.pings_sent", pings)
+        if idle and self.on_idle is not None:
+            metrics.increment("heartbeat.idle_connections", len(idle))
+            self.on_idle(idle)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick_at = loop.time() + self.tick_seconds
+        while True:
+            await asyncio.sleep(max(0.0, next_tick_at - loop.time()))
+            next_tick_at += self.tick_seconds
+            metrics.set_gauge("heartbeat.connections", len(self._entries))
+            try:
+                self.run_tick()
+            except Exception:
+                # One bad tick (a failing sender or on_idle) must not stop every
+                # later ping and idle check for the process.
+                metrics.increment("heartbeat.tick_failures")
+                logger.exception("heartbeat_tick_failed", tick=self._tick)
@@ -0,0 +1,174 @@
+"""
+Content-addressed cache of validated LLM responses.
+
+Replays, retried resumes and repeated guidance triggers often send the same
+conversation window again. Responses are cached under a SHA-256 of the model,
+the response schema and the normalized messages, so an identical window is
+answered without another API call. Entries live in an in-process LRU with a
+TTL and, optionally, in a shared Redis tier that every API worker reads; a
+shared hit is copied into the local tier. The shared tier is best effort:
+if Redis fails the lookup is a miss and the call goes to the LLM.
+"""
+
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import structlog
+from pydantic import BaseModel
+
+from app.config import settings
+from app.metrics import metrics
+
+logger = structlog.get_logger()
+
+KEY_PREFIX = "csr:llm:"
+
+
+def _normalize_content(content: object) -> object:
+    if not isinstance(content, str):
+        return content
+    return "\n".join(line.strip() for line in content.strip().splitlines())
+
+
+def cache_key(model: str, schema: type[BaseModel], messages: list[dict]) -> str:
+    """Hash of everything that decides the response, with insignificant whitespace removed."""
+    document = {
+        "model": model,
+        "schema": schema.model_json_schema(),
+        "messages": [
+            {**message, "content": _normalize_content(message.get("content"))}
+            for message in messages
+        ],
+    }
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class SharedCacheTier(ABC):
+    """Interface for a cache tier shared between API workers."""
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None: ...
+
+    async def close(self) -> None:  # noqa: B027 - optional; tiers without a connection skip it
+        pass
+
+
+class RedisCacheTier(SharedCacheTier):
+    """Redis strings with an expiry; ``redis`` is imported on first use, like the broker."""
+
+    def __init__(self, url: str = "", client=None) -> None:
+        self._url = url
+        self._client = client
+
+    def _redis(self):
+        if self._client is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self._url)
+        return self._client
+
+    async def get(self, key: str) -> str | None:
+        value = await self._redis().get(f"{KEY_PREFIX}{key}")
+        if value is None:
+            return None
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        await self._redis().set(f"{KEY_PREFIX}{key}", value, px=int(ttl_seconds * 1000))
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LLMResponseCache:
+    """In-process LRU with a TTL in front of an optional shared tier."""
+
+    __slots__ = ("_max_entries", "_ttl", "_shared", "_entries")
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        shared: SharedCacheTier | None = None,
+    ) -> None:
+        self._max_entries = settings.llm_cache_max_entries if max_entries is None else max_entries
+        self._ttl = settings.llm_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._shared = shared
+        # key -> (monotonic expiry, response JSON); most recently used last.
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0 and (self._max_entries > 0 or self._shared is not None)
+
+    async def get(self, key: str, schema: type[BaseModel]) -> BaseModel | None:
+        """The cached response for ``key`` as a fresh ``schema`` instance, if any."""
+        value = self._get_local(key)
+        if value is None and self._shared is not None:
+            try:
+                value = await self._shared.get(key)
+            except Exception as exc:
+                metrics.increment("llm.cache.shared_errors")
+                logger.warning("llm_cache_shared_get_failed", error=str(exc))
+            if value is not None:
+                metrics.increment("llm.cache.shared_hits")
+                self._put_local(key, value)
+        if value is None:
+            metrics.increment("llm.cache.misses")
+            return None
+        metrics.increment("llm.cache.hits")
+        return schema.model_validate_json(value)
+
+    async def put(self, key: str, response: BaseModel) -> None:
+        value = response.model_dump_json()
+        self._put_local(key, value)
+        if self._shared is not None:
+            try:
+                await self._shared.set(key, value, self._ttl)
+            except Exception as exc:
+                metrics.increment("llm.cache.shared_errors")
+                logger.warning("llm_cache_shared_set_failed", error=str(exc))
+
+    async def close(self) -> None:
+        self._entries.clear()
+        if self._shared is not None:
+            await self._shared.close()
+
+    def _get_local(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_local(self, key: str, value: str) -> None:
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            metrics.increment("llm.cache.evictions")
+
+
+def create_llm_cache() -> LLMResponseCache:
+    shared = None
+    if settings.llm_cache_shared and settings.redis_url:
+        shared = RedisCacheTier(settings.redis_url)
+    return LLMResponseCache(shared=shared)
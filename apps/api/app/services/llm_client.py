@@ -1,40 +1,341 @@
+import asyncio
+import json
+import re
+import time
+from collections.abc import Awaitable, Callable
+from functools import cache
 
+import httpx
+import structlog
 from openai import AsyncOpenAI
 from pydantic import BaseModel, ValidationError
 
 from app.config import settings
+from app.metrics import metrics
+from app.services.llm_cache import LLMResponseCache, cache_key, create_llm_cache
+from app.services.llm_scheduler import LLMPriority, LLMScheduler, llm_scheduler
+
+logger = structlog.get_logger()
 
 
 class LLMGenerationError(Exception):
     """Raised when LLM generation fails or output cannot be validated."""
 
 
+class _StringFieldStream:
+    """Decodes one string field of a JSON object from the response as it streams in."""
+
+    __slots__ = ("_opening", "_buffer", "_start", "_scanned", "_length", "_done")
+
+    def __init__(self, field: str) -> None:
+        self._opening = re.compile(rf'"{re.escape(field)}"\s*:\s*"')
+        self._buffer = ""
+        self._start: int | None = None
+        self._scanned = 0
+        self._length = 0
+        self._done = False
+
+    def feed(self, chunk: str) -> str | None:
+        """Add ``chunk``; returns the field's value so far if it grew."""
+        if self._done:
+            return None
+        self._buffer += chunk
+        buffer = self._buffer
+        if self._start is None:
+            match = self._opening.search(buffer)
+            if match is None:
+                return None
+            self._start = self._scanned = match.end()
+        # Advance over whole characters and escapes only; a trailing partial
+        # escape (or the first half of a surrogate pair) waits for more text.
+        position = self._scanned
+        while position < len(buffer):
+            char = buffer[position]
+            if char == '"':
+                self._done = True
+                break
+            if char != "\\":
+                position += 1
+                continue
+            if position + 1 >= len(buffer):
+                break
+            if buffer[position + 1] != "u":
+                position += 2
+                continue
+            width = 12 if "d800" <= buffer[position + 2 : position + 6].lower() <= "dbff" else 6
+            if position + width > len(buffer):
+                break
+            position += width
+        self._scanned = position
+        value = json.loads(f'"{buffer[self._start : position]}"', strict=False)
+        if len(value) <= self._length:
+            return None
+        self._length = len(value)
+        return value
+
+
 class LLMClient:
     """LLM client that enforces structured JSON output via Pydantic schemas."""
 
-    def __init__(self) -> None:
-        """Initialize OpenRouter-backed AsyncOpenAI client."""
+    def __init__(
+        self, scheduler: LLMScheduler | None = None, cache: LLMResponseCache | None = None
+    ) -> None:
+        """Initialize OpenRouter-backed AsyncOpenAI client on a tuned keep-alive pool."""
         self.client = AsyncOpenAI(
             api_key=settings.openrouter_api_key,
             base_url="https://openrouter.ai/api/v1",
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_keepalive_connections,
+                    keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+                ),
+                timeout=httpx.Timeout(
+                    settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds
+                ),
+                follow_redirects=True,
+            ),
         )
+        self.scheduler = scheduler or llm_scheduler
+        self.cache = cache if cache is not None else create_llm_cache()
+
+    async def complete(
+        self,
+        messages: list[dict],
+        schema: type[BaseModel],
+        priority: LLMPriority = "guidance",
+        tenant: str | None = None,
+    ) -> BaseModel:
+        """Generate a completion and validate the JSON response against ``schema``.
 
-    async def complete(self, messages: list[dict], schema: type[BaseModel]) -> BaseModel:
-        """Generate a completion and validate the JSON response against ``schema``."""
+        The request waits for an admission slot of ``priority`` for ``tenant``.
+        A response cached for the same model, schema and messages is returned
+        without calling the API. A slow or invalid primary response is hedged
+        with the fallback model (see ``_hedged``).
+        """
+        key = self._cache_key(messages, schema)
+        if key is not None and (cached := await self.cache.get(key, schema)) is not None:
+            return cached
         normalized_messages = self._ensure_json_instruction(messages, schema)
-        try:
-            response = await self.client.chat.completions.create(
-                model=settings.llm_primary_model,
-                messages=normalized_messages,
-                response_format={"type": "json_object"},
-                temperature=0,
-            )
-        except Exception as exc:
-            raise LLMGenerationError(f"LLM API request failed: {exc}") from exc
+        result = await self._hedged(
+            lambda model, claim: self._request(
+                model, normalized_messages, schema, priority, tenant, claim
+            ),
+            "request_ms",
+        )
+        if key is not None:
+            await self.cache.put(key, result)
+        return result
+
+    async def complete_streaming(
+        self,
+        messages: list[dict],
+        schema: type[BaseModel],
+        field: str,
+        on_field: Callable[[str], None],
+        priority: LLMPriority = "guidance",
+        tenant: str | None = None,
+    ) -> BaseModel:
+        """``complete`` over a streamed response, reporting one field as it is generated.
+
+        ``on_field`` receives the string value of ``field`` so far each time
+        it grows; the full response is still validated against ``schema``.
+        A cached response is reported to ``on_field`` whole, in one call.
+        When hedged, the first model to produce a token is the one streamed;
+        if its response then fails validation, the other model's response is
+        streamed from the start.
+        """
+        key = self._cache_key(messages, schema)
+        if key is not None and (cached := await self.cache.get(key, schema)) is not None:
+            value = getattr(cached, field, None)
+            if isinstance(value, str) and value:
+                on_field(value)
+            return cached
+        normalized_messages = self._ensure_json_instruction(messages, schema)
+        result = await self._hedged(
+            lambda model, claim: self._stream(
+                model, normalized_messages, schema, field, on_field, priority, tenant, claim
+            ),
+            "ttft_ms",
+        )
+        if key is not None:
+            await self.cache.put(key, result)
+        return result
+
+    async def _request(
+        self,
+        model: str,
+        messages: list[dict],
+        schema: type[BaseModel],
+        priority: LLMPriority,
+        tenant: str | None,
+        claim: Callable[[], bool],
+    ) -> BaseModel:
+        async with self.scheduler.slot(priority, tenant):
+            started = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    response_format={"type": "json_object"},
+                    temperature=0,
+                )
+            except asyncio.CancelledError:
+                # Lost a hedge race: a lower bound keeps the p95 from drifting down.
+                _observe_cancelled(f"llm.model.request_ms.{model}", started)
+                raise
+            except Exception as exc:
+                raise LLMGenerationError(f"LLM API request failed: {exc}") from exc
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics.observe(f"llm.request_ms.{priority}", elapsed_ms)
+            metrics.observe(f"llm.model.request_ms.{model}", elapsed_ms)
 
         content = None
         if response.choices:
             content = response.choices[0].message.content
+        result = self._parse(content, schema)
+        claim()
+        return result
+
+    async def _stream(
+        self,
+        model: str,
+        messages: list[dict],
+        schema: type[BaseModel],
+        field: str,
+        on_field: Callable[[str], None],
+        priority: LLMPriority,
+        tenant: str | None,
+        claim: Callable[[], bool],
+    ) -> BaseModel:
+        decoder = _StringFieldStream(field)
+        parts: list[str] = []
+        async with self.scheduler.slot(priority, tenant):
+            started = time.perf_counter()
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    response_format={"type": "json_object"},
+                    temperature=0,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                    if not text:
+                        continue
+                    parts.append(text)
+                    if len(parts) == 1:
+                        elapsed_ms = (time.perf_counter() - started) * 1000
+                        metrics.observe(f"llm.ttft_ms.{priority}", elapsed_ms)
+                        metrics.observe(f"llm.model.ttft_ms.{model}", elapsed_ms)
+                        if not claim():
+                            raise asyncio.CancelledError  # the other model is streaming
+                    value = decoder.feed(text)
+                    if value is not None:
+                        on_field(value)
+            except asyncio.CancelledError:
+                # Lost a hedge race: a lower bound keeps the p95 from drifting down.
+                if not parts:
+                    _observe_cancelled(f"llm.model.ttft_ms.{model}", started)
+                _observe_cancelled(f"llm.model.request_ms.{model}", started)
+                raise
+            except Exception as exc:
+                raise LLMGenerationError(f"LLM API request failed: {exc}") from exc
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics.observe(f"llm.request_ms.{priority}", elapsed_ms)
+            metrics.observe(f"llm.model.request_ms.{model}", elapsed_ms)
+        return self._parse("".join(parts), schema)
+
+    async def _hedged(
+        self,
+        attempt: Callable[[str, Callable[[], bool]], Awaitable[BaseModel]],
+        latency: str,
+    ) -> BaseModel:
+        """Run ``attempt`` on the primary model, racing the fallback model when it lags.
+
+        If the primary has not claimed the response within the hedge delay,
+        the same attempt starts on the fallback and the two race. An attempt
+        calls its ``claim`` once it has something to commit to (a valid
+        response, or its first streamed token); the first claim cancels the
+        other attempt, and later claims are refused. A failed attempt,
+        including one that fails schema validation, falls through to the
+        other model if that one has not failed too.
+        """
+        primary = settings.llm_primary_model
+        fallback = settings.llm_fallback_model
+        if not fallback or fallback == primary:
+            return await attempt(primary, lambda: True)
+
+        running: dict[asyncio.Task, str] = {}
+        claimed: list[asyncio.Task] = []
+        failed: set[str] = set()
+
+        def claim() -> bool:
+            task = asyncio.current_task()
+            if claimed:
+                return claimed[0] is task
+            claimed.append(task)
+            for other in running:
+                if other is not task:
+                    other.cancel()
+            return True
+
+        def start(model: str) -> None:
+            running[asyncio.create_task(attempt(model, claim))] = model
+
+        start(primary)
+        error: BaseException | None = None
+        try:
+            delay = self._hedge_delay(f"llm.model.{latency}.{primary}")
+            if delay is not None:
+                await asyncio.wait(running, timeout=delay)
+                if not claimed and all(not task.done() for task in running):
+                    metrics.increment("llm.hedge.launched")
+                    start(fallback)
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    model = running.pop(task)
+                    if task.cancelled():
+                        continue
+                    error = task.exception()
+                    if error is None:
+                        if model == fallback:
+                            metrics.increment("llm.fallback.responses")
+                        return task.result()
+                    failed.add(model)
+                    if claimed and claimed[0] is task:
+                        claimed.clear()
+                    logger.warning("llm_attempt_failed", model=model, error=str(error))
+                if not running:
+                    retry = [model for model in (fallback, primary) if model not in failed]
+                    if retry:
+                        metrics.increment("llm.fallthrough")
+                        start(retry[0])
+            raise error or LLMGenerationError("LLM request was cancelled")
+        finally:
+            for task in running:
+                task.cancel()
+
+    @staticmethod
+    def _hedge_delay(histogram_name: str) -> float | None:
+        """Seconds to give the primary before hedging; ``None`` means never hedge."""
+        if not settings.llm_hedge_enabled:
+            return None
+        histogram = metrics.histograms.get(histogram_name)
+        if histogram is None or histogram.count < settings.llm_hedge_min_samples:
+            return settings.llm_hedge_default_delay_seconds
+        threshold_ms = histogram.quantile(settings.llm_hedge_quantile) or 0.0
+        return max(threshold_ms / 1000, settings.llm_hedge_min_delay_seconds)
+
+    def _cache_key(self, messages: list[dict], schema: type[BaseModel]) -> str | None:
+        if not self.cache.enabled:
+            return None
+        return cache_key(settings.llm_primary_model, schema, messages)
+
+    @staticmethod
+    def _parse(content: object, schema: type[BaseModel]) -> BaseModel:
         if not isinstance(content, str) or not content.strip():
             raise LLMGenerationError("LLM returned empty or non-string content")
 
@@ -63,15 +364,34 @@ class LLMClient:
                 "Return output as valid JSON only. "
                 "Do not include markdown, code fences, or extra commentary.\n"
                 f"Match this exact JSON schema shape. Required fields: {required_hint}.\n"
-                "Expected fields:\n"
-                + ("\n".join(field_lines) if field_lines else "- (no fields)")
+                "Expected fields:\n" + ("\n".join(field_lines) if field_lines else "- (no fields)")
             ),
         }
         has_json_hint = any(
-            isinstance(message.get("content"), str)
-            and "json" in message["content"].lower()
+            isinstance(message.get("content"), str) and "json" in message["content"].lower()
             for message in messages
         )
         if has_json_hint:
             return messages
         return [instruction, *messages]
+
+
+def _observe_cancelled(histogram_name: str, started: float) -> None:
+    """Record how long a cancelled attempt had run; it would have taken at least that."""
+    metrics.observe(histogram_name, (time.perf_counter() - started) * 1000)
+    metrics.increment("llm.hedge.cancelled_samples")
+
+
+@cache
+def get_llm_client() -> LLMClient:
+    """Process-wide client; each one builds its own HTTP pool and TLS context."""
+    return LLMClient()
+
+
+async def close_llm_client() -> None:
+    """Close the shared client's connection pool and cache, if it was ever created."""
+    if get_llm_client.cache_info().currsize:
+        client = get_llm_client()
+        await client.client.close()
+        await client.cache.close()
+        get_llm_client.cache_clear()
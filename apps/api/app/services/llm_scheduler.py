@@ -0,0 +1,161 @@
+"""
+Admission control for LLM calls shared by every session in the process.
+
+All calls go through one pooled client, so the scheduler decides which of
+them may be in flight. A global limit caps concurrency; priority classes are
+admitted strictly in order ("guidance" is live and beats "summary", which
+can also be held below the global limit so it never takes every slot); and
+within a class, tenants are served round-robin and a tenant past its share
+of slots waits while any other tenant is queued, so one busy tenant cannot
+queue everyone else behind it. The share is not a hard cap: with nobody else
+waiting, a lone tenant may use every slot.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Literal
+
+from app.config import settings
+from app.metrics import metrics
+
+LLMPriority = Literal["guidance", "summary"]
+PRIORITIES: tuple[LLMPriority, ...] = ("guidance", "summary")
+
+
+class _Waiter:
+    __slots__ = ("future", "priority", "tenant", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future, priority: LLMPriority, tenant: str) -> None:
+        self.future = future
+        self.priority = priority
+        self.tenant = tenant
+        self.enqueued_at = time.perf_counter()
+
+
+class LLMScheduler:
+    """Global in-flight limit with strict priorities and per-tenant fair share."""
+
+    def __init__(
+        self,
+        max_in_flight: int | None = None,
+        tenant_max_in_flight: int | None = None,
+        priority_max_in_flight: dict[str, int] | None = None,
+    ) -> None:
+        self._max_in_flight = max_in_flight or settings.llm_max_in_flight
+        self._tenant_max = tenant_max_in_flight or settings.llm_tenant_max_in_flight
+        self._priority_max = (
+            settings.llm_priority_max_in_flight
+            if priority_max_in_flight is None
+            else priority_max_in_flight
+        )
+        self._in_flight = 0
+        self._priority_in_flight: dict[str, int] = dict.fromkeys(PRIORITIES, 0)
+        self._tenant_in_flight: dict[str, int] = {}
+        # Priority -> tenant -> waiters; a tenant's position is its round-robin turn.
+        self._queues: dict[str, dict[str, deque[_Waiter]]] = {p: {} for p in PRIORITIES}
+        self._queued = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @asynccontextmanager
+    async def slot(self, priority: LLMPriority, tenant: str | None = None) -> AsyncIterator[None]:
+        """Wait for an admission slot and hold it for the body of the ``async with``."""
+        waiter = await self._acquire(priority, tenant or "")
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    async def _acquire(self, priority: LLMPriority, tenant: str) -> _Waiter:
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, tenant)
+        self._queues[priority].setdefault(tenant, deque()).append(waiter)
+        self._queued += 1
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(waiter)  # admitted just as the caller gave up
+            else:
+                self._discard(waiter)
+            raise
+        return waiter
+
+    def _release(self, waiter: _Waiter) -> None:
+        self._in_flight -= 1
+        self._priority_in_flight[waiter.priority] -= 1
+        remaining = self._tenant_in_flight[waiter.tenant] - 1
+        if remaining:
+            self._tenant_in_flight[waiter.tenant] = remaining
+        else:
+            del self._tenant_in_flight[waiter.tenant]
+        self._dispatch()
+
+    def _discard(self, waiter: _Waiter) -> None:
+        tenants = self._queues[waiter.priority]
+        waiters = tenants.get(waiter.tenant)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            self._queued -= 1
+            if not waiters:
+                del tenants[waiter.tenant]
+        self._publish_gauges()
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self._max_in_flight:
+            waiter = self._next_waiter(fair_share=True) or self._next_waiter(fair_share=False)
+            if waiter is None:
+                break
+            self._queued -= 1
+            self._in_flight += 1
+            self._priority_in_flight[waiter.priority] += 1
+            self._tenant_in_flight[waiter.tenant] = (
+                self._tenant_in_flight.get(waiter.tenant, 0) + 1
+            )
+            metrics.observe(
+                f"llm.scheduler.queue_wait_ms.{waiter.priority}",
+                (time.perf_counter() - waiter.enqueued_at) * 1000,
+            )
+            waiter.future.set_result(None)
+        self._publish_gauges()
+
+    def _next_waiter(self, fair_share: bool) -> _Waiter | None:
+        """Head of the first tenant queue that may start, highest priority first.
+
+        With ``fair_share`` tenants past their share are skipped. A lower
+        class only goes ahead of waiting higher-class calls when none of those
+        may start.
+        """
+        for priority in PRIORITIES:
+            tenants = self._queues[priority]
+            if not tenants:
+                continue
+            if self._priority_in_flight[priority] >= self._priority_max.get(
+                priority, self._max_in_flight
+            ):
+                continue
+            for tenant in list(tenants):
+                if fair_share and self._tenant_in_flight.get(tenant, 0) >= self._tenant_max:
+                    continue
+                waiters = tenants.pop(tenant)
+                waiter = waiters.popleft()
+                if waiters:
+                    tenants[tenant] = waiters  # back of the round-robin
+                return waiter
+        return None
+
+    def _publish_gauges(self) -> None:
+        metrics.set_gauge("llm.scheduler.in_flight", self._in_flight)
+        metrics.set_gauge("llm.scheduler.queued", self._queued)
+
+
+llm_scheduler = LLMScheduler()
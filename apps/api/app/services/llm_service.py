@@ -1,7 +1,8 @@
+from collections.abc import Callable
 from datetime import UTC, datetime
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.call_event import CallEvent
@@ -17,7 +18,8 @@ class LLMService:
         self.db = db
         self.llm_client = llm_client
 
-    async def generate_guidance(self, session_id: UUID) -> EventEnvelope | None:
+    async def guidance_messages(self, session_id: UUID) -> list[dict] | None:
+        """The prompt for guidance on the recent transcript; the only DB access it needs."""
         transcript_stmt = (
             select(CallEvent)
             .where(
@@ -43,7 +45,7 @@ class LLMService:
         if not conversation_lines:
             return None
 
-        messages = [
+        return [
             {
                 "role": "system",
                 "content": (
@@ -53,33 +55,42 @@ class LLMService:
             },
             {"role": "user", "content": "\n".join(conversation_lines)},
         ]
-        guidance = await self.llm_client.complete(messages, schema=GuidanceResponse)
 
-        max_seq_result = await self.db.execute(
-            select(func.max(CallEvent.server_seq)).where(CallEvent.session_id == session_id)
-        )
-        next_server_seq = (max_seq_result.scalar_one_or_none() or 0) + 1
-        now = datetime.now(UTC)
-        envelope = EventEnvelope(
+    async def guidance_from_messages(
+        self,
+        session_id: UUID,
+        messages: list[dict],
+        tenant_id: str | None = None,
+        on_reply: Callable[[UUID, str], None] | None = None,
+    ) -> EventEnvelope:
+        """Ask the LLM for guidance on ``messages``; needs no database connection.
+
+        With ``on_reply`` the response is streamed, and it is called with the
+        returned event's id and the suggested reply so far as that grows.
+        """
+        event_id = uuid4()
+        if on_reply is None:
+            guidance = await self.llm_client.complete(
+                messages, schema=GuidanceResponse, priority="guidance", tenant=tenant_id
+            )
+        else:
+            guidance = await self.llm_client.complete_streaming(
+                messages,
+                schema=GuidanceResponse,
+                field="suggested_reply",
+                on_field=lambda text: on_reply(event_id, text),
+                priority="guidance",
+                tenant=tenant_id,
+            )
+
+        return EventEnvelope(
+            event_id=event_id,
             session_id=session_id,
             type="server.guidance_update",
-            ts_created=now,
+            ts_created=datetime.now(UTC),
             payload=guidance.model_dump(mode="json"),
-            server_seq=next_server_seq,
         )
 
-        db_event = CallEvent(
-            session_id=session_id,
-            event_id=envelope.event_id,
-            server_seq=next_server_seq,
-            type=envelope.type,
-            payload=envelope.payload,
-            created_at=now,
-        )
-        self.db.add(db_event)
-        await self.db.commit()
-        return envelope
-
     async def generate_summary(self, session_id: UUID) -> CallOutput:
         session_result = await self.db.execute(
             select(CallSession).where(CallSession.id == session_id)
@@ -126,7 +137,10 @@ class LLMService:
             },
             {"role": "user", "content": "\n".join(conversation_lines)},
         ]
-        summary_response = await self.llm_client.complete(messages, schema=CallSummaryResponse)
+        # End-of-call summaries yield to live guidance in the LLM scheduler.
+        summary_response = await self.llm_client.complete(
+            messages, schema=CallSummaryResponse, priority="summary", tenant=session.tenant_id
+        )
 
         session.status = "completed"
         session.ended_at = datetime.now(UTC)
@@ -1,21 +1,160 @@
+"""
+Single-pass PII scanner and redactor.
+
+Every entity starts at a digit run, an opening parenthesis or (for email) an
+``@``, so one cheap pass finds those candidate positions and the entity
+patterns are only tried there: the digit types as named groups of one
+combined pattern anchored at the candidate, email by extending the ``@`` to
+its surrounding address. A text is scanned once however many types are
+enabled, and the redacted string is rebuilt once from the spans found. Types
+with a validator (card numbers and the Luhn check) are re-scanned without
+that type when validation fails, so a digit run that is not a card can still
+be found as, say, a phone number.
+"""
+
 import re
+import string
+from collections.abc import Callable, Iterable
+from functools import cache
 from typing import Any
 
 from app.config import settings
 
+_CARD_SEPARATORS = str.maketrans("", "", " -")
+# Each digit mapped to the digit sum of its double, as the Luhn check needs.
+_LUHN_DOUBLED = str.maketrans("0123456789", "0246813579")
+
+
+def _luhn_valid(candidate: str) -> bool:
+    digits = candidate.translate(_CARD_SEPARATORS)
+    if not 13 <= len(digits) <= 19:
+        return False
+    doubled = digits[-2::-2].translate(_LUHN_DOUBLED)
+    return sum(map(int, digits[-1::-2] + doubled)) % 10 == 0
+
+
+def _capitalized(words: str) -> str:
+    """Regex alternation of ``words`` in Capitalized and UPPER form."""
+    return "|".join(form for word in words.split() for form in (word.capitalize(), word.upper()))
+
+
+_STREET_SUFFIXES = _capitalized(
+    "street avenue road boulevard lane drive court way place terrace circle parkway highway"
+)
+_STREET_ABBREVIATIONS = _capitalized("st ave rd blvd ln dr ct pl ter cir pkwy hwy")
+# Capitalized at the start of a sentence or in a title, never part of a street name.
+_NOT_STREET_NAMES = _capitalized(
+    "the an and or of in on at to for by from with my your our their his her its"
+    " this that these those is was we you they"
+)
+
+# Entity type -> (pattern, placeholder, validator). Order is match priority
+# when several types could start at the same position.
+PII_ENTITIES: dict[str, tuple[str, str, Callable[[str], bool] | None]] = {
+    "email": (r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b", "[EMAIL]", None),
+    "card": (r"(?<!\d)(?:\d[ -]?){12,18}\d(?!\d)", "[CARD]", _luhn_valid),
+    "ssn": (r"(?<!\d)(?!000|666|9\d\d)\d{3}-(?!00)\d{2}-(?!0000)\d{4}(?!\d)", "[SSN]", None),
+    "phone": (
+        r"(?<!\w)(?:\(\d{3}\)\s?\d{3}-\d{4}|\d{3}[-.\s]\d{3}[-.\s]\d{4})\b",
+        "[PHONE]",
+        None,
+    ),
+    # A house number, one to four capitalized name words (or ordinals such as
+    # "5th") and a capitalized street suffix. Lowercase words are ordinary
+    # speech: "the 2 best way to go" or "meet at 5 pm on 10 st" is not an address,
+    # and neither is "chapter 11 The Way". Only an abbreviated suffix takes the
+    # period after it; after "Street" it ends the sentence.
+    "address": (
+        rf"\b\d{{1,6}}(?:\s+(?!(?:{_NOT_STREET_NAMES})\b)"
+        r"(?:[A-Z][A-Za-z0-9.'-]*|\d+(?:st|nd|rd|th))){1,4}?\s+"
+        rf"(?:(?:{_STREET_SUFFIXES})\b|(?:{_STREET_ABBREVIATIONS})\b\.?)",
+        "[ADDRESS]",
+        None,
+    ),
+}
+
+# Every entity above needs a digit or an "@"; text without either is skipped.
+_PREFILTER = re.compile(r"[\d@]")
+# Where an entity can start. No digit entity starts inside a digit run, so a
+# run that matches nothing at its first digit is skipped whole.
+_CANDIDATES = re.compile(r"\d+|[(@]")
+_EMAIL = re.compile(PII_ENTITIES["email"][0])
+_EMAIL_LOCAL = frozenset(string.ascii_letters + string.digits + "._%+-")
+_EMAIL_DOMAIN = re.compile(r"[A-Za-z0-9.-]*")
+
+
+class PIISpan:
+    """Where one entity was found in the original text; carries no PII itself."""
+
+    __slots__ = ("kind", "start", "end")
+
+    def __init__(self, kind: str, start: int, end: int) -> None:
+        self.kind = kind
+        self.start = start
+        self.end = end
+
+    def to_dict(self) -> dict:
+        return {"type": self.kind, "start": self.start, "end": self.end}
+
+
+def apply_spans(text: str, spans: list[PIISpan]) -> str:
+    """Rebuild ``text`` with each of the ordered, non-overlapping ``spans`` replaced."""
+    if not spans:
+        return text
+    parts: list[str] = []
+    position = 0
+    for span in spans:
+        parts.append(text[position : span.start])
+        parts.append(PII_ENTITIES[span.kind][1])
+        position = span.end
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+@cache
+def _scanner(kinds: tuple[str, ...]) -> re.Pattern | None:
+    """Combined pattern for the enabled digit-started types, tried at candidates only."""
+    kinds = tuple(kind for kind in kinds if kind != "email")
+    if not kinds:
+        return None
+    return re.compile("|".join(f"(?P<{kind}>{PII_ENTITIES[kind][0]})" for kind in kinds))
+
+
+def _email_around(text: str, at: int, floor: int) -> re.Match | None:
+    """The email whose ``@`` is at ``at``, starting no earlier than ``floor``."""
+    begin = at
+    while begin > floor and text[begin - 1] in _EMAIL_LOCAL:
+        begin -= 1
+    if begin == at:
+        return None
+    # One character past the domain so the trailing \b still sees what follows.
+    endpos = _EMAIL_DOMAIN.match(text, at + 1).end() + 1
+    return _EMAIL.search(text, begin, endpos)
+
 
 class PIIService:
-    _EMAIL_REGEX = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
-    _PHONE_REGEX = re.compile(
-        r"\b(?:\(\d{3}\)\s?\d{3}-\d{4}|\d{3}[-.\s]\d{3}[-.\s]\d{4})\b"
-    )
+    def __init__(self, entity_types: Iterable[str] | None = None) -> None:
+        kinds = settings.pii_entity_types if entity_types is None else entity_types
+        enabled = set(kinds)
+        self._kinds = tuple(kind for kind in PII_ENTITIES if kind in enabled)
+
+    @property
+    def entity_types(self) -> tuple[str, ...]:
+        return self._kinds
+
+    def scan(self, text: str) -> list[PIISpan]:
+        """Find every enabled entity in ``text`` in one pass, in text order."""
+        if settings.pii_redaction_mode == "off" or not _PREFILTER.search(text):
+            return []
+        return self._scan(text, self._kinds, 0)
+
+    def redact_with_spans(self, text: str) -> tuple[str, list[PIISpan]]:
+        """Replace each entity with its placeholder; spans refer to the original text."""
+        spans = self.scan(text)
+        return apply_spans(text, spans), spans
 
     def redact(self, text: str) -> str:
-        if settings.pii_redaction_mode == "off":
-            return text
-        redacted = self._EMAIL_REGEX.sub("[EMAIL]", text)
-        redacted = self._PHONE_REGEX.sub("[PHONE]", redacted)
-        return redacted
+        return self.redact_with_spans(text)[0]
 
     def redact_dict(self, data: dict) -> dict:
         def _walk(value: Any):
@@ -28,3 +167,62 @@ class PIIService:
             return value
 
         return _walk(data)
+
+    def redact_dict_with_spans(self, data: dict) -> tuple[dict, list[dict]]:
+        """Redact every string in ``data``; audit entries name the key path of each span."""
+        audit: list[dict] = []
+
+        def _walk(value: Any, path: str):
+            if isinstance(value, str):
+                redacted, spans = self.redact_with_spans(value)
+                for span in spans:
+                    audit.append({"path": path, **span.to_dict()})
+                return redacted
+            if isinstance(value, dict):
+                return {k: _walk(v, f"{path}.{k}" if path else str(k)) for k, v in value.items()}
+            if isinstance(value, list):
+                return [_walk(item, f"{path}[{index}]") for index, item in enumerate(value)]
+            return value
+
+        return _walk(data, ""), audit
+
+    def _scan(self, text: str, kinds: tuple[str, ...], offset: int) -> list[PIISpan]:
+        scanner = _scanner(kinds)
+        email = "email" in kinds
+        spans: list[PIISpan] = []
+        position = 0
+        while candidate := _CANDIDATES.search(text, position):
+            start = candidate.start()
+            position = candidate.end()
+            if text[start] == "@":
+                if email:
+                    self._add_email(text, start, offset, spans)
+                    if spans and spans[-1].kind == "email":
+                        position = max(position, spans[-1].end - offset)
+                continue
+            if scanner is None or not (match := scanner.match(text, start)):
+                continue
+            position = match.end()
+            kind = match.lastgroup
+            validator = PII_ENTITIES[kind][2]
+            if validator is not None and not validator(match.group()):
+                remaining = tuple(other for other in kinds if other != kind)
+                spans.extend(self._scan(match.group(), remaining, offset + start))
+                continue
+            spans.append(PIISpan(kind, offset + start, offset + position))
+        return spans
+
+    @staticmethod
+    def _add_email(text: str, at: int, offset: int, spans: list[PIISpan]) -> None:
+        """Add the email around ``at``; it wins over spans found from the same start on."""
+        match = _email_around(text, at, 0)
+        if match is None:
+            return
+        while spans and spans[-1].start >= offset + match.start():
+            spans.pop()
+        if spans and spans[-1].end > offset + match.start():
+            # An earlier entity overlaps the local part; only what follows it counts.
+            match = _email_around(text, at, spans[-1].end - offset)
+            if match is None:
+                return
+        spans.append(PIISpan("email", offset + match.start(), offset + match.end()))
@@ -0,0 +1,81 @@
+"""
+Bounded per-session buffer of serialized outbound frames for client.resume.
+"""
+
+from collections import deque
+
+
+class ReplayBuffer:
+    """Keeps the most recent sequenced frames of a session, bounded by count and bytes.
+
+    ``floor_seq`` is the invariant that makes the buffer usable for resume: every
+    event with ``server_seq > floor_seq`` that this process broadcast is held in
+    the buffer. Evicting a frame raises the floor to that frame's seq.
+    """
+
+    __slots__ = ("floor_seq", "_frames", "_bytes", "_max_events", "_max_bytes")
+
+    def __init__(self, floor_seq: int, max_events: int, max_bytes: int) -> None:
+        self.floor_seq = floor_seq
+        self._frames: deque[tuple[int, str]] = deque()
+        self._bytes = 0
+        self._max_events = max_events
+        self._max_bytes = max_bytes
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def append(self, server_seq: int, frame: str) -> None:
+        if server_seq <= self.floor_seq:
+            return
+        frames = self._frames
+        if not frames or frames[-1][0] < server_seq:
+            frames.append((server_seq, frame))
+        else:
+            # Concurrent producers (e.g. guidance vs. transcript) can finish out of order.
+            index = len(frames)
+            while index and frames[index - 1][0] > server_seq:
+                index -= 1
+            if index and frames[index - 1][0] == server_seq:
+                return
+            frames.insert(index, (server_seq, frame))
+        self._bytes += len(frame)
+
+        while frames and (len(frames) > self._max_events or self._bytes > self._max_bytes):
+            evicted_seq, evicted = frames.popleft()
+            self._bytes -= len(evicted)
+            self.floor_seq = evicted_seq
+
+    def get(self, server_seq: int) -> str | None:
+        index = self._index(server_seq)
+        return self._frames[index][1] if index is not None else None
+
+    def replace(self, server_seq: int, frame: str) -> bool:
+        """Swap the held frame for ``server_seq`` (e.g. a corrected redaction)."""
+        index = self._index(server_seq)
+        if index is None:
+            return False
+        self._bytes += len(frame) - len(self._frames[index][1])
+        self._frames[index] = (server_seq, frame)
+        return True
+
+    def _index(self, server_seq: int) -> int | None:
+        # Corrections target recent frames, so search from the newest end.
+        frames = self._frames
+        for index in range(len(frames) - 1, -1, -1):
+            seq = frames[index][0]
+            if seq == server_seq:
+                return index
+            if seq < server_seq:
+                break
+        return None
+
+    def frames_after(self, server_seq: int) -> list[str] | None:
+        """Frames with seq > ``server_seq``, or None if part of that range was evicted."""
+        if server_seq < self.floor_seq:
+            return None
+        return [frame for seq, frame in self._frames if seq > server_seq]
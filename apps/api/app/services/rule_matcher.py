@@ -0,0 +1,177 @@
+"""
+Single-pass matcher over a compiled rule pack.
+
+Literal patterns (the vast majority: competitor names, phrases) are matched
+together by one Aho-Corasick automaton in a single scan of the text. The
+remaining regex patterns are guarded by one combined alternation, so a segment
+that matches none of them costs one extra scan rather than one per pattern.
+Results are identical to evaluating each rule's patterns in order with
+``re.search(pattern, text, re.IGNORECASE)`` and stopping at the first match.
+"""
+
+import re
+from collections.abc import Collection, Iterable
+
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+_BACKREFERENCE = re.compile(r"\\\d|\(\?P=")
+
+
+class CompiledRule:
+    """A rule with its patterns compiled once at load time."""
+
+    __slots__ = ("rule_id", "kind", "config", "patterns")
+
+    def __init__(
+        self, rule_id: str, kind: str, config: dict, patterns: list[tuple[str, re.Pattern]]
+    ) -> None:
+        self.rule_id = rule_id
+        self.kind = kind
+        self.config = config
+        self.patterns = patterns
+
+
+def is_literal(pattern: str) -> bool:
+    """True if ``pattern`` matches itself verbatim (ASCII, no regex syntax)."""
+    return pattern.isascii() and not any(char in _REGEX_METACHARS for char in pattern)
+
+
+class AhoCorasick:
+    """Finds every keyword occurring in a text (overlaps included) in one pass."""
+
+    def __init__(self, keywords: list[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        outputs: list[list[int]] = [[]]
+
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(index)
+
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                outputs[child].extend(outputs[self._fail[child]])
+                queue.append(child)
+
+        self._outputs: list[tuple[int, ...]] = [tuple(output) for output in outputs]
+
+    def find_all(self, text: str) -> set[int]:
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        found: set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+
+class RuleMatcher:
+    """Matches all rules of a pack against a text in (mostly) one scan."""
+
+    def __init__(self, rules: list[CompiledRule]) -> None:
+        self.rules = rules
+        keyword_ids: dict[str, int] = {}
+        literal_owners: list[set[int]] = []
+        self._literal_ids: list[list[int | None]] = []
+        regex_sources: list[str] = []
+        regex_rules: set[int] = set()
+        unguarded_rules: set[int] = set()
+
+        for rule_index, rule in enumerate(rules):
+            ids: list[int | None] = []
+            for source, _compiled in rule.patterns:
+                if is_literal(source):
+                    keyword = source.lower()
+                    keyword_id = keyword_ids.get(keyword)
+                    if keyword_id is None:
+                        keyword_id = keyword_ids[keyword] = len(literal_owners)
+                        literal_owners.append(set())
+                    literal_owners[keyword_id].add(rule_index)
+                    ids.append(keyword_id)
+                else:
+                    ids.append(None)
+                    if _BACKREFERENCE.search(source):
+                        unguarded_rules.add(rule_index)
+                    else:
+                        regex_rules.add(rule_index)
+                        regex_sources.append(source)
+            self._literal_ids.append(ids)
+
+        self._literal_owners = literal_owners
+        self._automaton = AhoCorasick(list(keyword_ids))
+        self._empty_keyword = keyword_ids.get("")
+        self._unguarded_rules = unguarded_rules
+        self._regex_rules = regex_rules
+        self._regex_guard: re.Pattern | None = None
+        if regex_sources:
+            try:
+                self._regex_guard = re.compile(
+                    "|".join(f"(?:{source})" for source in regex_sources), re.IGNORECASE
+                )
+            except re.error:
+                # e.g. duplicate group names across patterns: evaluate individually.
+                self._unguarded_rules |= regex_rules
+                self._regex_rules = set()
+
+    def match(
+        self, text: str, skip_rule_ids: Collection[str] = ()
+    ) -> list[tuple[CompiledRule, str]]:
+        """Return ``(rule, first matching pattern)`` for each matching rule, in rule order.
+
+        Rules whose id is in ``skip_rule_ids`` are not evaluated at all.
+        """
+        if not text.isascii():
+            # Lower-casing non-ASCII text does not mirror re.IGNORECASE exactly.
+            return self._match_rules(range(len(self.rules)), text, None, skip_rule_ids)
+
+        found = self._automaton.find_all(text.lower())
+        if self._empty_keyword is not None:
+            found.add(self._empty_keyword)
+        candidates = set(self._unguarded_rules)
+        for keyword_id in found:
+            candidates |= self._literal_owners[keyword_id]
+        if self._regex_rules and self._regex_guard.search(text):
+            candidates |= self._regex_rules
+        return self._match_rules(sorted(candidates), text, found, skip_rule_ids)
+
+    def _match_rules(
+        self,
+        rule_indexes: Iterable[int],
+        text: str,
+        found: set[int] | None,
+        skip_rule_ids: Collection[str],
+    ) -> list[tuple[CompiledRule, str]]:
+        matches: list[tuple[CompiledRule, str]] = []
+        for rule_index in rule_indexes:
+            rule = self.rules[rule_index]
+            if rule.rule_id in skip_rule_ids:
+                continue
+            literal_ids = self._literal_ids[rule_index]
+            for (source, compiled), keyword_id in zip(rule.patterns, literal_ids, strict=True):
+                if keyword_id is not None and found is not None:
+                    matched = keyword_id in found
+                else:
+                    matched = compiled.search(text) is not None
+                if matched:
+                    matches.append((rule, source))
+                    break
+        return matches
@@ -1,81 +1,243 @@
 import re
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import UTC, datetime
 
+import structlog
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.config import settings
 from app.db import async_session
+from app.metrics import metrics
+from app.models.call_event import CallEvent
+from app.models.call_session import CallSession
 from app.models.ruleset import Rule, RuleSet
 from app.schemas.events import EventEnvelope
+from app.services.pii_service import PIIService
+from app.services.rule_matcher import CompiledRule, RuleMatcher
+
+logger = structlog.get_logger()
+
+# (tenant_id, org_id, location_id, campaign_id)
+RuleScope = tuple[str | None, str | None, str | None, str | None]
+
+
+def rule_scope(session: CallSession) -> RuleScope:
+    return (session.tenant_id, session.org_id, session.location_id, session.campaign_id)
+
+
+def text_source(rule: CompiledRule) -> str:
+    """Which transcript text a rule is matched against: ``raw`` (default) or ``redacted``.
+
+    Redacted text has PII replaced by placeholders such as ``[PHONE]``, so a
+    rule can react to PII being mentioned without ever seeing the value.
+    """
+    return "redacted" if rule.config.get("text_source") == "redacted" else "raw"
+
+
+class RulePack:
+    """Compiled rules for one scope, tagged with the ruleset versions they came from."""
+
+    __slots__ = ("rules", "matcher", "redacted_matcher", "fingerprint", "checked_at")
+
+    def __init__(
+        self, rules: list[CompiledRule], fingerprint: tuple, checked_at: float
+    ) -> None:
+        self.rules = rules
+        self.matcher = RuleMatcher([rule for rule in rules if text_source(rule) == "raw"])
+        redacted = [rule for rule in rules if text_source(rule) == "redacted"]
+        self.redacted_matcher = RuleMatcher(redacted) if redacted else None
+        self.fingerprint = fingerprint
+        self.checked_at = checked_at
+
+
+class SessionRuleState:
+    """Per-session rule progress: satisfied questions and last alert time per rule."""
+
+    __slots__ = ("satisfied_questions", "last_alert_at")
+
+    def __init__(self) -> None:
+        self.satisfied_questions: set[str] = set()
+        self.last_alert_at: dict[str, datetime] = {}
+
+    def in_cooldown(self, rule: CompiledRule, now: datetime) -> bool:
+        last = self.last_alert_at.get(rule.rule_id)
+        if last is None:
+            return False
+        return (now - last).total_seconds() < _alert_cooldown_seconds(rule)
+
+    def record(self, event: EventEnvelope) -> None:
+        rule_id = str(event.payload.get("rule_id", ""))
+        if event.type == "server.required_question_status" and event.payload.get("satisfied"):
+            self.satisfied_questions.add(rule_id)
+        elif event.type == "server.rule_alert":
+            self.last_alert_at[rule_id] = event.ts_created
+
+
+async def load_rule_state(db: AsyncSession, session_id) -> SessionRuleState:
+    """Rebuild a session's rule state from its persisted rule events."""
+    state = SessionRuleState()
+    rows = await db.execute(
+        select(CallEvent)
+        .where(
+            CallEvent.session_id == session_id,
+            CallEvent.type.in_(["server.rule_alert", "server.required_question_status"]),
+        )
+        .order_by(CallEvent.server_seq.asc())
+    )
+    for row in rows.scalars():
+        state.record(
+            EventEnvelope(
+                event_id=row.event_id,
+                session_id=session_id,
+                type=row.type,
+                ts_created=row.created_at,
+                payload=row.payload or {},
+                server_seq=row.server_seq,
+            )
+        )
+    return state
+
+
+def _alert_cooldown_seconds(rule: CompiledRule) -> float:
+    """Keyword alerts default to the global cooldown; prohibited claims always alert."""
+    default = settings.rule_alert_cooldown_seconds if rule.kind == "keyword_alert" else 0.0
+    try:
+        return float(rule.config.get("cooldown_seconds", default))
+    except (TypeError, ValueError):
+        return default
+
+
+_rule_pack_cache: dict[RuleScope, RulePack] = {}
+
+
+def invalidate_rule_packs() -> None:
+    """Drop every cached rule pack (e.g. after editing rules without a version bump)."""
+    _rule_pack_cache.clear()
 
 
 class RuleService:
-    def __init__(self, db: AsyncSession | None = None):
+    def __init__(
+        self,
+        db: AsyncSession | None = None,
+        session_factory: async_sessionmaker[AsyncSession] = async_session,
+    ):
         self.db = db
+        self._session_factory = session_factory
 
     async def evaluate_segment(
-        self, session_id, tenant_id: str | None, text: str
+        self,
+        session_id,
+        scope: RuleScope,
+        text: str,
+        state: SessionRuleState | None = None,
+        redacted_text: str | None = None,
     ) -> list[EventEnvelope]:
+        """Evaluate one segment against the scope's rules.
+
+        ``text`` is the raw segment; rules with ``text_source: redacted`` see
+        ``redacted_text`` instead, which callers that already redacted the
+        segment pass in (otherwise it is redacted here, only if needed).
+
+        With a ``state``, already-satisfied required questions are not evaluated,
+        alerts still inside their cooldown window are suppressed, and every
+        returned event is recorded into the state.
+        """
         events: list[EventEnvelope] = []
-        if self.db is not None:
-            rules = await self._load_rules(self.db, tenant_id)
-        else:
-            async with async_session() as db:
-                rules = await self._load_rules(db, tenant_id)
+        pack = await self.get_rule_pack(scope)
+        skip_rule_ids = state.satisfied_questions if state is not None else ()
+        now = datetime.now(UTC)
+
+        matches = pack.matcher.match(text, skip_rule_ids)
+        if pack.redacted_matcher is not None:
+            if redacted_text is None:
+                redacted_text = PIIService().redact(text)
+            matches += pack.redacted_matcher.match(redacted_text, skip_rule_ids)
 
-        for rule in rules:
-            rule_id = str(rule.config.get("id", str(rule.id)))
+        for rule, pattern in matches:
+            rule_id = rule.rule_id
             kind = rule.kind
 
             if kind in {"keyword_alert", "prohibited_claim"}:
-                patterns = rule.config.get("patterns", [])
-                for pattern in patterns:
-                    try:
-                        matched = re.search(pattern, text, re.IGNORECASE)
-                    except re.error:
-                        continue
-                    if matched:
-                        events.append(
-                            EventEnvelope(
-                                session_id=session_id,
-                                type="server.rule_alert",
-                                ts_created=datetime.now(UTC),
-                                payload={
-                                    "rule_id": rule_id,
-                                    "kind": kind,
-                                    "severity": rule.config.get("severity", "info"),
-                                    "message": rule.config.get("message", ""),
-                                    "matched_pattern": pattern,
-                                },
-                            )
-                        )
-                        break
+                if state is not None and state.in_cooldown(rule, now):
+                    continue
+                events.append(
+                    EventEnvelope(
+                        session_id=session_id,
+                        type="server.rule_alert",
+                        ts_created=now,
+                        payload={
+                            "rule_id": rule_id,
+                            "kind": kind,
+                            "severity": rule.config.get("severity", "info"),
+                            "message": rule.config.get("message", ""),
+                            "matched_pattern": pattern,
+                        },
+                    )
+                )
 
             if kind == "required_question":
-                patterns = rule.config.get("satisfy_patterns", [])
-                for pattern in patterns:
-                    try:
-                        matched = re.search(pattern, text, re.IGNORECASE)
-                    except re.error:
-                        continue
-                    if matched:
-                        events.append(
-                            EventEnvelope(
-                                session_id=session_id,
-                                type="server.required_question_status",
-                                ts_created=datetime.now(UTC),
-                                payload={
-                                    "rule_id": rule_id,
-                                    "satisfied": True,
-                                    "question": rule.config.get("question", rule_id),
-                                },
-                            )
-                        )
-                        break
+                events.append(
+                    EventEnvelope(
+                        session_id=session_id,
+                        type="server.required_question_status",
+                        ts_created=now,
+                        payload={
+                            "rule_id": rule_id,
+                            "satisfied": True,
+                            "question": rule.config.get("question", rule_id),
+                        },
+                    )
+                )
 
+        if state is not None:
+            for event in events:
+                state.record(event)
         return events
 
-    async def _load_rules(self, db: AsyncSession, tenant_id: str | None) -> list[Rule]:
+    async def get_rule_pack(self, scope: RuleScope) -> RulePack:
+        """Return the compiled rule pack for ``scope``.
+
+        Cached packs are served without DB access until they are older than
+        ``rule_pack_revalidate_seconds``; then one cheap query over ``rulesets``
+        checks ids/versions and the pack is recompiled only if they changed.
+        """
+        now = time.monotonic()
+        pack = _rule_pack_cache.get(scope)
+        if pack is not None and now - pack.checked_at < settings.rule_pack_revalidate_seconds:
+            metrics.increment("rule_pack.cache_hits")
+            return pack
+
+        async with self._session() as db:
+            fingerprint = await self._load_fingerprint(db, scope)
+            if pack is not None and pack.fingerprint == fingerprint:
+                metrics.increment("rule_pack.revalidated")
+                pack.checked_at = now
+                return pack
+            rules = await self._load_rules(db, scope)
+
+        metrics.increment("rule_pack.cache_misses")
+        pack = RulePack(_compile_rules(rules), fingerprint, now)
+        _rule_pack_cache[scope] = pack
+        return pack
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        if self.db is not None:
+            yield self.db
+        else:
+            async with self._session_factory() as db:
+                yield db
+
+    async def _load_fingerprint(self, db: AsyncSession, scope: RuleScope) -> tuple:
+        stmt = _scope_filter(
+            select(RuleSet.id, RuleSet.version).where(RuleSet.status == "active"), scope
+        )
+        return tuple(sorted((str(row.id), row.version) for row in await db.execute(stmt)))
+
+    async def _load_rules(self, db: AsyncSession, scope: RuleScope) -> list[Rule]:
         rules_stmt = (
             select(Rule)
             .join(RuleSet, Rule.ruleset_id == RuleSet.id)
@@ -83,9 +245,33 @@ class RuleService:
                 Rule.enabled.is_(True),
                 RuleSet.status == "active",
             )
+            .order_by(RuleSet.created_at, Rule.id)
         )
-        if tenant_id:
-            rules_stmt = rules_stmt.where(
-                (RuleSet.tenant_id == tenant_id) | (RuleSet.tenant_id.is_(None))
-            )
-        return (await db.execute(rules_stmt)).scalars().all()
+        return (await db.execute(_scope_filter(rules_stmt, scope))).scalars().all()
+
+
+def _scope_filter(stmt, scope: RuleScope):
+    """Match rulesets that are unscoped or equal to the session on each dimension."""
+    columns = (RuleSet.tenant_id, RuleSet.org_id, RuleSet.location_id, RuleSet.campaign_id)
+    for column, value in zip(columns, scope, strict=True):
+        if value:
+            stmt = stmt.where((column == value) | (column.is_(None)))
+    return stmt
+
+
+def _compile_rules(rules: list[Rule]) -> list[CompiledRule]:
+    compiled_rules: list[CompiledRule] = []
+    for rule in rules:
+        config = rule.config or {}
+        rule_id = str(config.get("id", str(rule.id)))
+        key = "satisfy_patterns" if rule.kind == "required_question" else "patterns"
+        patterns: list[tuple[str, re.Pattern]] = []
+        for pattern in config.get(key, []):
+            try:
+                patterns.append((pattern, re.compile(pattern, re.IGNORECASE)))
+            except (re.error, TypeError) as exc:
+                logger.warning(
+                    "rule_pattern_invalid", rule_id=rule_id, pattern=str(pattern), error=str(exc)
+                )
+        compiled_rules.append(CompiledRule(rule_id, rule.kind, config, patterns))
+    return compiled_rules
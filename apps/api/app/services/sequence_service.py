@@ -0,0 +1,67 @@
+"""
+Per-session server_seq allocation owned by the process handling the session.
+"""
+
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.call_event import CallEvent
+
+
+class SequenceAllocator:
+    """Hands out monotonically increasing server_seq values for one session."""
+
+    def __init__(self, last_seq: int = 0) -> None:
+        self._last_seq = last_seq
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def next(self) -> int:
+        self._last_seq += 1
+        return self._last_seq
+
+    def observe(self, seq: int) -> None:
+        """Move past a server_seq that was assigned somewhere else."""
+        if seq > self._last_seq:
+            self._last_seq = seq
+
+
+_allocators: dict[uuid.UUID, SequenceAllocator] = {}
+
+
+def get_allocator(session_id: uuid.UUID) -> SequenceAllocator | None:
+    return _allocators.get(session_id)
+
+
+async def load_max_server_seq(db: AsyncSession, session_id: uuid.UUID) -> int:
+    result = await db.execute(
+        select(func.max(CallEvent.server_seq)).where(CallEvent.session_id == session_id)
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def seed_allocator(db: AsyncSession, session_id: uuid.UUID) -> SequenceAllocator:
+    """Return the session's allocator, seeding it from the DB on first use."""
+    allocator = _allocators.get(session_id)
+    if allocator is not None:
+        return allocator
+
+    max_seq = await load_max_server_seq(db, session_id)
+    allocator = _allocators.setdefault(session_id, SequenceAllocator(max_seq))
+    allocator.observe(max_seq)
+    return allocator
+
+
+async def reseed_allocator(db: AsyncSession, session_id: uuid.UUID) -> SequenceAllocator:
+    """Re-read MAX(server_seq) after a conflict and move the allocator past it."""
+    allocator = await seed_allocator(db, session_id)
+    allocator.observe(await load_max_server_seq(db, session_id))
+    return allocator
+
+
+def release_allocator(session_id: uuid.UUID) -> None:
+    _allocators.pop(session_id, None)
@@ -0,0 +1,251 @@
+"""
+Ordered per-session worker for everything that follows persisting an event.
+
+The receive loop only persists and acks; broadcasting, rule evaluation and
+guidance scheduling run here. Events are submitted to the writer and queued
+in one synchronous step, so queue order is server_seq order, and the worker
+broadcasts strictly in queue order. Rule alerts raised while processing an
+item are submitted the same way and land behind everything already queued.
+Ephemeral events (interim transcript) are never written; they are queued
+with no durable future so they still go out in order with persisted ones.
+Redaction corrections for earlier segments ride on the item whose text
+completed the entity and are applied when it is processed.
+
+A ``uq_session_seq`` conflict makes the writer retry an event under a new,
+later server_seq, so its place in the queue is no longer its place in seq
+order. Each item remembers the seq allocated when it was submitted, which a
+retry can only raise; a retried item is moved back behind the items with
+lower seqs before it is broadcast, as clients drop anything at or below the
+last seq they saw.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+import structlog
+
+from app.metrics import metrics
+from app.schemas.events import EventEnvelope
+from app.services.event_writer import EventWriter, event_writer
+from app.services.llm_client import LLMClient
+from app.services.rule_service import RuleScope
+from app.services.sequence_service import get_allocator
+from app.services.streaming_redactor import RedactionCorrection
+
+logger = structlog.get_logger()
+
+
+class PipelineItem:
+    """One event waiting to be broadcast (and maybe evaluated); ephemeral if not ``durable``."""
+
+    __slots__ = (
+        "event",
+        "durable",
+        "scope",
+        "rule_text",
+        "llm_client",
+        "corrections",
+        "expected_seq",
+        "enqueued_at",
+    )
+
+    def __init__(
+        self,
+        event: EventEnvelope,
+        durable: asyncio.Future[int] | None,
+        scope: RuleScope | None,
+        rule_text: str,
+        llm_client: LLMClient | None,
+        corrections: list[RedactionCorrection] | tuple = (),
+        expected_seq: int | None = None,
+    ) -> None:
+        self.event = event
+        self.durable = durable
+        self.scope = scope
+        self.rule_text = rule_text
+        self.llm_client = llm_client
+        self.corrections = corrections
+        # Seq allocated at submit (None if the allocator was still being
+        # seeded); the stored seq is never lower except for a duplicate event.
+        self.expected_seq = expected_seq
+        self.enqueued_at = time.perf_counter()
+
+
+class SessionPipeline:
+    """FIFO worker for one session; its task exists only while items are queued."""
+
+    __slots__ = ("session_id", "_handler", "_writer", "_items", "_task")
+
+    def __init__(
+        self,
+        session_id: uuid.UUID,
+        handler: Callable[[uuid.UUID, PipelineItem, int | None], Awaitable[None]],
+        writer: EventWriter | None = None,
+    ) -> None:
+        self.session_id = session_id
+        self._handler = handler
+        self._writer = event_writer if writer is None else writer
+        self._items: deque[PipelineItem] = deque()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def submit(
+        self,
+        event: EventEnvelope,
+        stored_payload: dict,
+        created_at: datetime | None = None,
+        scope: RuleScope | None = None,
+        rule_text: str = "",
+        llm_client: LLMClient | None = None,
+        corrections: list[RedactionCorrection] | tuple = (),
+    ) -> asyncio.Future[int]:
+        """Persist ``event`` and queue its broadcast; resolves with its server_seq.
+
+        ``stored_payload`` is what gets written, ``event`` what gets broadcast.
+        A ``scope`` runs the rule pack on ``rule_text``; an ``llm_client``
+        schedules guidance afterwards.
+        """
+        expected_seq = self._next_seq()
+        durable = self._writer.submit(
+            self.session_id, event.event_id, event.type, stored_payload, created_at
+        )
+        self._items.append(
+            PipelineItem(event, durable, scope, rule_text, llm_client, corrections, expected_seq)
+        )
+        self._ensure_draining()
+        return durable
+
+    def submit_many(
+        self,
+        events: list[tuple[EventEnvelope, dict, RuleScope | None, str, list[RedactionCorrection]]],
+        llm_client: LLMClient | None = None,
+    ) -> list[asyncio.Future[int]]:
+        """``submit`` for ``(event, stored_payload, scope, rule_text, corrections)`` tuples.
+
+        The events are written in one transaction with consecutive server_seqs
+        and guidance is scheduled once, after the last of them.
+        """
+        first_seq = self._next_seq()
+        durables = self._writer.submit_many(
+            self.session_id,
+            [(event.event_id, event.type, stored, None) for event, stored, *_ in events],
+        )
+        last = len(events) - 1
+        for index, ((event, _, scope, rule_text, corrections), durable) in enumerate(
+            zip(events, durables, strict=True)
+        ):
+            self._items.append(
+                PipelineItem(
+                    event,
+                    durable,
+                    scope,
+                    rule_text,
+                    llm_client if index == last else None,
+                    corrections,
+                    None if first_seq is None else first_seq + index,
+                )
+            )
+        self._ensure_draining()
+        return durables
+
+    def publish(self, event: EventEnvelope) -> None:
+        """Queue an ephemeral ``event`` for broadcast without persisting it.
+
+        If the newest queued item is an ephemeral event of the same type and
+        speaker, it has not gone out yet and is replaced instead.
+        """
+        items = self._items
+        if items:
+            last = items[-1]
+            if (
+                last.durable is None
+                and last.event.type == event.type
+                and last.event.payload.get("speaker") == event.payload.get("speaker")
+            ):
+                last.event = event
+                return
+        items.append(PipelineItem(event, None, None, "", None))
+        self._ensure_draining()
+
+    def _next_seq(self) -> int | None:
+        """The seq the writer allocates next; it allocates synchronously on submit."""
+        allocator = get_allocator(self.session_id)
+        return None if allocator is None else allocator.last_seq + 1
+
+    def _requeue_in_seq_order(self, item: PipelineItem, server_seq: int) -> bool:
+        """Put an item retried under a later seq behind the items with lower seqs.
+
+        False if nothing queued comes before it, so it can be broadcast now.
+        """
+        item.expected_seq = server_seq
+        items = self._items
+        position = 0
+        for queued in items:
+            if queued.durable is not None and (
+                queued.expected_seq is None or queued.expected_seq > server_seq
+            ):
+                break
+            position += 1
+        if position == 0:
+            return False
+        items.insert(position, item)
+        metrics.increment("pipeline.requeued_after_seq_conflict")
+        return True
+
+    def _ensure_draining(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._drain())
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._items.clear()
+
+    async def _drain(self) -> None:
+        items = self._items
+        try:
+            while items:
+                item = items[0]
+                try:
+                    server_seq = (
+                        await asyncio.shield(item.durable) if item.durable is not None else None
+                    )
+                except Exception as exc:
+                    # The submitter sees the same error; nothing to broadcast.
+                    logger.warning(
+                        "pipeline_event_not_persisted",
+                        session_id=str(self.session_id),
+                        event_type=item.event.type,
+                        error=str(exc),
+                    )
+                    items.popleft()
+                    continue
+                items.popleft()
+                if (
+                    server_seq is not None
+                    and item.expected_seq is not None
+                    and server_seq > item.expected_seq
+                    and self._requeue_in_seq_order(item, server_seq)
+                ):
+                    continue
+                metrics.observe(
+                    "pipeline.queue_wait_ms", (time.perf_counter() - item.enqueued_at) * 1000
+                )
+                try:
+                    await self._handler(self.session_id, item, server_seq)
+                except Exception as exc:
+                    logger.error(
+                        "pipeline_item_failed",
+                        session_id=str(self.session_id),
+                        event_type=item.event.type,
+                        error=str(exc),
+                    )
+        finally:
+            self._task = None
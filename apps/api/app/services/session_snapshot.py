@@ -0,0 +1,80 @@
+"""
+Materialized per-session state used to answer large resume gaps with one frame.
+"""
+
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.call_event import CallEvent
+
+TRANSCRIPT_EVENT_TYPES = {"client.transcript_segment", "client.transcript_final"}
+
+
+class SessionSnapshot:
+    """Transcript so far, rule statuses and latest guidance, folded from events."""
+
+    __slots__ = ("server_seq", "transcript", "alerts", "required_questions", "guidance")
+
+    def __init__(self) -> None:
+        self.server_seq = 0
+        self.transcript: list[dict] = []
+        self.alerts: dict[str, dict] = {}
+        self.required_questions: dict[str, dict] = {}
+        self.guidance: dict | None = None
+
+    def apply(self, event_type: str, payload: dict, server_seq: int | None) -> None:
+        if server_seq is not None:
+            if server_seq <= self.server_seq and self._has_transcript_seq(server_seq):
+                return  # re-broadcast of a retried client event
+            self.server_seq = max(self.server_seq, server_seq)
+
+        if event_type in TRANSCRIPT_EVENT_TYPES:
+            self.transcript.append(
+                {
+                    "server_seq": server_seq,
+                    "type": event_type,
+                    "speaker": payload.get("speaker"),
+                    "text": payload.get("text"),
+                    "timestamp_ms": payload.get("timestamp_ms"),
+                    "is_final": payload.get("is_final", True),
+                }
+            )
+        elif event_type == "server.rule_alert":
+            self.alerts[str(payload.get("rule_id", ""))] = payload
+        elif event_type == "server.required_question_status":
+            self.required_questions[str(payload.get("rule_id", ""))] = payload
+        elif event_type == "server.guidance_update":
+            self.guidance = payload
+
+    def correct_text(self, server_seq: int, text: str) -> None:
+        """Replace a transcript entry's text, e.g. with a wider redaction."""
+        for entry in reversed(self.transcript):
+            if entry["server_seq"] == server_seq:
+                entry["text"] = text
+                return
+
+    def _has_transcript_seq(self, server_seq: int) -> bool:
+        return any(entry["server_seq"] == server_seq for entry in reversed(self.transcript))
+
+    def to_payload(self) -> dict:
+        return {
+            "transcript": sorted(self.transcript, key=lambda entry: entry["server_seq"] or 0),
+            "alerts": list(self.alerts.values()),
+            "required_questions": list(self.required_questions.values()),
+            "guidance": self.guidance,
+        }
+
+
+async def load_snapshot(db: AsyncSession, session_id: uuid.UUID) -> SessionSnapshot:
+    """Rebuild a session's snapshot from its persisted events."""
+    snapshot = SessionSnapshot()
+    rows = await db.execute(
+        select(CallEvent.type, CallEvent.payload, CallEvent.server_seq)
+        .where(CallEvent.session_id == session_id)
+        .order_by(CallEvent.server_seq.asc())
+    )
+    for event_type, payload, server_seq in rows.all():
+        snapshot.apply(event_type, payload or {}, server_seq)
+    return snapshot
@@ -0,0 +1,207 @@
+"""
+Incremental PII redaction across transcript segment boundaries.
+
+Speech-to-text splits an utterance wherever the speaker pauses, so a phone
+number read out as "five five five" / "one two three four five six seven"
+arrives as two segments, neither of which is PII on its own. The redactor
+keeps a short carry-over of each speaker's latest raw text and scans it
+together with the next segment, so earlier text is re-scanned only as far as
+that tail. Runs with spelled-out digits are classified by length, since the
+regex scanner only sees numerals. Numerals split by the boundary are left to
+the scanner, which sees the joined text and knows their groupings; judged by
+length alone, "back in 2019" / "2020 was" would read as a phone number. An
+entity that reaches back into the carry-over is redacted in the new segment
+and yields a correction for each earlier segment it touches; those went out
+with the partial entity visible.
+"""
+
+import re
+import string
+from collections import deque
+
+from app.config import settings
+from app.services.pii_service import PII_ENTITIES, PIIService, PIISpan, apply_spans
+
+_DIGIT_WORDS = {
+    "zero": "0",
+    "oh": "0",
+    "one": "1",
+    "two": "2",
+    "three": "3",
+    "four": "4",
+    "five": "5",
+    "six": "6",
+    "seven": "7",
+    "eight": "8",
+    "nine": "9",
+}
+_DIGIT_TOKEN = "|".join([r"\d+", *_DIGIT_WORDS])
+# Numerals and digit words separated only by spaces, commas and hyphens; a
+# period ends the run, as it ends the sentence.
+_DIGIT_RUN = re.compile(rf"\b(?:{_DIGIT_TOKEN})(?:[\s,-]+(?:{_DIGIT_TOKEN}))*\b")
+_DIGIT_PART = re.compile(_DIGIT_TOKEN)
+_DIGIT = re.compile(r"\d")
+_PUNCTUATION = str.maketrans(string.punctuation, " " * len(string.punctuation))
+
+
+def _has_digit_word(text: str) -> bool:
+    return not _DIGIT_WORDS.keys().isdisjoint(text.lower().translate(_PUNCTUATION).split())
+
+
+def _spoken_kind(digits: str, kinds: tuple[str, ...]) -> str | None:
+    """Entity type of a run of separately read-out digits, judged by its length."""
+    length = len(digits)
+    if "card" in kinds and 13 <= length <= 19 and PII_ENTITIES["card"][2](digits):
+        return "card"
+    if "ssn" in kinds and length == 9:
+        return "ssn"
+    if "phone" in kinds and 7 <= length <= 11:
+        return "phone"
+    return None
+
+
+def _merge(spans: list[PIISpan]) -> list[PIISpan]:
+    """Sort ``spans`` and fold overlapping ones into the first of them."""
+    merged: list[PIISpan] = []
+    for span in sorted(spans, key=lambda span: span.start):
+        if merged and span.start < merged[-1].end:
+            last = merged[-1]
+            merged[-1] = PIISpan(last.kind, last.start, max(last.end, span.end))
+        else:
+            merged.append(span)
+    return merged
+
+
+def _span_keys(spans: list[PIISpan]) -> list[tuple[str, int, int]]:
+    return [(span.kind, span.start, span.end) for span in spans]
+
+
+class RedactionCorrection:
+    """A carried segment whose redaction grew once a later segment arrived."""
+
+    __slots__ = ("ref", "text", "spans")
+
+    def __init__(self, ref: object, text: str, spans: list[PIISpan]) -> None:
+        self.ref = ref
+        self.text = text
+        self.spans = spans
+
+
+class _Carried:
+    __slots__ = ("ref", "text", "spans", "numeric")
+
+    def __init__(self, ref: object, text: str, spans: list[PIISpan], numeric: bool) -> None:
+        self.ref = ref
+        self.text = text
+        self.spans = spans
+        # Without a digit or digit word nothing here can start an entity.
+        self.numeric = numeric
+
+
+class StreamingRedactor:
+    """Per-speaker carry-over for one session's final transcript segments."""
+
+    __slots__ = ("_pii", "_carry_chars", "_carry")
+
+    def __init__(self, pii_service: PIIService | None = None, carry_chars: int | None = None):
+        self._pii = pii_service or PIIService()
+        self._carry_chars = settings.pii_carry_chars if carry_chars is None else carry_chars
+        self._carry: dict[str, deque[_Carried]] = {}
+
+    def feed(
+        self, speaker: str, text: str, ref: object
+    ) -> tuple[str, list[PIISpan], list[RedactionCorrection]]:
+        """Redact the next final segment of ``speaker`` and carry it over.
+
+        ``ref`` identifies this segment in the corrections later segments return.
+        """
+        carried = self._carry.setdefault(speaker, deque())
+        spoken = _has_digit_word(text)
+        spans, touched = self._scan(carried, text, spoken)
+        corrections: list[RedactionCorrection] = []
+        for piece, extra in touched.items():
+            merged = _merge(piece.spans + extra)
+            if _span_keys(merged) == _span_keys(piece.spans):
+                continue
+            piece.spans = merged
+            corrections.append(
+                RedactionCorrection(piece.ref, apply_spans(piece.text, merged), merged)
+            )
+        carried.append(_Carried(ref, text, spans, spoken or bool(_DIGIT.search(text))))
+
+        kept = sum(len(piece.text) + 1 for piece in carried)
+        while carried and kept - len(carried[0].text) - 1 >= self._carry_chars:
+            kept -= len(carried.popleft().text) + 1
+        return apply_spans(text, spans), spans, corrections
+
+    def peek(self, speaker: str, text: str) -> tuple[str, list[PIISpan]]:
+        """Redact an interim segment against the carry-over without carrying it."""
+        spans, _ = self._scan(self._carry.get(speaker, ()), text, _has_digit_word(text))
+        return apply_spans(text, spans), spans
+
+    def _scan(
+        self, carried: deque[_Carried] | tuple, text: str, spoken: bool
+    ) -> tuple[list[PIISpan], dict[_Carried, list[PIISpan]]]:
+        """Spans in ``text``, and the part of each spanning entity in carried segments.
+
+        ``spoken`` says whether ``text`` has a digit word in it.
+        """
+        if settings.pii_redaction_mode == "off":
+            return [], {}
+        # Only the last carry_chars of carried text are joined in front of
+        # ``text``, and only if an entity could start there.
+        window: list[tuple[_Carried, int]] = []
+        if "@" in text or any(piece.numeric for piece in carried):
+            budget = self._carry_chars
+            for piece in reversed(carried):
+                if budget <= 0:
+                    break
+                skip = max(len(piece.text) - budget, 0)
+                window.append((piece, skip))
+                budget -= len(piece.text) - skip + 1
+            window.reverse()
+        combined = " ".join([*(piece.text[skip:] for piece, skip in window), text])
+        base = len(combined) - len(text)
+
+        spans = self._pii.scan(combined)
+        if window or spoken:
+            spans = _merge(spans + self._digit_runs(combined, base))
+        own: list[PIISpan] = []
+        touched: dict[_Carried, list[PIISpan]] = {}
+        for span in spans:
+            if span.end <= base:
+                continue  # wholly inside the carry-over: found when it was fed
+            own.append(PIISpan(span.kind, max(span.start - base, 0), span.end - base))
+            position = 0
+            for piece, skip in window:
+                start, position = position, position + len(piece.text) - skip + 1
+                if span.start < position - 1 and span.end > start:
+                    touched.setdefault(piece, []).append(
+                        PIISpan(
+                            span.kind,
+                            max(span.start - start, 0) + skip,
+                            min(span.end - start, len(piece.text) - skip) + skip,
+                        )
+                    )
+        return own, touched
+
+    def _digit_runs(self, combined: str, base: int) -> list[PIISpan]:
+        """Runs reaching past ``base`` with at least one spelled-out digit.
+
+        Runs of numerals only are left to the regex scanner, which knows their
+        separators, wherever the segment boundary falls.
+        """
+        lowered = combined.lower()
+        kinds = self._pii.entity_types
+        spans: list[PIISpan] = []
+        for run in _DIGIT_RUN.finditer(lowered):
+            if run.end() <= base:
+                continue
+            parts = _DIGIT_PART.findall(run.group())
+            if all(part.isdigit() for part in parts):
+                continue
+            digits = "".join(_DIGIT_WORDS.get(part, part) for part in parts)
+            kind = _spoken_kind(digits, kinds)
+            if kind is not None:
+                spans.append(PIISpan(kind, run.start(), run.end()))
+        return spans
@@ -3,64 +3,134 @@ WebSocket session service extracted from ws.py.
 """
 
 import asyncio
+import functools
+import json
+import time
 import uuid
-from collections import defaultdict
 from datetime import UTC, datetime
 
 import structlog
-from fastapi import WebSocket, WebSocketDisconnect
-from sqlalchemy import func, select, text
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import WebSocket
+from pydantic import ValidationError
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.config import settings
 from app.db import async_session
+from app.metrics import metrics
 from app.models.call_event import CallEvent
 from app.models.call_session import CallSession
-from app.schemas.events import EventEnvelope
-from app.services.llm_client import LLMClient
+from app.schemas.events import BatchHeader, EventBatch, EventEnvelope
+from app.services.broker import broker
+from app.services.connection_registry import ConnectionRegistry, SessionEntry
+from app.services.connection_sender import ConnectionSender
+from app.services.event_writer import EventWriter, event_writer
+from app.services.guidance_coalescer import GuidanceCoalescer
+from app.services.heartbeat import HeartbeatEntry, HeartbeatScheduler
+from app.services.llm_client import LLMClient, get_llm_client
 from app.services.llm_service import LLMService
 from app.services.pii_service import PIIService
-from app.services.rule_service import RuleService
+from app.services.replay_buffer import ReplayBuffer
+from app.services.rule_service import RuleScope, RuleService, load_rule_state
+from app.services.sequence_service import get_allocator, release_allocator, seed_allocator
+from app.services.session_pipeline import PipelineItem, SessionPipeline
+from app.services.session_snapshot import load_snapshot
+from app.services.streaming_redactor import RedactionCorrection
 
 logger = structlog.get_logger()
 
-active_connections: defaultdict[uuid.UUID, set[WebSocket]] = defaultdict(set)
-last_seen: defaultdict[uuid.UUID, dict[WebSocket, datetime]] = defaultdict(dict)
-heartbeat_tasks: dict[uuid.UUID, asyncio.Task] = {}
+registry = ConnectionRegistry()
+_background_tasks: set[asyncio.Task] = set()
+IDLE_CLOSE_CODE = 1001
 
-_llm_pending_tasks: dict[uuid.UUID, asyncio.Task] = {}
-LLM_DEBOUNCE_SECONDS = 1.5
+# Unsequenced frames that still change what resume and resync serve.
+_RECORDED_EPHEMERAL_TYPES = frozenset({"server.transcript_interim", "server.redaction_correction"})
+
+
+class Persistence:
+    """Everything on the WebSocket path that opens DB sessions, from one factory."""
+
+    __slots__ = ("session_factory", "writer", "rules")
+
+    def __init__(
+        self, session_factory: async_sessionmaker[AsyncSession], writer: EventWriter
+    ) -> None:
+        self.session_factory = session_factory
+        self.writer = writer
+        self.rules = RuleService(session_factory=session_factory)
+
+
+# One writer per factory, so every session on it shares the group commits.
+_persistence: dict[async_sessionmaker[AsyncSession], Persistence] = {
+    async_session: Persistence(async_session, event_writer)
+}
+
+
+def persistence_for(session_factory: async_sessionmaker[AsyncSession]) -> Persistence:
+    persistence = _persistence.get(session_factory)
+    if persistence is None:
+        persistence = Persistence(session_factory, EventWriter(session_factory))
+        _persistence[session_factory] = persistence
+    return persistence
+
+
+async def stop_writers() -> None:
+    """Flush and stop every factory's writer (shutdown)."""
+    for persistence in list(_persistence.values()):
+        await persistence.writer.stop()
 
 
 class WebSocketService:
     """Connection lifecycle, persistence, rules, guidance, and fanout."""
 
-    def __init__(self, db: AsyncSession) -> None:
-        self.db = db
-        self.rule_service = RuleService(db)
-        self.llm_client = LLMClient()
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        # Each unit of work opens its own short session, so an open call does
+        # not hold a pooled connection between messages.
+        self._session_factory = session_factory
+        self._persistence = persistence_for(session_factory)
+        self.llm_client = get_llm_client()
         self.pii_service = PIIService()
+        self.sender: ConnectionSender | None = None
 
     async def accept_and_register(
         self, websocket: WebSocket, session_id: uuid.UUID
     ) -> CallSession | None:
-        session_result = await self.db.execute(
-            select(CallSession).where(
-                CallSession.id == session_id,
-                CallSession.status == "active",
+        async with self._session_factory() as db:
+            session_result = await db.execute(
+                select(CallSession).where(
+                    CallSession.id == session_id,
+                    CallSession.status == "active",
+                )
             )
-        )
-        session = session_result.scalar_one_or_none()
+            session = session_result.scalar_one_or_none()
+            entry = registry.get(session_id)
+            if session is not None and entry is None:
+                # Subscribe before seeding so frames from other workers are not missed.
+                await broker.subscribe(session_id)
+                allocator = await seed_allocator(db, session_id)
+                entry = registry.add_session(
+                    session_id,
+                    SessionEntry(
+                        await load_rule_state(db, session_id),
+                        ReplayBuffer(
+                            allocator.last_seq,
+                            settings.replay_buffer_max_events,
+                            settings.replay_buffer_max_bytes,
+                        ),
+                        await load_snapshot(db, session_id),
+                        tenant_id=session.tenant_id,
+                    ),
+                )
+
         if session is None:
             await websocket.close(code=1008, reason="Session not found or inactive")
             return None
+        if entry.release_handle is not None:
+            entry.release_handle.cancel()
+            entry.release_handle = None
 
         await websocket.accept()
-        active_connections[session_id].add(websocket)
-        last_seen[session_id][websocket] = datetime.now(UTC)
-
-        if session_id not in heartbeat_tasks or heartbeat_tasks[session_id].done():
-            heartbeat_tasks[session_id] = asyncio.create_task(_send_heartbeat(session_id))
+        self.sender = register_connection(session_id, entry, websocket)
 
         logger.info("ws_connected", session_id=str(session_id))
         return session
@@ -69,71 +139,143 @@ class WebSocketService:
         self, websocket: WebSocket, session_id: uuid.UUID
     ) -> None:
         structlog.contextvars.unbind_contextvars("session_id")
-        active_connections[session_id].discard(websocket)
-        last_seen[session_id].pop(websocket, None)
-        if not active_connections[session_id]:
-            active_connections.pop(session_id, None)
-            last_seen.pop(session_id, None)
-            task = heartbeat_tasks.pop(session_id, None)
-            if task is not None:
-                task.cancel()
-            pending = _llm_pending_tasks.pop(session_id, None)
-            if pending is not None:
-                pending.cancel()
-
-    async def persist_event(
-        self, session_id: uuid.UUID, envelope: EventEnvelope
-    ) -> int:
-        redacted_payload = envelope.payload
-        if envelope.type in {"client.transcript_segment", "client.transcript_final"}:
-            redacted_payload = self.pii_service.redact_dict(envelope.payload)
-
-        try:
-            assigned_seq = await _insert_with_advisory_lock(
-                self.db, session_id, envelope.event_id, envelope.type, redacted_payload
+        _deregister(session_id, websocket)
+
+    def touch(self) -> None:
+        """Record inbound activity; any frame, not just pongs, proves the peer is alive."""
+        if self.sender is not None:
+            heartbeats.touch(self.sender)
+
+    def ingest_event(
+        self, session_id: uuid.UUID, scope: RuleScope, envelope: EventEnvelope
+    ) -> asyncio.Future[int]:
+        """Persist a client transcript event; broadcast and rules run on the session worker.
+
+        The returned future resolves with the server_seq once the event is durable,
+        which is all the ack has to wait for.
+        """
+        entry = registry.get(session_id)
+        outbound, redacted_payload, rule_scope, rule_text, corrections = self._prepare(
+            session_id, scope, envelope, entry
+        )
+        if entry is None:
+            return self._persistence.writer.submit(
+                session_id, envelope.event_id, envelope.type, redacted_payload
             )
-            return assigned_seq
-        except IntegrityError as exc:
-            await self.db.rollback()
-            if "uq_session_event" in str(exc.orig):
-                existing = await self.db.execute(
-                    select(CallEvent).where(
-                        CallEvent.session_id == session_id,
-                        CallEvent.event_id == envelope.event_id,
-                    )
+        return _pipeline(session_id, entry, self._persistence).submit(
+            outbound,
+            redacted_payload,
+            scope=rule_scope,
+            rule_text=rule_text,
+            llm_client=self.llm_client,
+            corrections=corrections,
+        )
+
+    def ingest_batch(
+        self, session_id: uuid.UUID, scope: RuleScope, batch: EventBatch
+    ) -> list[asyncio.Future[int]]:
+        """Persist a batch of transcript events in one transaction, in batch order.
+
+        Interim segments are coalesced: only the newest one per speaker that is
+        not followed by a final from that speaker is broadcast.
+        """
+        finals: list[EventEnvelope] = []
+        interims: dict[str, EventEnvelope] = {}
+        for envelope in batch.events:
+            if is_interim_segment(envelope):
+                interims[_speaker(envelope.payload)] = envelope
+                continue
+            finals.append(envelope)
+            if envelope.type == "client.transcript_final":
+                interims.clear()
+            else:
+                interims.pop(_speaker(envelope.payload), None)
+
+        futures: list[asyncio.Future[int]] = []
+        if finals:
+            entry = registry.get(session_id)
+            prepared = [
+                self._prepare(session_id, scope, envelope, entry) for envelope in finals
+            ]
+            if entry is None:
+                futures = self._persistence.writer.submit_many(
+                    session_id,
+                    [(event.event_id, event.type, stored, None) for event, stored, *_ in prepared],
+                )
+            else:
+                futures = _pipeline(session_id, entry, self._persistence).submit_many(
+                    prepared, llm_client=self.llm_client
                 )
-                row = existing.scalar_one_or_none()
-                if row is not None:
-                    return row.server_seq
-            raise
+        for envelope in interims.values():
+            self.publish_interim(session_id, envelope)
+        return futures
+
+    def publish_interim(self, session_id: uuid.UUID, envelope: EventEnvelope) -> None:
+        """Broadcast a non-final segment as an ephemeral frame; nothing is written."""
+        metrics.increment("ws.ingest.interim_segments")
+        entry = registry.get(session_id)
+        if entry is None:
+            return
+        interim = envelope.model_copy(
+            update={
+                "session_id": session_id,
+                "type": "server.transcript_interim",
+                "payload": self._redact(envelope.payload, entry)[0],
+                "server_seq": None,
+            }
+        )
+        _pipeline(session_id, entry, self._persistence).publish(interim)
 
-    async def evaluate_and_broadcast_rules(
-        self, session_id: uuid.UUID, tenant_id: str | None, text: str
-    ) -> None:
-        rule_events = await self.rule_service.evaluate_segment(session_id, tenant_id, text)
-        logger.info("rules_triggered", session_id=str(session_id), count=len(rule_events))
+    def _prepare(
+        self,
+        session_id: uuid.UUID,
+        scope: RuleScope,
+        envelope: EventEnvelope,
+        entry: SessionEntry | None,
+    ) -> tuple[EventEnvelope, dict, RuleScope | None, str, list[RedactionCorrection]]:
+        outbound = envelope.model_copy(update={"session_id": session_id})
+        if envelope.type != "client.transcript_segment":
+            outbound.payload = self._redact(envelope.payload)[0]
+            return outbound, outbound.payload, None, "", []
+        # The outbound event is the carry-over's handle on this segment.
+        outbound.payload, corrections = self._redact(envelope.payload, entry, outbound)
+        return (
+            outbound,
+            outbound.payload,
+            scope,
+            str(envelope.payload.get("text", "")),
+            corrections,
+        )
 
-        for rule_event in rule_events:
-            seq = await _insert_with_advisory_lock(
-                self.db,
-                session_id,
-                rule_event.event_id,
-                rule_event.type,
-                rule_event.payload,
-            )
-            outbound = rule_event.model_copy(
-                update={"session_id": session_id, "server_seq": seq}
+    def _redact(
+        self, payload: dict, entry: SessionEntry | None = None, ref: EventEnvelope | None = None
+    ) -> tuple[dict, list[RedactionCorrection]]:
+        """Redact ``payload``; with an ``entry`` its text also goes through the carry-over.
+
+        Text is fed into the speaker's carry-over when ``ref`` identifies a
+        final segment, which may return corrections for earlier segments, and
+        only checked against it otherwise (interim segments).
+        """
+        text = payload.get("text")
+        corrections: list[RedactionCorrection] = []
+        if entry is None or not isinstance(text, str):
+            redacted, audit = self.pii_service.redact_dict_with_spans(payload)
+        else:
+            rest, audit = self.pii_service.redact_dict_with_spans(
+                {key: value for key, value in payload.items() if key != "text"}
             )
-            await _fanout(session_id, outbound.model_dump(mode="json"))
-
-    def schedule_llm_guidance(self, session_id: uuid.UUID) -> None:
-        existing = _llm_pending_tasks.get(session_id)
-        if existing is not None and not existing.done():
-            existing.cancel()
-
-        _llm_pending_tasks[session_id] = asyncio.create_task(
-            _debounced_llm_guidance(session_id, self.llm_client)
-        )
+            if ref is None:
+                text, spans = entry.redactor.peek(_speaker(payload), text)
+            else:
+                text, spans, corrections = entry.redactor.feed(_speaker(payload), text, ref)
+            audit.extend({"path": "text", **span.to_dict()} for span in spans)
+            redacted = {key: text if key == "text" else rest[key] for key in payload}
+        if audit:
+            # Spans only (type, key path, offsets); never the redacted values.
+            for span in audit:
+                metrics.increment(f"pii.redacted.{span['type']}")
+            logger.info("pii_redacted", spans=audit)
+        return redacted, corrections
 
     async def handle_resume(
         self, websocket: WebSocket, session_id: uuid.UUID, payload: dict
@@ -147,44 +289,172 @@ class WebSocketService:
             )
             return
 
-        missed_result = await self.db.execute(
-            select(CallEvent)
-            .where(
+        entry = registry.get(session_id)
+        snapshot = entry.snapshot if entry is not None else None
+        if (
+            snapshot is not None
+            and snapshot.server_seq - requested_seq > settings.resync_gap_threshold
+        ):
+            # Long gap: one snapshot frame instead of replaying every event.
+            metrics.increment("ws.resume.resyncs")
+            resync = EventEnvelope(
+                session_id=session_id,
+                type="system.resync",
+                ts_created=datetime.now(UTC),
+                payload=snapshot.to_payload(),
+                server_seq=snapshot.server_seq,
+            )
+            _send_to(
+                websocket, session_id, [resync.model_dump_json(), *entry.interim.values()]
+            )
+            return
+
+        buffer = entry.replay_buffer if entry is not None else None
+        frames = buffer.frames_after(requested_seq) if buffer is not None else None
+        if frames is not None:
+            metrics.increment("ws.resume.buffer_hits")
+        else:
+            # Only the part of the gap older than the buffer is read from the DB.
+            metrics.increment("ws.resume.db_fallbacks")
+            upper_seq = buffer.floor_seq if buffer is not None else None
+            frames = buffer.frames_after(upper_seq) if buffer is not None else []
+            missed_stmt = select(CallEvent).where(
                 CallEvent.session_id == session_id,
                 CallEvent.server_seq > requested_seq,
             )
-            .order_by(CallEvent.server_seq.asc())
-        )
-        for missed in missed_result.scalars().all():
-            replay_event = EventEnvelope(
-                event_id=missed.event_id,
-                session_id=session_id,
-                type=missed.type,
-                ts_created=_as_utc(missed.created_at),
-                payload=missed.payload or {},
-                server_seq=missed.server_seq,
-            )
-            ok = await _safe_send_json(websocket, replay_event.model_dump(mode="json"))
-            if not ok:
-                return
+            if upper_seq is not None:
+                missed_stmt = missed_stmt.where(CallEvent.server_seq <= upper_seq)
+            async with self._session_factory() as db:
+                missed_result = await db.execute(
+                    missed_stmt.order_by(CallEvent.server_seq.asc())
+                )
+                missed_events = missed_result.scalars().all()
+            replayed = [
+                EventEnvelope(
+                    event_id=missed.event_id,
+                    session_id=session_id,
+                    type=missed.type,
+                    ts_created=_as_utc(missed.created_at),
+                    payload=missed.payload or {},
+                    server_seq=missed.server_seq,
+                ).model_dump_json()
+                for missed in missed_events
+            ]
+            frames = replayed + frames
+
+        if entry is not None:
+            # In-progress utterances go last, after the events they follow.
+            frames = [*frames, *entry.interim.values()]
+        _send_to(websocket, session_id, frames)
 
     async def send_ack(
         self,
         websocket: WebSocket,
         envelope: EventEnvelope,
         session_id: uuid.UUID,
-        assigned_seq: int,
+        assigned_seq: int | None,
     ) -> bool:
-        ack = EventEnvelope(
-            event_id=envelope.event_id,
-            session_id=session_id,
-            type="server.ack",
-            ts_created=datetime.now(UTC),
-            payload={"acknowledged": True},
-            client_seq=envelope.client_seq,
-            server_seq=assigned_seq,
+        """Ack one event; ``assigned_seq`` is None for interim segments, which get none."""
+        return _send_ack(
+            websocket,
+            session_id,
+            envelope.event_id,
+            envelope.client_seq,
+            assigned_seq,
+            {"acknowledged": True},
         )
-        return await _safe_send_json(websocket, ack.model_dump(mode="json"))
+
+    async def send_batch_ack(
+        self,
+        websocket: WebSocket,
+        batch: EventBatch,
+        session_id: uuid.UUID,
+        assigned_seqs: list[int],
+    ) -> bool:
+        """One ack for the whole batch, carrying every event's server_seq.
+
+        Retried events keep their original server_seq, so ``server_seqs`` is
+        not necessarily contiguous; the range is its first and last entry.
+        Interim segments get no server_seq and are not listed.
+        """
+        first_seq = min(assigned_seqs, default=None)
+        last_seq = max(assigned_seqs, default=None)
+        return _send_ack(
+            websocket,
+            session_id,
+            batch.event_id,
+            batch.client_seq,
+            last_seq,
+            {
+                "acknowledged": True,
+                "event_count": len(batch.events),
+                "first_server_seq": first_seq,
+                "last_server_seq": last_seq,
+                "server_seqs": assigned_seqs,
+            },
+        )
+
+    def send_batch_rejection(
+        self, websocket: WebSocket, session_id: uuid.UUID, raw_message: str
+    ) -> bool:
+        """Refuse a batch over ``ws_batch_max_events`` with a negative ack naming it.
+
+        Nothing of the batch was persisted; the client resends it in smaller
+        batches instead of waiting for an ack that never comes.
+        """
+        metrics.increment("ws.ingest.batches_rejected")
+        try:
+            header = BatchHeader.model_validate_json(raw_message)
+        except ValidationError:
+            return True  # no event_id to name; the client's ack wait times out
+        return _send_ack(
+            websocket,
+            session_id,
+            header.event_id,
+            header.client_seq,
+            None,
+            {
+                "acknowledged": False,
+                "error": "batch_too_large",
+                "max_events": settings.ws_batch_max_events,
+            },
+        )
+
+
+def _send_ack(
+    websocket: WebSocket,
+    session_id: uuid.UUID,
+    event_id: uuid.UUID,
+    client_seq: int | None,
+    server_seq: int | None,
+    payload: dict,
+) -> bool:
+    ack = EventEnvelope(
+        event_id=event_id,
+        session_id=session_id,
+        type="server.ack",
+        ts_created=datetime.now(UTC),
+        payload=payload,
+        client_seq=client_seq,
+        server_seq=server_seq,
+    )
+    sender = registry.sender(session_id, websocket)
+    if sender is None:
+        return False
+    return sender.send(ack.model_dump_json(), ack.type)
+
+
+def is_interim_segment(envelope: EventEnvelope) -> bool:
+    """A non-final transcript segment, when interim mode is on."""
+    return (
+        settings.transcript_interim_mode
+        and envelope.type == "client.transcript_segment"
+        and envelope.payload.get("is_final", True) is False
+    )
+
+
+def _speaker(payload: dict) -> str:
+    return str(payload.get("speaker") or "unknown")
 
 
 def _as_utc(value: datetime | None) -> datetime:
@@ -195,100 +465,331 @@ def _as_utc(value: datetime | None) -> datetime:
     return value
 
 
-async def _safe_send_json(websocket: WebSocket, payload: dict) -> bool:
-    try:
-        await websocket.send_json(payload)
-        return True
-    except (RuntimeError, WebSocketDisconnect):
-        return False
-    except Exception:
-        return False
+def _send_to(websocket: WebSocket, session_id: uuid.UUID, frames: list[str]) -> None:
+    """Queue a resume reply on one connection, bypassing the send-queue bound."""
+    sender = registry.sender(session_id, websocket)
+    if sender is not None:
+        sender.send_many(frames)
+
+
+def _fanout(session_id: uuid.UUID, event: EventEnvelope) -> None:
+    """Encode ``event`` once, deliver it locally and publish it to other workers."""
+    frame = event.model_dump_json()
+    _record_frame(session_id, event.type, event.payload, event.server_seq, frame)
+    _deliver_local(session_id, event.type, frame)
+    broker.publish(session_id, event.type, event.server_seq, frame)
+
+
+def deliver_remote_frame(
+    session_id: uuid.UUID, event_type: str, server_seq: int | None, frame: str
+) -> None:
+    """Broker callback for a frame another worker published for this session."""
+    if server_seq is not None:
+        allocator = get_allocator(session_id)
+        if allocator is not None:
+            allocator.observe(server_seq)
+    if server_seq is not None or event_type in _RECORDED_EPHEMERAL_TYPES:
+        payload = json.loads(frame).get("payload") or {}
+        _record_frame(session_id, event_type, payload, server_seq, frame)
+    _deliver_local(session_id, event_type, frame)
+
+
+def _record_frame(
+    session_id: uuid.UUID, event_type: str, payload: dict, server_seq: int | None, frame: str
+) -> None:
+    entry = registry.get(session_id)
+    if entry is None:
+        return
+    if event_type == "server.transcript_interim":
+        entry.interim[_speaker(payload)] = frame
+        return
+    if event_type == "server.redaction_correction":
+        _record_correction(entry, payload)
+        return
+    if server_seq is None:
+        return
+    if event_type == "client.transcript_segment":
+        entry.interim.pop(_speaker(payload), None)
+    elif event_type == "client.transcript_final":
+        entry.interim.clear()
+    entry.replay_buffer.append(server_seq, frame)
+    entry.snapshot.apply(event_type, payload, server_seq)
+
+
+def _record_correction(entry: SessionEntry, payload: dict) -> None:
+    """Make resume and resync serve a corrected segment's new text."""
+    server_seq = payload.get("target_server_seq")
+    text = payload.get("text")
+    if not isinstance(server_seq, int) or not isinstance(text, str):
+        return
+    frame = entry.replay_buffer.get(server_seq)
+    if frame is not None:
+        event = EventEnvelope.model_validate_json(frame)
+        event.payload = {**event.payload, "text": text}
+        entry.replay_buffer.replace(server_seq, event.model_dump_json())
+    entry.snapshot.correct_text(server_seq, text)
 
 
-async def _fanout(session_id: uuid.UUID, payload: dict) -> None:
-    stale: list[WebSocket] = []
-    for conn in list(active_connections.get(session_id, set())):
-        ok = await _safe_send_json(conn, payload)
-        if not ok:
-            stale.append(conn)
+def _deliver_local(session_id: uuid.UUID, event_type: str, frame: str) -> None:
+    entry = registry.get(session_id)
+    if entry is None or not entry.connections:
+        return
+    stale = [
+        conn for conn, sender in entry.connections.items() if not sender.send(frame, event_type)
+    ]
     for conn in stale:
-        active_connections[session_id].discard(conn)
-        last_seen[session_id].pop(conn, None)
+        _deregister(session_id, conn)
 
 
-async def _send_heartbeat(session_id: uuid.UUID) -> None:
-    try:
-        while True:
-            await asyncio.sleep(30)
-            if session_id not in active_connections or not active_connections[session_id]:
-                return
-            ping = EventEnvelope(
+def _pipeline(
+    session_id: uuid.UUID, entry: SessionEntry, persistence: Persistence
+) -> SessionPipeline:
+    if entry.pipeline is None:
+        entry.pipeline = SessionPipeline(
+            session_id, functools.partial(_process_item, persistence), persistence.writer
+        )
+    return entry.pipeline
+
+
+async def _process_item(
+    persistence: Persistence, session_id: uuid.UUID, item: PipelineItem, server_seq: int | None
+) -> None:
+    """Session worker stage: broadcast an event, then run its rules and guidance."""
+    started = time.perf_counter()
+    if server_seq is not None:
+        item.event.server_seq = server_seq
+    _fanout(session_id, item.event)
+    metrics.observe("pipeline.fanout_ms", (time.perf_counter() - started) * 1000)
+    if item.corrections:
+        await _apply_corrections(persistence, session_id, item.corrections)
+
+    if item.scope is not None:
+        started = time.perf_counter()
+        # The broadcast payload is already redacted: no second redaction pass.
+        redacted_text = str(item.event.payload.get("text", ""))
+        await _evaluate_rules(persistence, session_id, item.scope, item.rule_text, redacted_text)
+        metrics.observe("pipeline.rules_ms", (time.perf_counter() - started) * 1000)
+    if item.llm_client is not None:
+        _schedule_llm_guidance(persistence, session_id, item.llm_client)
+
+
+async def _apply_corrections(
+    persistence: Persistence, session_id: uuid.UUID, corrections: list[RedactionCorrection]
+) -> None:
+    """Widen the redaction of segments already broadcast and persisted.
+
+    Earlier segments are always processed before the one that corrects them,
+    so each target already has its server_seq and its row is committed.
+    """
+    updates: list[EventEnvelope] = []
+    for correction in corrections:
+        target: EventEnvelope = correction.ref
+        if target.server_seq is None:
+            continue  # never persisted, so never broadcast either
+        target.payload = {**target.payload, "text": correction.text}
+        updates.append(target)
+        _fanout(
+            session_id,
+            EventEnvelope(
                 session_id=session_id,
-                type="system.ping",
+                type="server.redaction_correction",
                 ts_created=datetime.now(UTC),
-                payload={},
+                payload={
+                    "target_event_id": str(target.event_id),
+                    "target_server_seq": target.server_seq,
+                    "speaker": target.payload.get("speaker"),
+                    "text": correction.text,
+                },
+            ),
+        )
+        metrics.increment("pii.redaction_corrections")
+    if not updates:
+        return
+    async with persistence.session_factory() as db:
+        for target in updates:
+            await db.execute(
+                update(CallEvent)
+                .where(CallEvent.session_id == session_id, CallEvent.event_id == target.event_id)
+                .values(payload=target.payload)
             )
-            await _fanout(session_id, ping.model_dump(mode="json"))
-            if not active_connections.get(session_id):
-                active_connections.pop(session_id, None)
-                last_seen.pop(session_id, None)
-                return
-    except asyncio.CancelledError:
+        await db.commit()
+
+
+async def _evaluate_rules(
+    persistence: Persistence,
+    session_id: uuid.UUID,
+    scope: RuleScope,
+    text: str,
+    redacted_text: str,
+) -> None:
+    entry = registry.get(session_id)
+    if entry is None:
         return
+    rule_events = await persistence.rules.evaluate_segment(
+        session_id, scope, text, entry.rule_state, redacted_text=redacted_text
+    )
+    logger.info("rules_triggered", session_id=str(session_id), count=len(rule_events))
 
+    # Alerts queue behind everything already submitted, keeping server_seq order.
+    pipeline = _pipeline(session_id, entry, persistence)
+    for rule_event in rule_events:
+        outbound = rule_event.model_copy(update={"session_id": session_id})
+        pipeline.submit(outbound, rule_event.payload)
 
-def _lock_key_for_session(session_id: uuid.UUID) -> int:
-    """Create a deterministic signed 64-bit key from UUID."""
-    high = session_id.int >> 64
-    low = session_id.int & ((1 << 64) - 1)
-    return ((high ^ low) & ((1 << 63) - 1))
 
+def _schedule_llm_guidance(
+    persistence: Persistence, session_id: uuid.UUID, llm_client: LLMClient
+) -> None:
+    entry = registry.get(session_id)
+    if entry is None or not entry.connections:
+        return
+    if entry.guidance is None:
+        entry.guidance = GuidanceCoalescer(
+            functools.partial(_generate_llm_guidance, persistence, session_id, llm_client)
+        )
+    entry.guidance.trigger()
 
-async def _insert_with_advisory_lock(
-    db: AsyncSession,
-    session_id: uuid.UUID,
-    event_id: uuid.UUID,
-    event_type: str,
-    payload: dict,
-) -> int:
-    lock_key = _lock_key_for_session(session_id)
-    await db.execute(text("SELECT pg_advisory_xact_lock(:lock_key)"), {"lock_key": lock_key})
 
-    max_seq_result = await db.execute(
-        select(func.max(CallEvent.server_seq)).where(CallEvent.session_id == session_id)
-    )
-    next_seq = (max_seq_result.scalar_one_or_none() or 0) + 1
+def register_connection(
+    session_id: uuid.UUID, entry: SessionEntry, websocket: WebSocket
+) -> ConnectionSender:
+    """Attach an accepted WebSocket to its session's entry."""
+    sender = ConnectionSender(websocket)
+    sender.start()
+    registry.add_connection(session_id, entry, websocket, sender)
+    heartbeats.add(session_id, sender)
+    return sender
 
-    event = CallEvent(
-        session_id=session_id,
-        event_id=event_id,
-        server_seq=next_seq,
-        type=event_type,
-        payload=payload,
+
+def _deregister(session_id: uuid.UUID, websocket: WebSocket) -> None:
+    """Drop a connection; idempotent, as the reaper and the receive loop both call it."""
+    sender, entry = registry.remove_connection(session_id, websocket)
+    if sender is None:
+        return
+    heartbeats.remove(sender)
+    sender.close()
+    if entry.connections:
+        return
+
+    if entry.guidance is not None:
+        entry.guidance.cancel_pending()  # a generation in flight still lands
+    # Keep seq/rule/replay state briefly so a reconnecting client
+    # (e.g. after a load balancer restart) resumes from memory.
+    if entry.release_handle is not None:
+        entry.release_handle.cancel()
+    entry.release_handle = asyncio.get_running_loop().call_later(
+        settings.session_state_linger_seconds, _release_session_state, session_id
     )
-    db.add(event)
-    await db.commit()
-    return next_seq
 
 
-async def _debounced_llm_guidance(session_id: uuid.UUID, llm_client: LLMClient) -> None:
+def _reap_idle_connections(entries: list[HeartbeatEntry]) -> None:
+    """Close connections that sent nothing for ws_idle_timeout_seconds (half-open TCP)."""
+    for entry in entries:
+        websocket = entry.sender.websocket
+        logger.info("ws_idle_connection_reaped", session_id=str(entry.session_id))
+        _deregister(entry.session_id, websocket)
+        _spawn(_close_quietly(websocket, IDLE_CLOSE_CODE, "Idle timeout"))
+
+
+async def _close_quietly(websocket: WebSocket, code: int, reason: str) -> None:
     try:
-        await asyncio.sleep(LLM_DEBOUNCE_SECONDS)
-    except asyncio.CancelledError:
+        await websocket.close(code=code, reason=reason)
+    except Exception:
+        pass
+
+
+def _spawn(coro) -> None:
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+heartbeats = HeartbeatScheduler(
+    settings.ws_heartbeat_interval_seconds,
+    settings.ws_heartbeat_tick_seconds,
+    idle_timeout_seconds=settings.ws_idle_timeout_seconds,
+    on_idle=_reap_idle_connections,
+)
+
+
+def _release_session_state(session_id: uuid.UUID) -> None:
+    entry = registry.get(session_id)
+    if entry is None or entry.connections:
         return
+    registry.pop_session(session_id)
+    if entry.pipeline is not None:
+        entry.pipeline.close()
+    release_allocator(session_id)
+    _spawn(broker.unsubscribe(session_id))
+
+
+def _publish_guidance_delta(
+    persistence: Persistence, session_id: uuid.UUID, guidance_id: uuid.UUID, text: str
+) -> None:
+    """Broadcast the suggested reply generated so far as an ephemeral frame.
+
+    Each frame carries the whole reply so far, so one that is replaced in the
+    queue before it goes out loses nothing. The validated guidance_update
+    with the same event_id follows, and only that one is persisted.
+    """
+    entry = registry.get(session_id)
+    if entry is None or not entry.connections:
+        return
+    _pipeline(session_id, entry, persistence).publish(
+        EventEnvelope(
+            session_id=session_id,
+            type="server.guidance_delta",
+            ts_created=datetime.now(UTC),
+            payload={"guidance_id": str(guidance_id), "suggested_reply": text},
+        )
+    )
+
 
+async def _generate_llm_guidance(
+    persistence: Persistence, session_id: uuid.UUID, llm_client: LLMClient
+) -> None:
+    """One guidance run over the transcript so far; the coalescer decides when."""
     try:
-        async with async_session() as task_db:
+        started = time.perf_counter()
+        async with persistence.session_factory() as task_db:
             llm_service = LLMService(task_db, llm_client)
-            guidance_event = await llm_service.generate_guidance(session_id)
-        if guidance_event is None:
+            messages = await llm_service.guidance_messages(session_id)
+        if messages is None:
             return
-        await _fanout(session_id, guidance_event.model_dump(mode="json"))
+        entry = registry.get(session_id)
+        tenant_id = entry.tenant_id if entry is not None else None
+        # The pooled connection is back before the slow part, the LLM call.
+        guidance_event = await llm_service.guidance_from_messages(
+            session_id,
+            messages,
+            tenant_id,
+            on_reply=(
+                functools.partial(_publish_guidance_delta, persistence, session_id)
+                if settings.llm_guidance_streaming
+                else None
+            ),
+        )
+        metrics.observe("pipeline.guidance_ms", (time.perf_counter() - started) * 1000)
+        entry = registry.get(session_id)
+        if entry is None:
+            # The session was released while this run was in flight: persist
+            # the guidance, then drop the allocator the append had to re-seed.
+            await persistence.writer.append(
+                session_id,
+                guidance_event.event_id,
+                guidance_event.type,
+                guidance_event.payload,
+                created_at=guidance_event.ts_created,
+            )
+            if registry.get(session_id) is None:
+                release_allocator(session_id)
+            return
+        _pipeline(session_id, entry, persistence).submit(
+            guidance_event, guidance_event.payload, created_at=guidance_event.ts_created
+        )
     except Exception as exc:
         logger.error(
             "llm_guidance_generation_failed",
             session_id=str(session_id),
             error=str(exc),
         )
-    finally:
-        _llm_pending_tasks.pop(session_id, None)
@@ -43,17 +43,22 @@ async def test_engine():
     await admin_engine.dispose()
 
 
-# 3. Create a clean session for each test
+# 3. Session factory bound to the test schema (for services that open their own sessions)
 @pytest.fixture
-async def db_session(test_engine):
-    async_session = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
-    async with async_session() as session:
+def session_factory(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+# 4. Create a clean session for each test
+@pytest.fixture
+async def db_session(session_factory):
+    async with session_factory() as session:
         yield session
         # Rollback transaction after each test ensures isolation
         await session.rollback()
 
 
-# 4. Override the app's get_db dependency
+# 5. Override the app's get_db dependency
 @pytest.fixture
 async def client(db_session):
     async def override_get_db():
@@ -0,0 +1,150 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from datetime import UTC, datetime
+
+import pytest
+
+from app.schemas.events import EventEnvelope
+from app.services import websocket_service
+from app.services.broker import Broker, InProcessBroker, RedisBroker
+from app.services.connection_registry import SessionEntry
+from app.services.replay_buffer import ReplayBuffer
+from app.services.rule_service import SessionRuleState
+from app.services.sequence_service import (
+    SequenceAllocator,
+    _allocators,
+    get_allocator,
+    release_allocator,
+)
+from app.services.session_snapshot import SessionSnapshot
+
+
+class FakeRedisServer:
+    """Minimal stand-in for a Redis server's pub/sub."""
+
+    def __init__(self) -> None:
+        self.subscribers: defaultdict[str, list[asyncio.Queue]] = defaultdict(list)
+
+
+class FakePubSub:
+    def __init__(self, server: FakeRedisServer) -> None:
+        self._server = server
+        self._messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self._server.subscribers[channel].append(self._messages)
+        await self._messages.put({"type": "subscribe", "channel": channel.encode(), "data": 1})
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._server.subscribers[channel].remove(self._messages)
+
+    async def get_message(self, ignore_subscribe_messages: bool, timeout: float):
+        try:
+            message = await asyncio.wait_for(self._messages.get(), timeout)
+        except TimeoutError:
+            return None
+        if ignore_subscribe_messages and message["type"] != "message":
+            return None
+        return message
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakeRedis:
+    def __init__(self, server: FakeRedisServer) -> None:
+        self._server = server
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self._server)
+
+    async def publish(self, channel: str, message: str) -> int:
+        queues = self._server.subscribers[channel]
+        for queue in queues:
+            await queue.put(
+                {"type": "message", "channel": channel.encode(), "data": message.encode()}
+            )
+        return len(queues)
+
+    async def aclose(self) -> None:
+        pass
+
+
+async def test_in_process_peers_forward_frames_but_not_echoes():
+    peers: list[InProcessBroker] = []
+    worker_a, worker_b = InProcessBroker(peers), InProcessBroker(peers)
+    received: list[tuple] = []
+    await worker_a.start(lambda *args: received.append(("a", *args)))
+    await worker_b.start(lambda *args: received.append(("b", *args)))
+    session_id = uuid.uuid4()
+    await worker_a.subscribe(session_id)
+    await worker_b.subscribe(session_id)
+
+    worker_a.publish(session_id, "server.rule_alert", 7, '{"x":"a|b"}')
+    assert received == [("b", session_id, "server.rule_alert", 7, '{"x":"a|b"}')]
+
+    await worker_b.unsubscribe(session_id)
+    worker_a.publish(session_id, "system.ping", None, "{}")
+    assert len(received) == 1
+
+
+async def test_redis_broker_delivers_across_workers():
+    server = FakeRedisServer()
+    worker_a = RedisBroker(client=FakeRedis(server))
+    worker_b = RedisBroker(client=FakeRedis(server))
+    received_a: list[tuple] = []
+    received_b: asyncio.Queue = asyncio.Queue()
+    await worker_a.start(lambda *args: received_a.append(args))
+    await worker_b.start(lambda *args: received_b.put_nowait(args))
+    session_id = uuid.uuid4()
+    try:
+        await worker_a.subscribe(session_id)
+        await worker_b.subscribe(session_id)
+
+        worker_a.publish(session_id, "client.transcript_segment", 3, '{"n":1}')
+        worker_a.publish(session_id, "client.transcript_segment", 4, '{"n":2}')
+        first = await asyncio.wait_for(received_b.get(), 2)
+        second = await asyncio.wait_for(received_b.get(), 2)
+
+        assert first == (session_id, "client.transcript_segment", 3, '{"n":1}')
+        assert second[2] == 4
+        assert received_a == []
+    finally:
+        await worker_a.stop()
+        await worker_b.stop()
+
+
+def test_remote_frame_updates_local_session_state():
+    session_id = uuid.uuid4()
+    _allocators[session_id] = SequenceAllocator(5)
+    entry = SessionEntry(SessionRuleState(), ReplayBuffer(5, 10, 10_000), SessionSnapshot())
+    websocket_service.registry.add_session(session_id, entry)
+    frame = EventEnvelope(
+        session_id=session_id,
+        type="server.guidance_update",
+        ts_created=datetime.now(UTC),
+        payload={"suggested_reply": "hi"},
+        server_seq=9,
+    ).model_dump_json()
+    try:
+        websocket_service.deliver_remote_frame(session_id, "server.guidance_update", 9, frame)
+
+        assert get_allocator(session_id).last_seq == 9
+        assert entry.replay_buffer.frames_after(5) == [frame]
+        assert entry.snapshot.guidance == {"suggested_reply": "hi"}
+    finally:
+        release_allocator(session_id)
+        websocket_service.registry.pop_session(session_id)
+
+
+def test_a_broker_missing_a_method_fails_when_built():
+    class SubscribeOnlyBroker(Broker):
+        async def subscribe(self, session_id: uuid.UUID) -> None:
+            pass
+
+        async def unsubscribe(self, session_id: uuid.UUID) -> None:
+            pass
+
+    with pytest.raises(TypeError, match="publish"):
+        SubscribeOnlyBroker()
@@ -0,0 +1,127 @@
+import asyncio
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.call_event import CallEvent
+from app.models.call_session import CallSession
+from app.schemas.events import EventEnvelope
+from app.services import sequence_service, websocket_service
+from app.services.connection_registry import SessionEntry
+from app.services.replay_buffer import ReplayBuffer
+from app.services.rule_service import SessionRuleState
+from app.services.session_snapshot import SessionSnapshot
+
+
+class NullWebSocket:
+    async def send_text(self, frame: str) -> None:
+        pass
+
+
+def _entry() -> SessionEntry:
+    return SessionEntry(SessionRuleState(), ReplayBuffer(0, 10, 10_000), SessionSnapshot())
+
+
+async def test_churn_leaves_nothing_behind(monkeypatch):
+    monkeypatch.setattr(settings, "session_state_linger_seconds", 0)
+    registry = websocket_service.registry
+    sessions_before = len(registry)
+
+    for _ in range(200):
+        session_id = uuid.uuid4()
+        websockets = [NullWebSocket(), NullWebSocket()]
+        entry = _entry()
+        for websocket in websockets:
+            websocket_service.register_connection(session_id, entry, websocket)
+        assert registry.get(session_id).connections.keys() == set(websockets)
+        for websocket in websockets:
+            websocket_service._deregister(session_id, websocket)
+            websocket_service._deregister(session_id, websocket)
+    await asyncio.sleep(0.01)
+
+    assert len(registry) == sessions_before
+    assert registry.connection_count == 0
+    assert len(websocket_service.heartbeats) == 0
+
+
+def test_lookups_on_released_sessions_do_not_recreate_entries():
+    registry = websocket_service.registry
+    session_id = uuid.uuid4()
+
+    websocket_service._deliver_local(session_id, "system.ping", "{}")
+    websocket_service._deregister(session_id, NullWebSocket())
+    assert registry.sender(session_id, NullWebSocket()) is None
+    assert registry.get(session_id) is None
+
+
+def test_interim_frames_are_held_per_speaker_until_final():
+    session_id = uuid.uuid4()
+    entry = websocket_service.registry.add_session(session_id, _entry())
+
+    def fanout(event_type: str, speaker: str, server_seq: int | None = None) -> None:
+        websocket_service._fanout(
+            session_id,
+            EventEnvelope(
+                session_id=session_id,
+                type=event_type,
+                ts_created=datetime.now(UTC),
+                payload={"speaker": speaker, "text": "..."},
+                server_seq=server_seq,
+            ),
+        )
+
+    try:
+        fanout("server.transcript_interim", "customer")
+        fanout("server.transcript_interim", "csr")
+        fanout("server.transcript_interim", "customer")
+        assert entry.interim.keys() == {"customer", "csr"}
+
+        fanout("client.transcript_segment", "customer", server_seq=1)
+        assert entry.interim.keys() == {"csr"}
+        # Only the persisted segment is replayable.
+        assert len(entry.replay_buffer.frames_after(0)) == 1
+    finally:
+        websocket_service.registry.pop_session(session_id)
+
+
+class _FakeGuidanceClient:
+    async def complete(self, messages, schema, priority="guidance", tenant=None):
+        return schema(suggested_reply="Sure", rationale="r", confidence=0.5)
+
+    async def complete_streaming(self, messages, schema, field, on_field, **kwargs):
+        return await self.complete(messages, schema)
+
+
+async def test_guidance_finishing_after_release_leaves_no_allocator(session_factory, db_session):
+    session = CallSession()
+    db_session.add(session)
+    await db_session.commit()
+    db_session.add(
+        CallEvent(
+            session_id=session.id,
+            event_id=uuid.uuid4(),
+            server_seq=1,
+            type="client.transcript_segment",
+            payload={"speaker": "customer", "text": "I want a refund"},
+        )
+    )
+    await db_session.commit()
+    persistence = websocket_service.persistence_for(session_factory)
+
+    try:
+        # No registry entry: the session's state was released mid-run.
+        await websocket_service._generate_llm_guidance(
+            persistence, session.id, _FakeGuidanceClient()
+        )
+    finally:
+        await persistence.writer.stop()
+
+    stored = await db_session.execute(
+        select(CallEvent.server_seq).where(
+            CallEvent.session_id == session.id, CallEvent.type == "server.guidance_update"
+        )
+    )
+    assert stored.scalars().all() == [2]
+    assert session.id not in sequence_service._allocators
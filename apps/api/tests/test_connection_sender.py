@@ -0,0 +1,163 @@
+import asyncio
+import json
+import uuid
+from datetime import UTC, datetime
+
+from app.schemas.events import EventEnvelope
+from app.services import connection_sender
+from app.services.connection_registry import SessionEntry
+from app.services.connection_sender import SLOW_CONSUMER_CLOSE_CODE, ConnectionSender
+from app.services.replay_buffer import ReplayBuffer
+from app.services.rule_service import SessionRuleState
+from app.services.session_snapshot import SessionSnapshot
+from app.services.websocket_service import _fanout, registry
+
+
+class StalledWebSocket:
+    """Accepts sends only while ``unblocked`` is set, like a congested client."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+        self.unblocked = asyncio.Event()
+
+    async def send_text(self, frame: str) -> None:
+        await self.unblocked.wait()
+        self.sent.append(frame)
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.closed_with = code
+
+
+async def test_overflow_drops_pings_and_coalesces_guidance():
+    websocket = StalledWebSocket()
+    sender = ConnectionSender(websocket, max_queue=2)
+    sender.start()
+
+    assert sender.send("guidance-1", "server.guidance_update")
+    await asyncio.sleep(0)
+    # The writer is stuck on the first frame; fill the queue behind it.
+    assert sender.send("ping", "system.ping")
+    assert sender.send("alert", "server.rule_alert")
+    assert sender.send("guidance-2", "server.guidance_update")
+    assert sender.send("guidance-3", "server.guidance_update")
+    assert sender.send("ping", "system.ping")
+    assert len(sender) == 2
+
+    websocket.unblocked.set()
+    await asyncio.sleep(0.01)
+    assert websocket.sent == ["guidance-1", "alert", "guidance-3"]
+    assert not sender.closed
+    sender.close()
+
+
+def _sequenced(server_seq: int | None, name: str = "") -> str:
+    return json.dumps({"server_seq": server_seq, "name": name})
+
+
+async def test_a_newer_guidance_update_goes_behind_frames_queued_since():
+    websocket = StalledWebSocket()
+    sender = ConnectionSender(websocket, max_queue=8)
+    sender.start()
+
+    assert sender.send(_sequenced(1), "client.transcript_segment")
+    await asyncio.sleep(0)
+    assert sender.send(_sequenced(2), "server.guidance_update")
+    assert sender.send(_sequenced(3), "client.transcript_segment")
+    assert sender.send(_sequenced(4), "server.rule_alert")
+    assert sender.send(_sequenced(5), "server.guidance_update")
+
+    websocket.unblocked.set()
+    await asyncio.sleep(0.01)
+    # The client drops anything at or below the last server_seq it saw.
+    assert [json.loads(frame)["server_seq"] for frame in websocket.sent] == [1, 3, 4, 5]
+    sender.close()
+
+
+async def test_streamed_guidance_deltas_coalesce_instead_of_disconnecting():
+    websocket = StalledWebSocket()
+    sender = ConnectionSender(websocket, max_queue=8)
+    sender.start()
+
+    assert sender.send("alert", "server.rule_alert")
+    await asyncio.sleep(0)
+    # Each delta carries the whole reply so far, so only the newest one matters.
+    for index in range(50):
+        assert sender.send(f"delta-{index}", "server.guidance_delta")
+    assert sender.send("guidance", "server.guidance_update")
+    assert len(sender) == 2
+
+    websocket.unblocked.set()
+    await asyncio.sleep(0.01)
+    assert websocket.sent == ["alert", "delta-49", "guidance"]
+    assert not sender.closed and websocket.closed_with is None
+    sender.close()
+
+
+async def test_a_later_runs_delta_does_not_overtake_the_previous_runs_guidance():
+    websocket = StalledWebSocket()
+    sender = ConnectionSender(websocket, max_queue=8)
+    sender.start()
+
+    assert sender.send(_sequenced(1, "segment"), "client.transcript_segment")
+    await asyncio.sleep(0)
+    assert sender.send(_sequenced(None, "delta run 1"), "server.guidance_delta")
+    assert sender.send(_sequenced(2, "guidance run 1"), "server.guidance_update")
+    assert sender.send(_sequenced(3, "segment"), "client.transcript_segment")
+    assert sender.send(_sequenced(None, "delta run 2"), "server.guidance_delta")
+
+    websocket.unblocked.set()
+    await asyncio.sleep(0.01)
+    sent = [json.loads(frame) for frame in websocket.sent]
+    assert [(frame["server_seq"], frame["name"]) for frame in sent] == [
+        (1, "segment"),
+        (2, "guidance run 1"),
+        (3, "segment"),
+        (None, "delta run 2"),
+    ]
+    sender.close()
+
+
+async def test_overflow_disconnects_slow_consumer_without_blocking():
+    websocket = StalledWebSocket()
+    sender = ConnectionSender(websocket, max_queue=3)
+    sender.start()
+
+    for index in range(3):
+        assert sender.send(f"frame-{index}", "client.transcript_segment")
+    await asyncio.sleep(0)
+    assert sender.send("frame-3", "client.transcript_segment")
+    assert not sender.send("frame-4", "client.transcript_segment")
+    # Nothing else references the close task; it is held until it finishes.
+    assert len(connection_sender._close_tasks) == 1
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert sender.closed
+    assert websocket.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    assert websocket.sent == []
+    assert not connection_sender._close_tasks
+
+
+async def test_fanout_encodes_each_event_once_for_all_connections():
+    session_id = uuid.uuid4()
+    websockets = [StalledWebSocket() for _ in range(3)]
+    senders = {websocket: ConnectionSender(websocket) for websocket in websockets}
+    entry = SessionEntry(SessionRuleState(), ReplayBuffer(0, 10, 10_000), SessionSnapshot())
+    entry.connections.update(senders)
+    registry.add_session(session_id, entry)
+    event = EventEnvelope(
+        session_id=session_id,
+        type="server.rule_alert",
+        ts_created=datetime.now(UTC),
+        payload={"rule_id": "r1"},
+        server_seq=1,
+    )
+    try:
+        _fanout(session_id, event)
+        frames = [sender._queue[0][1] for sender in senders.values()]
+        assert frames[0] == event.model_dump_json()
+        assert all(frame is frames[0] for frame in frames)
+        assert entry.replay_buffer.frames_after(0)[0] is frames[0]
+    finally:
+        registry.pop_session(session_id)
@@ -0,0 +1,104 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.metrics import metrics
+from app.models.call_event import CallEvent
+from app.models.call_session import CallSession
+from app.services.event_writer import EventWriter
+from app.services.sequence_service import release_allocator, seed_allocator
+
+
+@pytest.fixture
+async def writer(session_factory):
+    event_writer = EventWriter(session_factory=session_factory, flush_interval_ms=20)
+    event_writer.start()
+    yield event_writer
+    await event_writer.stop()
+
+
+@pytest.fixture
+async def session_id(db_session):
+    session = CallSession()
+    db_session.add(session)
+    await db_session.commit()
+    await seed_allocator(db_session, session.id)
+    yield session.id
+    release_allocator(session.id)
+
+
+async def _stored_seqs(db_session, session_id) -> list[int]:
+    rows = await db_session.execute(
+        select(CallEvent.server_seq).where(CallEvent.session_id == session_id)
+    )
+    return sorted(rows.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_appends_share_one_flush(writer, db_session, session_id):
+    flushes_before = metrics.histogram("event_writer.flush_size").count
+
+    seqs = await asyncio.gather(
+        *(
+            writer.append(session_id, uuid.uuid4(), "client.transcript_segment", {"i": i})
+            for i in range(10)
+        )
+    )
+
+    assert seqs == list(range(1, 11))
+    assert await _stored_seqs(db_session, session_id) == seqs
+    assert metrics.histogram("event_writer.flush_size").count == flushes_before + 1
+
+
+@pytest.mark.asyncio
+async def test_duplicate_event_id_returns_original_seq(writer, db_session, session_id):
+    event_id = uuid.uuid4()
+    first = await writer.append(session_id, event_id, "client.transcript_segment", {})
+    retried = await writer.append(session_id, event_id, "client.transcript_segment", {})
+
+    assert retried == first
+    assert await _stored_seqs(db_session, session_id) == [first]
+
+
+@pytest.mark.asyncio
+async def test_foreign_seq_conflict_only_retries_offending_row(writer, db_session, session_id):
+    await writer.append(session_id, uuid.uuid4(), "server.rule_alert", {})
+    # Another process takes seq 2 behind this process's allocator.
+    db_session.add(
+        CallEvent(
+            session_id=session_id,
+            event_id=uuid.uuid4(),
+            server_seq=2,
+            type="server.rule_alert",
+            payload={},
+        )
+    )
+    await db_session.commit()
+
+    seq = await writer.append(session_id, uuid.uuid4(), "server.rule_alert", {})
+
+    assert seq == 3
+    assert await _stored_seqs(db_session, session_id) == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_submit_many_commits_batch_in_one_flush(session_factory, db_session, session_id):
+    writer = EventWriter(session_factory=session_factory, batch_size=2, flush_interval_ms=20)
+    writer.start()
+    try:
+        retried_id = uuid.uuid4()
+        first = await writer.append(session_id, retried_id, "client.transcript_segment", {})
+        flushes_before = metrics.histogram("event_writer.flush_size").count
+
+        # Larger than the writer's batch size, and one event is a client retry.
+        events = [(uuid.uuid4(), "client.transcript_segment", {"i": i}, None) for i in range(4)]
+        events.insert(2, (retried_id, "client.transcript_segment", {}, None))
+        seqs = await asyncio.gather(*writer.submit_many(session_id, events))
+    finally:
+        await writer.stop()
+
+    assert seqs == [2, 3, first, 5, 6]
+    assert metrics.histogram("event_writer.flush_size").count == flushes_before + 1
+    assert await _stored_seqs(db_session, session_id) == [1, 2, 3, 5, 6]
@@ -0,0 +1,51 @@
+import asyncio
+
+from app.services.guidance_coalescer import GuidanceCoalescer
+
+
+async def test_triggers_during_a_run_collapse_into_one_trailing_run():
+    runs: list[int] = []
+    release = asyncio.Event()
+
+    async def run():
+        runs.append(len(runs))
+        await release.wait()
+
+    coalescer = GuidanceCoalescer(run, debounce_seconds=0.01, max_staleness_seconds=1.0)
+    coalescer.trigger()
+    await asyncio.sleep(0.03)
+    assert runs == [0] and coalescer.running
+
+    for _ in range(5):
+        coalescer.trigger()
+    await asyncio.sleep(0.03)
+    # The run in flight is not pre-empted, and nothing starts beside it.
+    assert runs == [0] and coalescer.pending
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert runs == [0, 1]
+    assert not coalescer.running and not coalescer.pending
+
+    coalescer.trigger()
+    coalescer.cancel_pending()
+    await asyncio.sleep(0.03)
+    assert runs == [0, 1]
+
+
+async def test_a_steady_stream_of_triggers_cannot_starve_guidance():
+    runs: list[float] = []
+    loop = asyncio.get_running_loop()
+
+    async def run():
+        runs.append(loop.time())
+
+    coalescer = GuidanceCoalescer(run, debounce_seconds=0.05, max_staleness_seconds=0.1)
+    started = loop.time()
+    # Never quiet for the debounce: a trigger every 20ms for 250ms.
+    while loop.time() - started < 0.25:
+        coalescer.trigger()
+        await asyncio.sleep(0.02)
+
+    assert len(runs) >= 2
+    assert runs[0] - started < 0.15
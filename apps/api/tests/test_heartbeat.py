@@ -0,0 +1,128 @@
+import asyncio
+import json
+import uuid
+
+from app.config import settings
+from app.services.connection_registry import SessionEntry
+from app.services.heartbeat import HeartbeatScheduler
+from app.services.replay_buffer import ReplayBuffer
+from app.services.rule_service import SessionRuleState
+from app.services.session_snapshot import SessionSnapshot
+from app.services.websocket_service import (
+    IDLE_CLOSE_CODE,
+    heartbeats,
+    register_connection,
+    registry,
+)
+
+
+class ClosableWebSocket:
+    def __init__(self) -> None:
+        self.closed_with: int | None = None
+
+    async def send_text(self, frame: str) -> None:
+        pass
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.closed_with = code
+
+
+class RecordingSender:
+    def __init__(self) -> None:
+        self.frames: list[str] = []
+
+    def send(self, frame: str, event_type: str | None = None) -> bool:
+        self.frames.append(frame)
+        return True
+
+
+def test_each_connection_is_pinged_once_per_revolution_with_shared_frame():
+    scheduler = HeartbeatScheduler(interval_seconds=4, tick_seconds=1)
+    session_id = uuid.uuid4()
+    senders = [RecordingSender() for _ in range(3)]
+    for sender in senders:
+        scheduler.add(session_id, sender)
+
+    for _ in range(3):
+        scheduler.run_tick(now=0)
+    assert all(sender.frames == [] for sender in senders)
+
+    scheduler.run_tick(now=0)
+    assert all(len(sender.frames) == 1 for sender in senders)
+    assert senders[0].frames[0] is senders[1].frames[0]
+    assert '"system.ping"' in senders[0].frames[0]
+
+    scheduler.remove(senders[2])
+    for _ in range(4):
+        scheduler.run_tick(now=0)
+    assert [len(sender.frames) for sender in senders] == [2, 2, 1]
+    assert len(scheduler) == 2
+    # Each revolution sends a new ping, not the one encoded at registration.
+    assert senders[0].frames[1] is senders[1].frames[1]
+    first, second = (json.loads(frame) for frame in senders[0].frames)
+    assert first["event_id"] != second["event_id"]
+    assert second["ts_created"] >= first["ts_created"]
+
+
+def test_idle_connections_are_reported_instead_of_pinged():
+    idle_batches: list[list] = []
+    scheduler = HeartbeatScheduler(
+        interval_seconds=2,
+        tick_seconds=1,
+        idle_timeout_seconds=10,
+        on_idle=idle_batches.append,
+    )
+    quiet, chatty = RecordingSender(), RecordingSender()
+    scheduler.add(uuid.uuid4(), quiet)
+    scheduler.add(uuid.uuid4(), chatty)
+    scheduler.touch(quiet, now=0)
+    scheduler.touch(chatty, now=100)
+
+    scheduler.run_tick(now=105)
+    scheduler.run_tick(now=105)
+
+    assert [entry.sender for batch in idle_batches for entry in batch] == [quiet]
+    assert quiet.frames == []
+    assert len(chatty.frames) == 1
+
+
+async def test_reaper_closes_and_deregisters_idle_connections():
+    websocket = ClosableWebSocket()
+    session_id = uuid.uuid4()
+    entry = SessionEntry(SessionRuleState(), ReplayBuffer(0, 10, 10_000), SessionSnapshot())
+    sender = register_connection(session_id, entry, websocket)
+    heartbeats.touch(sender, now=0)
+
+    for _ in range(len(heartbeats._slots)):
+        heartbeats.run_tick(now=settings.ws_idle_timeout_seconds + 1)
+    await asyncio.sleep(0)
+
+    assert entry.connections == {}
+    assert len(heartbeats) == 0
+    assert sender.closed
+    assert websocket.closed_with == IDLE_CLOSE_CODE
+    entry.release_handle.cancel()
+    registry.pop_session(session_id)
+
+
+async def test_a_failing_tick_does_not_stop_the_scheduler():
+    def on_idle(entries: list) -> None:
+        raise RuntimeError("reaper failed")
+
+    scheduler = HeartbeatScheduler(
+        interval_seconds=0.01, tick_seconds=0.01, idle_timeout_seconds=0, on_idle=on_idle
+    )
+    idle, live = RecordingSender(), RecordingSender()
+    scheduler.add(uuid.uuid4(), idle)
+    scheduler.start()
+    try:
+        await asyncio.sleep(0.05)
+        # Every tick so far raised from on_idle; the task is still ticking.
+        scheduler.remove(idle)
+        scheduler.idle_timeout_seconds = None
+        scheduler.add(uuid.uuid4(), live)
+        await asyncio.sleep(0.05)
+        assert not scheduler._task.done()
+        assert live.frames
+    finally:
+        await scheduler.stop()
@@ -0,0 +1,228 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.metrics import metrics
+from app.schemas.guidance import GuidanceResponse
+from app.services.llm_cache import LLMResponseCache, RedisCacheTier, SharedCacheTier
+from app.services.llm_client import LLMClient
+from app.services.llm_scheduler import LLMScheduler
+
+
+class _FakeCompletions:
+    def __init__(self, chunks: list[str]) -> None:
+        self.chunks = chunks
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if not kwargs.get("stream"):
+            content = "".join(self.chunks)
+            message = SimpleNamespace(content=content)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        async def stream():
+            yield SimpleNamespace(choices=[])
+            for text in self.chunks:
+                yield SimpleNamespace(
+                    choices=[SimpleNamespace(delta=SimpleNamespace(content=text))]
+                )
+
+        return stream()
+
+
+async def test_streaming_reports_the_reply_as_it_grows_and_validates_the_whole(monkeypatch):
+    monkeypatch.setattr(settings, "openrouter_api_key", "test-key")
+    response = (
+        '{"suggested_reply": "Say \\"sorry\\" \\u2014 then \\ud83d\\ude00 refund.", '
+        '"rationale": "Upset caller", "confidence": 0.8}'
+    )
+    # Split every few characters, so escapes and the surrogate pair straddle chunks.
+    chunks = [response[index : index + 3] for index in range(0, len(response), 3)]
+    client = LLMClient(scheduler=LLMScheduler(max_in_flight=1))
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(chunks)))
+    seen: list[str] = []
+
+    guidance = await client.complete_streaming(
+        [{"role": "user", "content": "Customer: I want a refund"}],
+        schema=GuidanceResponse,
+        field="suggested_reply",
+        on_field=seen.append,
+    )
+
+    assert guidance.suggested_reply == 'Say "sorry" — then \U0001f600 refund.'
+    assert seen[-1] == guidance.suggested_reply
+    assert len(seen) > 5
+    assert all(guidance.suggested_reply.startswith(text) for text in seen)
+    assert metrics.histogram("llm.ttft_ms.guidance").count >= 1
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        value = self.values.get(key)
+        return None if value is None else value.encode()
+
+    async def set(self, key: str, value: str, px: int) -> None:
+        assert px > 0
+        self.values[key] = value
+
+    async def aclose(self) -> None:
+        pass
+
+
+async def test_identical_windows_are_answered_from_the_cache(monkeypatch):
+    monkeypatch.setattr(settings, "openrouter_api_key", "test-key")
+    response = '{"suggested_reply": "Happy to help.", "rationale": "r", "confidence": 0.5}'
+    redis = _FakeRedis()
+
+    def worker() -> tuple[LLMClient, _FakeCompletions]:
+        cache = LLMResponseCache(max_entries=8, ttl_seconds=60, shared=RedisCacheTier(client=redis))
+        client = LLMClient(scheduler=LLMScheduler(max_in_flight=1), cache=cache)
+        completions = _FakeCompletions([response])
+        client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return client, completions
+
+    client, completions = worker()
+    messages = [{"role": "user", "content": "Customer: refund please"}]
+    first = await client.complete(messages, GuidanceResponse)
+    # Whitespace differences do not change the key; another schema or window does.
+    again = await client.complete(
+        [{"role": "user", "content": "  Customer: refund please\n"}], GuidanceResponse
+    )
+    assert again == first and again is not first
+    assert completions.calls == 1
+    await client.complete([{"role": "user", "content": "Agent: hello"}], GuidanceResponse)
+    assert completions.calls == 2
+
+    streamed: list[str] = []
+    await client.complete_streaming(messages, GuidanceResponse, "suggested_reply", streamed.append)
+    assert streamed == ["Happy to help."] and completions.calls == 2
+
+    # Another worker finds the response in the shared tier.
+    hits = metrics.counters.get("llm.cache.shared_hits", 0)
+    other, other_completions = worker()
+    assert await other.complete(messages, GuidanceResponse) == first
+    assert other_completions.calls == 0
+    assert metrics.counters["llm.cache.shared_hits"] == hits + 1
+
+
+def test_a_shared_tier_missing_a_method_fails_when_built():
+    class ReadOnlyTier(SharedCacheTier):
+        async def get(self, key: str) -> str | None:
+            return None
+
+    with pytest.raises(TypeError, match="set"):
+        ReadOnlyTier()
+
+
+class _RacingCompletions:
+    """Per-model behaviour: (seconds before the first chunk, response content)."""
+
+    def __init__(self, models: dict[str, tuple[float, str]]) -> None:
+        self.models = models
+        self.cancelled: list[str] = []
+
+    async def create(self, model: str, stream: bool = False, **kwargs):
+        delay, content = self.models[model]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        if not stream:
+            message = SimpleNamespace(content=content)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        async def chunks():
+            for index in range(0, len(content), 8):
+                delta = SimpleNamespace(content=content[index : index + 8])
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+                await asyncio.sleep(0)
+
+        return chunks()
+
+
+def _reply(text: str) -> str:
+    return f'{{"suggested_reply": "{text}", "rationale": "r", "confidence": 0.5}}'
+
+
+async def test_slow_or_invalid_primary_responses_fall_back(monkeypatch):
+    monkeypatch.setattr(settings, "openrouter_api_key", "test-key")
+    monkeypatch.setattr(settings, "llm_primary_model", "hedge-primary")
+    monkeypatch.setattr(settings, "llm_fallback_model", "hedge-fallback")
+    monkeypatch.setattr(settings, "llm_hedge_default_delay_seconds", 0.02)
+    monkeypatch.setattr(settings, "llm_hedge_min_samples", 5)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay_seconds", 0.01)
+
+    def client_for(models: dict[str, tuple[float, str]]) -> tuple[LLMClient, _RacingCompletions]:
+        client = LLMClient(scheduler=LLMScheduler(max_in_flight=4), cache=LLMResponseCache(0, 0))
+        completions = _RacingCompletions(models)
+        client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return client, completions
+
+    messages = [{"role": "user", "content": "Customer: refund please"}]
+    launched = metrics.counters.get("llm.hedge.launched", 0)
+
+    # The primary lags past the hedge delay: the fallback wins and the primary is cancelled.
+    client, completions = client_for(
+        {"hedge-primary": (5.0, _reply("primary")), "hedge-fallback": (0.0, _reply("fallback"))}
+    )
+    guidance = await client.complete(messages, GuidanceResponse)
+    assert guidance.suggested_reply == "fallback"
+    assert completions.cancelled == ["hedge-primary"]
+    assert metrics.counters["llm.hedge.launched"] == launched + 1
+
+    # A fast but schema-violating primary falls through without waiting for the hedge.
+    client, completions = client_for(
+        {"hedge-primary": (0.0, '{"reply": "no"}'), "hedge-fallback": (0.0, _reply("fallback"))}
+    )
+    guidance = await client.complete(messages, GuidanceResponse)
+    assert guidance.suggested_reply == "fallback"
+    assert metrics.counters["llm.hedge.launched"] == launched + 1
+
+    # Streaming commits to whichever model produces a token first.
+    client, completions = client_for(
+        {"hedge-primary": (5.0, _reply("primary")), "hedge-fallback": (0.0, _reply("fallback"))}
+    )
+    streamed: list[str] = []
+    guidance = await client.complete_streaming(
+        messages, GuidanceResponse, "suggested_reply", streamed.append
+    )
+    assert guidance.suggested_reply == "fallback"
+    assert streamed[-1] == "fallback" and completions.cancelled == ["hedge-primary"]
+
+    # Once the primary has enough samples, its p95 latency is the hedge delay.
+    for _ in range(5):
+        metrics.observe("llm.model.request_ms.hedge-primary", 40.0)
+    assert LLMClient._hedge_delay("llm.model.request_ms.hedge-primary") == 0.04
+
+
+async def test_hedged_primaries_still_feed_its_latency(monkeypatch):
+    monkeypatch.setattr(settings, "openrouter_api_key", "test-key")
+    monkeypatch.setattr(settings, "llm_primary_model", "ratchet-primary")
+    monkeypatch.setattr(settings, "llm_fallback_model", "ratchet-fallback")
+    monkeypatch.setattr(settings, "llm_hedge_min_samples", 5)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay_seconds", 0.001)
+    histogram_name = "llm.model.request_ms.ratchet-primary"
+    for _ in range(5):
+        metrics.observe(histogram_name, 20.0)
+    before = LLMClient._hedge_delay(histogram_name)
+
+    client = LLMClient(scheduler=LLMScheduler(max_in_flight=4), cache=LLMResponseCache(0, 0))
+    completions = _RacingCompletions(
+        {"ratchet-primary": (5.0, _reply("primary")), "ratchet-fallback": (0.0, _reply("fast"))}
+    )
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    for _ in range(10):
+        guidance = await client.complete([{"role": "user", "content": "hi"}], GuidanceResponse)
+        assert guidance.suggested_reply == "fast"
+
+    # Each cancelled primary ran at least as long as the hedge delay it lost to.
+    assert completions.cancelled == ["ratchet-primary"] * 10
+    assert metrics.histogram(histogram_name).count == 15
+    assert LLMClient._hedge_delay(histogram_name) >= before
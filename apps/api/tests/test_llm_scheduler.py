@@ -0,0 +1,80 @@
+import asyncio
+
+from app.metrics import metrics
+from app.services.llm_scheduler import LLMScheduler
+
+
+async def _run(scheduler: LLMScheduler, priority, tenant, name, started, release):
+    async with scheduler.slot(priority, tenant):
+        started.append(name)
+        await release.wait()
+
+
+async def test_guidance_beats_summaries_and_tenants_take_turns():
+    scheduler = LLMScheduler(max_in_flight=1, tenant_max_in_flight=1, priority_max_in_flight={})
+    started: list[str] = []
+    releases = [asyncio.Event() for _ in range(6)]
+
+    tasks = [asyncio.create_task(_run(scheduler, "summary", "a", "blocker", started, releases[0]))]
+    await asyncio.sleep(0)
+    # Queued while the only slot is taken: one summary, then a burst from tenant a.
+    calls = [
+        ("summary", "b", "summary-b"),
+        ("guidance", "a", "guidance-a1"),
+        ("guidance", "a", "guidance-a2"),
+        ("guidance", "b", "guidance-b1"),
+        ("guidance", None, "guidance-untenanted"),
+    ]
+    for (priority, tenant, name), release in zip(calls, releases[1:], strict=True):
+        tasks.append(asyncio.create_task(_run(scheduler, priority, tenant, name, started, release)))
+    await asyncio.sleep(0)
+    assert scheduler.in_flight == 1
+    assert scheduler.queued == 5
+    assert metrics.gauges["llm.scheduler.queued"] == 5
+
+    for release in releases:
+        release.set()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert started == [
+        "blocker",
+        "guidance-a1",
+        "guidance-b1",
+        "guidance-untenanted",
+        "guidance-a2",
+        "summary-b",
+    ]
+    assert scheduler.in_flight == 0
+    assert metrics.histogram("llm.scheduler.queue_wait_ms.guidance").count >= 4
+
+
+async def test_priority_cap_reserves_slots_and_share_is_work_conserving():
+    scheduler = LLMScheduler(
+        max_in_flight=3, tenant_max_in_flight=1, priority_max_in_flight={"summary": 2}
+    )
+    started: list[str] = []
+    release = asyncio.Event()
+
+    summaries = [
+        asyncio.create_task(_run(scheduler, "summary", "a", f"summary-{i}", started, release))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    # Tenant a is past its share but alone, so it gets both summary slots; the
+    # third summary waits because the last slot is held back for guidance.
+    assert started == ["summary-0", "summary-1"]
+    assert scheduler.in_flight == 2
+
+    guidance = asyncio.create_task(_run(scheduler, "guidance", "a", "guidance", started, release))
+    await asyncio.sleep(0)
+    assert started[-1] == "guidance"
+
+    # A caller that gives up while queued leaves no trace behind.
+    summaries[2].cancel()
+    await asyncio.gather(summaries[2], return_exceptions=True)
+    assert scheduler.queued == 0
+
+    release.set()
+    await asyncio.gather(*summaries[:2], guidance)
+    assert scheduler.in_flight == 0
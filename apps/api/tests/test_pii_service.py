@@ -0,0 +1,79 @@
+from app.config import settings
+from app.services.pii_service import PIIService
+
+
+def _spans(text: str) -> tuple[str, list[tuple[str, str]]]:
+    redacted, spans = PIIService().redact_with_spans(text)
+    return redacted, [(span.kind, text[span.start : span.end]) for span in spans]
+
+
+def test_one_pass_finds_every_entity_type_with_spans():
+    text = (
+        "Email jo@example.com, call (555) 123-4567, card 4111 1111 1111 1111, "
+        "SSN 123-45-6789, and I live at 42 Maple Street."
+    )
+
+    redacted, spans = _spans(text)
+
+    assert redacted == (
+        "Email [EMAIL], call [PHONE], card [CARD], SSN [SSN], and I live at [ADDRESS]."
+    )
+    assert spans == [
+        ("email", "jo@example.com"),
+        ("phone", "(555) 123-4567"),
+        ("card", "4111 1111 1111 1111"),
+        ("ssn", "123-45-6789"),
+        ("address", "42 Maple Street"),
+    ]
+
+
+def test_address_needs_capitalized_street_words():
+    for text in (
+        "the 2 best way to go",
+        "I have 10 dogs and 3 cats on the way",
+        "5 ways to court success",
+        "meet at 5 pm on 10 st",
+        "see chapter 11 The Way forward",
+        "is it 10 The Mall Road?",
+    ):
+        assert _spans(text) == (text, [])
+    assert _spans("send it to 221 W 5th ST please") == (
+        "send it to [ADDRESS] please",
+        [("address", "221 W 5th ST")],
+    )
+
+
+def test_address_keeps_the_sentence_period_unless_the_suffix_is_abbreviated():
+    assert _spans("I live at 42 Maple Street. Thanks") == (
+        "I live at [ADDRESS]. Thanks",
+        [("address", "42 Maple Street")],
+    )
+    assert _spans("it is 7 Elm Rd. in town") == (
+        "it is [ADDRESS] in town",
+        [("address", "7 Elm Rd.")],
+    )
+
+
+def test_failed_luhn_check_falls_back_to_other_entity_types():
+    assert _spans("order 4111 1111 1111 1112") == ("order 4111 1111 1111 1112", [])
+    # Looks like a 14-digit card until the checksum fails; the phone is still found.
+    assert _spans("call 555-123-4567 1234") == (
+        "call [PHONE] 1234",
+        [("phone", "555-123-4567")],
+    )
+
+
+def test_redact_dict_audit_names_key_paths(monkeypatch):
+    payload = {"speaker": "customer", "text": "mail a@b.co", "alts": ["555.123.4567"]}
+
+    redacted, audit = PIIService().redact_dict_with_spans(payload)
+
+    assert redacted == {"speaker": "customer", "text": "mail [EMAIL]", "alts": ["[PHONE]"]}
+    assert audit == [
+        {"path": "text", "type": "email", "start": 5, "end": 11},
+        {"path": "alts[0]", "type": "phone", "start": 0, "end": 12},
+    ]
+
+    assert PIIService(entity_types=["email"]).redact("555.123.4567") == "555.123.4567"
+    monkeypatch.setattr(settings, "pii_redaction_mode", "off")
+    assert PIIService().redact_dict(payload) == payload
@@ -0,0 +1,52 @@
+from app.services.replay_buffer import ReplayBuffer
+
+
+def test_frames_after_serves_resume_inside_window():
+    buffer = ReplayBuffer(floor_seq=10, max_events=100, max_bytes=10_000)
+    for seq in range(11, 16):
+        buffer.append(seq, f"frame-{seq}")
+
+    assert buffer.frames_after(13) == ["frame-14", "frame-15"]
+    assert buffer.frames_after(10) == [f"frame-{seq}" for seq in range(11, 16)]
+    assert buffer.frames_after(15) == []
+    # Anything at or below the floor predates the buffer.
+    assert buffer.frames_after(9) is None
+
+
+def test_eviction_by_count_and_bytes_raises_floor():
+    buffer = ReplayBuffer(floor_seq=0, max_events=3, max_bytes=10_000)
+    for seq in range(1, 6):
+        buffer.append(seq, "x")
+    assert len(buffer) == 3
+    assert buffer.floor_seq == 2
+    assert buffer.frames_after(1) is None
+    assert buffer.frames_after(2) == ["x", "x", "x"]
+
+    buffer = ReplayBuffer(floor_seq=0, max_events=100, max_bytes=10)
+    buffer.append(1, "aaaaaa")
+    buffer.append(2, "bbbbbb")
+    assert buffer.size_bytes == 6
+    assert buffer.floor_seq == 1
+
+
+def test_out_of_order_and_duplicate_appends_stay_sorted():
+    buffer = ReplayBuffer(floor_seq=0, max_events=100, max_bytes=10_000)
+    buffer.append(1, "a")
+    buffer.append(3, "c")
+    buffer.append(2, "b")
+    buffer.append(3, "c-again")
+    buffer.append(0, "too-old")
+
+    assert buffer.frames_after(0) == ["a", "b", "c"]
+
+
+def test_replace_swaps_a_held_frame_and_keeps_byte_count():
+    buffer = ReplayBuffer(floor_seq=0, max_events=100, max_bytes=10_000)
+    buffer.append(1, "aa")
+    buffer.append(2, "bb")
+
+    assert buffer.replace(1, "corrected")
+    assert not buffer.replace(3, "missing")
+    assert buffer.get(1) == "corrected"
+    assert buffer.frames_after(0) == ["corrected", "bb"]
+    assert buffer.size_bytes == len("corrected") + 2
@@ -0,0 +1,61 @@
+import random
+import re
+
+from app.services.rule_matcher import AhoCorasick, CompiledRule, RuleMatcher
+
+
+def _rule(rule_id: str, patterns: list[str]) -> CompiledRule:
+    compiled = [(pattern, re.compile(pattern, re.IGNORECASE)) for pattern in patterns]
+    return CompiledRule(rule_id, "keyword_alert", {}, compiled)
+
+
+def _naive(rules: list[CompiledRule], text: str) -> list[tuple[str, str]]:
+    matches = []
+    for rule in rules:
+        for source, _compiled in rule.patterns:
+            if re.search(source, text, re.IGNORECASE):
+                matches.append((rule.rule_id, source))
+                break
+    return matches
+
+
+def test_aho_corasick_finds_overlapping_keywords():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    assert automaton.find_all("ushers") == {0, 1, 3}
+
+
+def test_matcher_reports_first_matching_pattern_in_rule_order():
+    rules = [
+        _rule("competitor", ["CoolBreeze", "AC Pro"]),
+        _rule("guarantee", ["guarantee.*today", "promise"]),
+        _rule("price", ["price", "cost"]),
+        _rule("empty", [""]),
+    ]
+    matcher = RuleMatcher(rules)
+
+    text = "AC PRO said they guarantee it today, what does it cost?"
+    assert [(rule.rule_id, source) for rule, source in matcher.match(text)] == [
+        ("competitor", "AC Pro"),
+        ("guarantee", "guarantee.*today"),
+        ("price", "cost"),
+        ("empty", ""),
+    ]
+
+
+def test_matcher_agrees_with_per_rule_search():
+    rng = random.Random(7)
+    words = ["price", "cost", "cancel", "warranty", "today", "pets", "address", "café", "fire"]
+    regexes = ["guarantee.*today", r"shut.*off", r"\bpets?\b", r"(\w+) \1", "ca[fn]"]
+    rules = [
+        _rule(
+            f"rule_{index}",
+            rng.sample(words + regexes, rng.randint(1, 4)),
+        )
+        for index in range(40)
+    ]
+    matcher = RuleMatcher(rules)
+
+    for _ in range(200):
+        text = " ".join(rng.choices(words + ["guarantee", "shut", "off", "CAFÉ"], k=6))
+        actual = [(rule.rule_id, source) for rule, source in matcher.match(text)]
+        assert actual == _naive(rules, text), text
@@ -0,0 +1,159 @@
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.metrics import metrics
+from app.models.call_event import CallEvent
+from app.models.call_session import CallSession
+from app.models.ruleset import Rule, RuleSet
+from app.services.rule_service import (
+    RuleService,
+    SessionRuleState,
+    invalidate_rule_packs,
+    load_rule_state,
+)
+
+
+@pytest.fixture
+async def ruleset(db_session):
+    invalidate_rule_packs()
+    ruleset = RuleSet(tenant_id=f"tenant-{uuid.uuid4().hex[:8]}", status="active", version=1)
+    ruleset.rules = [
+        Rule(
+            kind="keyword_alert",
+            config={
+                "id": "price_concern",
+                "patterns": ["(unclosed", "price"],
+                "severity": "info",
+                "message": "Price sensitivity detected",
+            },
+            enabled=True,
+        ),
+        Rule(
+            kind="required_question",
+            config={
+                "id": "confirm_service_address",
+                "question": "Confirm the service address",
+                "satisfy_patterns": ["address"],
+            },
+            enabled=True,
+        ),
+    ]
+    db_session.add(ruleset)
+    await db_session.commit()
+    yield ruleset
+    invalidate_rule_packs()
+
+
+def _scope(ruleset: RuleSet):
+    return (ruleset.tenant_id, None, None, None)
+
+
+@pytest.mark.asyncio
+async def test_evaluate_segment_skips_invalid_patterns(db_session, ruleset):
+    service = RuleService(db_session)
+    events = await service.evaluate_segment(
+        uuid.uuid4(), _scope(ruleset), "What is the PRICE to my address?"
+    )
+
+    by_type = {event.type: event for event in events}
+    assert set(by_type) == {"server.rule_alert", "server.required_question_status"}
+    assert by_type["server.rule_alert"].payload["matched_pattern"] == "price"
+
+
+@pytest.mark.asyncio
+async def test_rule_pack_cache_hit_and_version_invalidation(db_session, ruleset, monkeypatch):
+    service = RuleService(db_session)
+    first = await service.get_rule_pack(_scope(ruleset))
+
+    hits_before = metrics.counters.get("rule_pack.cache_hits", 0)
+    assert await service.get_rule_pack(_scope(ruleset)) is first
+    assert metrics.counters["rule_pack.cache_hits"] == hits_before + 1
+
+    # Force revalidation: unchanged versions keep the compiled pack.
+    monkeypatch.setattr(settings, "rule_pack_revalidate_seconds", 0)
+    assert await service.get_rule_pack(_scope(ruleset)) is first
+
+    ruleset.rules.append(
+        Rule(kind="keyword_alert", config={"id": "cancel", "patterns": ["cancel"]}, enabled=True)
+    )
+    ruleset.version = 2
+    await db_session.commit()
+
+    reloaded = await service.get_rule_pack(_scope(ruleset))
+    assert reloaded is not first
+    assert "cancel" in {rule.rule_id for rule in reloaded.rules}
+
+
+
+@pytest.mark.asyncio
+async def test_session_state_suppresses_repeats_and_rebuilds(db_session, ruleset):
+    session = CallSession(tenant_id=ruleset.tenant_id)
+    db_session.add(session)
+    await db_session.commit()
+    service = RuleService(db_session)
+    state = SessionRuleState()
+    text = "What's the price? And my address is on Maple."
+
+    first = await service.evaluate_segment(session.id, _scope(ruleset), text, state)
+    assert {event.type for event in first} == {
+        "server.rule_alert",
+        "server.required_question_status",
+    }
+    # The question is already satisfied and the alert is within its cooldown.
+    assert await service.evaluate_segment(session.id, _scope(ruleset), text, state) == []
+
+    for seq, event in enumerate(first, start=1):
+        db_session.add(
+            CallEvent(
+                session_id=session.id,
+                event_id=event.event_id,
+                server_seq=seq,
+                type=event.type,
+                payload=event.payload,
+                created_at=event.ts_created,
+            )
+        )
+    await db_session.commit()
+
+    rebuilt = await load_rule_state(db_session, session.id)
+    assert rebuilt.satisfied_questions == {"confirm_service_address"}
+    assert set(rebuilt.last_alert_at) == {"price_concern"}
+    assert await service.evaluate_segment(session.id, _scope(ruleset), text, rebuilt) == []
+
+
+@pytest.mark.asyncio
+async def test_rules_opt_into_redacted_text(db_session, ruleset):
+    ruleset.rules.append(
+        Rule(
+            kind="keyword_alert",
+            config={
+                "id": "phone_shared",
+                "patterns": [r"\[PHONE\]"],
+                "text_source": "redacted",
+                "message": "Customer shared a phone number",
+            },
+            enabled=True,
+        )
+    )
+    ruleset.rules.append(
+        Rule(
+            kind="keyword_alert",
+            config={"id": "raw_placeholder", "patterns": [r"\[PHONE\]"]},
+            enabled=True,
+        )
+    )
+    ruleset.version = 2
+    await db_session.commit()
+    invalidate_rule_packs()
+    service = RuleService(db_session)
+    text = "Call me back on 555-123-4567"
+
+    passed_in = await service.evaluate_segment(
+        uuid.uuid4(), _scope(ruleset), text, redacted_text="Call me back on [PHONE]"
+    )
+    redacted_here = await service.evaluate_segment(uuid.uuid4(), _scope(ruleset), text)
+
+    for events in (passed_in, redacted_here):
+        assert [event.payload["rule_id"] for event in events] == ["phone_shared"]
@@ -0,0 +1,49 @@
+import uuid
+
+import pytest
+
+from app.models.call_event import CallEvent
+from app.models.call_session import CallSession
+from app.services.sequence_service import (
+    SequenceAllocator,
+    release_allocator,
+    reseed_allocator,
+    seed_allocator,
+)
+
+
+def test_allocator_is_monotonic():
+    allocator = SequenceAllocator(5)
+    assert allocator.next() == 6
+    allocator.observe(3)
+    assert allocator.next() == 7
+    allocator.observe(10)
+    assert allocator.next() == 11
+
+
+@pytest.mark.asyncio
+async def test_seed_and_reseed_from_db(db_session):
+    session = CallSession()
+    db_session.add(session)
+    await db_session.commit()
+    try:
+        allocator = await seed_allocator(db_session, session.id)
+        assert allocator.last_seq == 0
+        assert await seed_allocator(db_session, session.id) is allocator
+
+        # Another process writes seq 4 behind this allocator's back.
+        db_session.add(
+            CallEvent(
+                session_id=session.id,
+                event_id=uuid.uuid4(),
+                server_seq=4,
+                type="server.rule_alert",
+                payload={},
+            )
+        )
+        await db_session.commit()
+
+        await reseed_allocator(db_session, session.id)
+        assert allocator.next() == 5
+    finally:
+        release_allocator(session.id)
@@ -0,0 +1,131 @@
+import asyncio
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from app.metrics import metrics
+from app.models.call_event import CallEvent
+from app.models.call_session import CallSession
+from app.schemas.events import EventEnvelope
+from app.services import session_pipeline
+from app.services.event_writer import EventWriter
+from app.services.sequence_service import release_allocator, seed_allocator
+from app.services.session_pipeline import SessionPipeline
+
+
+@pytest.fixture
+async def writer(session_factory, monkeypatch):
+    event_writer = EventWriter(session_factory=session_factory, flush_interval_ms=20)
+    event_writer.start()
+    monkeypatch.setattr(session_pipeline, "event_writer", event_writer)
+    yield event_writer
+    await event_writer.stop()
+
+
+@pytest.fixture
+async def session_id(db_session):
+    session = CallSession()
+    db_session.add(session)
+    await db_session.commit()
+    await seed_allocator(db_session, session.id)
+    yield session.id
+    release_allocator(session.id)
+
+
+def _event(session_id: uuid.UUID, event_type: str = "client.transcript_segment") -> EventEnvelope:
+    return EventEnvelope(session_id=session_id, type=event_type, ts_created=datetime.now(UTC))
+
+
+async def test_broadcasts_in_server_seq_order_with_follow_up_events(writer, session_id):
+    handled: list[tuple[str, int]] = []
+    done = asyncio.Event()
+
+    async def handler(sid, item, server_seq):
+        handled.append((item.event.type, server_seq))
+        if item.scope is not None:
+            # Like a rule alert: raised while later segments are already queued.
+            pipeline.submit(_event(sid, "server.rule_alert"), {})
+        if len(handled) == 4:
+            done.set()
+
+    pipeline = SessionPipeline(session_id, handler)
+    first = pipeline.submit(_event(session_id), {}, scope=("t", None, None, None))
+    second = pipeline.submit(_event(session_id), {})
+    third = pipeline.submit(_event(session_id), {})
+
+    # Durability (what the ack waits for) does not wait on the handler.
+    assert await asyncio.gather(first, second, third) == [1, 2, 3]
+    await asyncio.wait_for(done.wait(), 2)
+
+    assert [seq for _, seq in handled] == [1, 2, 3, 4]
+    assert handled[-1][0] == "server.rule_alert"
+    assert len(pipeline) == 0
+    assert metrics.histogram("pipeline.queue_wait_ms").count >= 4
+
+
+async def test_interim_events_coalesce_in_order_without_being_written(writer, session_id):
+    handled: list[tuple[str, int | None, str]] = []
+    done = asyncio.Event()
+
+    async def handler(sid, item, server_seq):
+        handled.append((item.event.type, server_seq, item.event.payload.get("text", "")))
+        if len(handled) == 4:
+            done.set()
+
+    def interim(speaker: str, text: str) -> EventEnvelope:
+        event = _event(session_id, "server.transcript_interim")
+        event.payload = {"speaker": speaker, "text": text}
+        return event
+
+    pipeline = SessionPipeline(session_id, handler)
+    first = pipeline.submit(_event(session_id), {})
+    pipeline.publish(interim("customer", "I need"))
+    pipeline.publish(interim("customer", "I need a refund"))
+    pipeline.publish(interim("csr", "Sure"))
+    second = pipeline.submit(_event(session_id), {})
+
+    assert await asyncio.gather(first, second) == [1, 2]
+    await asyncio.wait_for(done.wait(), 2)
+
+    assert handled == [
+        ("client.transcript_segment", 1, ""),
+        ("server.transcript_interim", None, "I need a refund"),
+        ("server.transcript_interim", None, "Sure"),
+        ("client.transcript_segment", 2, ""),
+    ]
+
+
+async def test_event_retried_after_seq_conflict_is_broadcast_in_seq_order(
+    writer, session_id, db_session
+):
+    # Another process takes seq 1 behind this process's allocator.
+    db_session.add(
+        CallEvent(
+            session_id=session_id,
+            event_id=uuid.uuid4(),
+            server_seq=1,
+            type="server.rule_alert",
+            payload={},
+        )
+    )
+    await db_session.commit()
+    handled: list[tuple[str, int]] = []
+    done = asyncio.Event()
+
+    async def handler(sid, item, server_seq):
+        handled.append((item.event.payload["name"], server_seq))
+        if len(handled) == 3:
+            done.set()
+
+    pipeline = SessionPipeline(session_id, handler)
+    durables = []
+    for name in ("first", "second", "third"):
+        event = _event(session_id)
+        event.payload = {"name": name}
+        durables.append(pipeline.submit(event, event.payload))
+
+    # The first event lost seq 1 and was rewritten after the other two.
+    assert await asyncio.gather(*durables) == [4, 2, 3]
+    await asyncio.wait_for(done.wait(), 2)
+    assert handled == [("second", 2), ("third", 3), ("first", 4)]
@@ -0,0 +1,23 @@
+from app.services.session_snapshot import SessionSnapshot
+
+
+def test_snapshot_folds_events_incrementally():
+    snapshot = SessionSnapshot()
+    snapshot.apply("client.transcript_segment", {"speaker": "customer", "text": "hi"}, 1)
+    snapshot.apply("server.rule_alert", {"rule_id": "price_concern", "message": "first"}, 2)
+    snapshot.apply(
+        "server.required_question_status", {"rule_id": "confirm_address", "satisfied": True}, 3
+    )
+    snapshot.apply("server.guidance_update", {"suggested_reply": "Sure"}, 5)
+    # Guidance and transcript can be broadcast out of seq order.
+    snapshot.apply("client.transcript_segment", {"speaker": "agent", "text": "hello"}, 4)
+    snapshot.apply("server.rule_alert", {"rule_id": "price_concern", "message": "again"}, 6)
+    # A retried client event is re-broadcast with its original seq.
+    snapshot.apply("client.transcript_segment", {"speaker": "agent", "text": "hello"}, 4)
+
+    payload = snapshot.to_payload()
+    assert snapshot.server_seq == 6
+    assert [entry["text"] for entry in payload["transcript"]] == ["hi", "hello"]
+    assert payload["alerts"] == [{"rule_id": "price_concern", "message": "again"}]
+    assert payload["required_questions"][0]["satisfied"] is True
+    assert payload["guidance"] == {"suggested_reply": "Sure"}
@@ -0,0 +1,77 @@
+from app.services.streaming_redactor import StreamingRedactor
+
+
+def _feed(redactor: StreamingRedactor, speaker: str, text: str, ref: str):
+    redacted, _, corrections = redactor.feed(speaker, text, ref)
+    return redacted, [(correction.ref, correction.text) for correction in corrections]
+
+
+def test_entities_split_across_segments_correct_the_earlier_one():
+    redactor = StreamingRedactor()
+
+    assert _feed(redactor, "customer", "my number is five five five", "a") == (
+        "my number is five five five",
+        [],
+    )
+    # The agent's turn in between does not break the customer's carry-over.
+    assert _feed(redactor, "agent", "go ahead", "b") == ("go ahead", [])
+    # An interim segment is checked against the carry-over but not added to it.
+    assert redactor.peek("customer", "one two three") == ("one two three", [])
+    assert _feed(redactor, "customer", "one two three four five six seven thanks", "c") == (
+        "[PHONE] thanks",
+        [("a", "my number is [PHONE]")],
+    )
+
+    assert _feed(redactor, "customer", "card 4111 1111", "d") == ("card 4111 1111", [])
+    assert _feed(redactor, "customer", "1111 1111 ok", "e") == (
+        "[CARD] ok",
+        [("d", "card [CARD]")],
+    )
+
+
+def test_carry_over_is_bounded_and_short_digit_runs_stay():
+    redactor = StreamingRedactor(carry_chars=32)
+
+    _feed(redactor, "customer", "it is five five five", "a")
+    _feed(redactor, "customer", "and we have waited for the technician all day long", "b")
+    assert _feed(redactor, "customer", "one two three four", "c") == ("one two three four", [])
+
+    _feed(redactor, "customer", "I have two dogs and", "d")
+    assert _feed(redactor, "customer", "one cat at home", "e") == ("one cat at home", [])
+
+
+def test_no_carry_over_redacts_each_segment_on_its_own():
+    redactor = StreamingRedactor(carry_chars=0)
+
+    assert _feed(redactor, "customer", "my number is five five five", "a") == (
+        "my number is five five five",
+        [],
+    )
+    assert _feed(redactor, "customer", "one two three four five six seven", "b") == (
+        "[PHONE]",
+        [],
+    )
+    assert _feed(redactor, "customer", "or 555 123 4567", "c") == ("or [PHONE]", [])
+
+
+def test_years_and_prices_next_to_a_boundary_are_not_phone_numbers():
+    redactor = StreamingRedactor()
+
+    _feed(redactor, "customer", "it has been acting up since back in 2019", "a")
+    assert _feed(redactor, "customer", "2020 was when it first broke", "b") == (
+        "2020 was when it first broke",
+        [],
+    )
+    _feed(redactor, "customer", "the quote came to 4,500.", "c")
+    assert _feed(redactor, "customer", "200 of that is labor", "d") == ("200 of that is labor", [])
+    _feed(redactor, "customer", "we have two.", "e")
+    assert _feed(redactor, "customer", "one two three four five six is the model", "f") == (
+        "one two three four five six is the model",
+        [],
+    )
+    # Numerals in a real phone grouping are still joined across the boundary.
+    _feed(redactor, "customer", "call me on 555 123", "g")
+    assert _feed(redactor, "customer", "4567 after six", "h") == (
+        "[PHONE] after six",
+        [("g", "call me on [PHONE]")],
+    )
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import WebSocketDisconnect
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.call_event import CallEvent
+from app.models.call_session import CallSession
+from app.routers import ws
+
+
+class ClientWebSocket:
+    """The router's end of a connection whose client side the test drives."""
+
+    def __init__(self) -> None:
+        self._inbound: asyncio.Queue[str | None] = asyncio.Queue()
+        self._outbound: asyncio.Queue[dict] = asyncio.Queue()
+
+    async def accept(self) -> None:
+        pass
+
+    async def receive_text(self) -> str:
+        frame = await self._inbound.get()
+        if frame is None:
+            raise WebSocketDisconnect(code=1000)
+        return frame
+
+    async def send_text(self, frame: str) -> None:
+        self._outbound.put_nowait(json.loads(frame))
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        pass
+
+    def send(self, frame: dict) -> None:
+        self._inbound.put_nowait(json.dumps(frame))
+
+    def hang_up(self) -> None:
+        self._inbound.put_nowait(None)
+
+    async def receive(self) -> dict:
+        return await asyncio.wait_for(self._outbound.get(), 5)
+
+    async def drain(self) -> list[dict]:
+        """Everything sent so far, once the session worker has gone quiet."""
+        await asyncio.sleep(0.05)
+        frames = []
+        while not self._outbound.empty():
+            frames.append(self._outbound.get_nowait())
+        return frames
+
+
+def _event(session_id: uuid.UUID, speaker: str, text: str, is_final: bool = True) -> dict:
+    return {
+        "event_id": str(uuid.uuid4()),
+        "session_id": str(session_id),
+        "type": "client.transcript_segment",
+        "ts_created": datetime.now(UTC).isoformat(),
+        "payload": {"speaker": speaker, "text": text, "is_final": is_final},
+    }
+
+
+def _batch(session_id: uuid.UUID, events: list[dict], client_seq: int = 1) -> dict:
+    return {
+        "event_id": str(uuid.uuid4()),
+        "session_id": str(session_id),
+        "type": "client.batch",
+        "ts_created": datetime.now(UTC).isoformat(),
+        "events": events,
+        "client_seq": client_seq,
+    }
+
+
+@pytest.fixture
+async def connected(session_factory, monkeypatch):
+    """A call open on the WebSocket endpoint, with guidance held off."""
+    monkeypatch.setattr(ws, "async_session", session_factory)
+    monkeypatch.setattr(settings, "openrouter_api_key", "test-key")
+    monkeypatch.setattr(settings, "session_state_linger_seconds", 0)
+    monkeypatch.setattr(settings, "llm_guidance_debounce_seconds", 60)
+    async with session_factory() as db:
+        session = CallSession()
+        db.add(session)
+        await db.commit()
+
+    websocket = ClientWebSocket()
+    call = asyncio.create_task(ws.session_ws(websocket, session.id))
+    yield session.id, websocket
+    websocket.hang_up()
+    await asyncio.wait_for(call, 5)
+    await asyncio.sleep(0)
+
+
+async def _stored(session_factory, session_id: uuid.UUID) -> list[tuple[int, str]]:
+    async with session_factory() as db:
+        rows = await db.execute(
+            select(CallEvent.server_seq, CallEvent.payload)
+            .where(CallEvent.session_id == session_id)
+            .order_by(CallEvent.server_seq)
+        )
+        return [(server_seq, payload["text"]) for server_seq, payload in rows.all()]
+
+
+async def test_one_ack_carries_every_server_seq_of_the_batch(connected, session_factory):
+    session_id, websocket = connected
+    batch = _batch(
+        session_id, [_event(session_id, "customer", f"line {index}") for index in range(3)], 7
+    )
+
+    websocket.send(batch)
+
+    frames = await websocket.drain()
+    acks = [frame for frame in frames if frame["type"] == "server.ack"]
+    assert len(acks) == 1
+    ack = acks[0]
+    assert ack["client_seq"] == 7 and ack["server_seq"] == 3
+    assert ack["payload"] == {
+        "acknowledged": True,
+        "event_count": 3,
+        "first_server_seq": 1,
+        "last_server_seq": 3,
+        "server_seqs": [1, 2, 3],
+    }
+    broadcast = [frame for frame in frames if frame["type"] == "client.transcript_segment"]
+    assert [frame["server_seq"] for frame in broadcast] == [1, 2, 3]
+    assert await _stored(session_factory, session_id) == [
+        (1, "line 0"),
+        (2, "line 1"),
+        (3, "line 2"),
+    ]
+
+
+async def test_a_batch_above_the_limit_is_rejected_whole(connected, session_factory, monkeypatch):
+    session_id, websocket = connected
+    monkeypatch.setattr(settings, "ws_batch_max_events", 2)
+
+    batch = _batch(
+        session_id, [_event(session_id, "customer", f"line {index}") for index in range(3)], 4
+    )
+    websocket.send(batch)
+    websocket.send(_event(session_id, "customer", "after the batch"))
+
+    rejection = await websocket.receive()
+    # The batch is refused by name, so the client need not wait out its ack timeout.
+    assert rejection["type"] == "server.ack"
+    assert rejection["event_id"] == batch["event_id"] and rejection["client_seq"] == 4
+    assert rejection["server_seq"] is None
+    assert rejection["payload"] == {
+        "acknowledged": False,
+        "error": "batch_too_large",
+        "max_events": 2,
+    }
+    # Nothing of the batch was taken: the next event gets the first server_seq.
+    ack = await websocket.receive()
+    while ack["type"] != "server.ack":
+        ack = await websocket.receive()
+    assert ack["server_seq"] == 1
+    await websocket.drain()
+    assert await _stored(session_factory, session_id) == [(1, "after the batch")]
+
+
+async def test_interims_superseded_within_the_batch_are_dropped(
+    connected, session_factory, monkeypatch
+):
+    session_id, websocket = connected
+    monkeypatch.setattr(settings, "transcript_interim_mode", True)
+
+    websocket.send(
+        _batch(
+            session_id,
+            [
+                _event(session_id, "customer", "I wa", is_final=False),
+                _event(session_id, "csr", "one mo", is_final=False),
+                _event(session_id, "customer", "I want", is_final=False),
+                _event(session_id, "customer", "I want a refund"),
+                _event(session_id, "customer", "and", is_final=False),
+                _event(session_id, "csr", "one moment", is_final=False),
+            ],
+        )
+    )
+
+    frames = await websocket.drain()
+    ack = next(frame for frame in frames if frame["type"] == "server.ack")
+    assert ack["payload"]["event_count"] == 6
+    assert ack["payload"]["server_seqs"] == [1]
+    # The final replaces the customer's earlier interims; only the newest interim of
+    # each speaker goes out, after the final.
+    broadcast = [
+        (frame["type"], frame["payload"]["speaker"], frame["payload"]["text"])
+        for frame in frames
+        if frame["type"] != "server.ack"
+    ]
+    assert broadcast[0] == ("client.transcript_segment", "customer", "I want a refund")
+    assert sorted(broadcast[1:]) == [
+        ("server.transcript_interim", "csr", "one moment"),
+        ("server.transcript_interim", "customer", "and"),
+    ]
+    assert await _stored(session_factory, session_id) == [(1, "I want a refund")]
@@ -0,0 +1,86 @@
+import asyncio
+
+from fastapi import WebSocketDisconnect
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.models.call_session import CallSession
+from app.routers import ws
+from app.services.websocket_service import registry
+
+IDLE_CALLS = 1000
+POOL_SIZE = 10
+
+
+class IdleWebSocket:
+    """A connected client that never sends anything until it hangs up."""
+
+    def __init__(self, hang_up: asyncio.Event) -> None:
+        self.accepted = asyncio.Event()
+        self.closed_with: int | None = None
+        self._hang_up = hang_up
+
+    async def accept(self) -> None:
+        self.accepted.set()
+
+    async def receive_text(self) -> str:
+        await self._hang_up.wait()
+        raise WebSocketDisconnect(code=1000)
+
+    async def send_text(self, frame: str) -> None:
+        pass
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.closed_with = code
+        self.accepted.set()
+
+
+async def test_idle_websockets_do_not_hold_pooled_connections(
+    test_engine, session_factory, monkeypatch
+):
+    async with test_engine.connect() as conn:
+        schema = await conn.scalar(text("SELECT current_schema()"))
+    engine = create_async_engine(
+        settings.database_url,
+        pool_size=POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=5,
+        connect_args={"server_settings": {"search_path": schema}},
+    )
+    monkeypatch.setattr(
+        ws, "async_session", async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    monkeypatch.setattr(settings, "session_state_linger_seconds", 0)
+    monkeypatch.setattr(settings, "openrouter_api_key", "test-key")
+
+    async with session_factory() as db:
+        sessions = [CallSession() for _ in range(IDLE_CALLS)]
+        db.add_all(sessions)
+        await db.commit()
+        session_ids = [session.id for session in sessions]
+
+    hang_up = asyncio.Event()
+    websockets = [IdleWebSocket(hang_up) for _ in session_ids]
+    calls = [
+        asyncio.create_task(ws.session_ws(websocket, session_id))
+        for websocket, session_id in zip(websockets, session_ids, strict=True)
+    ]
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(websocket.accepted.wait() for websocket in websockets)), 60
+        )
+        assert all(websocket.closed_with is None for websocket in websockets)
+        assert sum(registry.get(session_id) is not None for session_id in session_ids) == IDLE_CALLS
+
+        # Every call is open and idle, yet the pool is free for new work.
+        assert engine.pool.checkedout() == 0
+        async with ws.async_session() as db:
+            assert (await db.execute(select(CallSession.id).limit(1))).scalar_one()
+    finally:
+        hang_up.set()
+        await asyncio.gather(*calls, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        await engine.dispose()
+
+    assert all(registry.get(session_id) is None for session_id in session_ids)
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from app.config import settings
+from app.models.call_event import CallEvent
+from app.models.call_session import CallSession
+from app.schemas.events import EventEnvelope
+from app.services import websocket_service
+from app.services.connection_registry import SessionEntry
+from app.services.replay_buffer import ReplayBuffer
+from app.services.rule_service import SessionRuleState
+from app.services.session_snapshot import SessionSnapshot
+from app.services.websocket_service import WebSocketService
+
+
+class RecordingWebSocket:
+    def __init__(self) -> None:
+        self.sent: list[dict] = []
+
+    async def send_text(self, frame: str) -> None:
+        self.sent.append(json.loads(frame))
+
+
+def _no_db():
+    raise AssertionError("resume served from the replay buffer must not touch the DB")
+
+
+def _frame(session_id: uuid.UUID, server_seq: int, source: str) -> str:
+    return EventEnvelope(
+        session_id=session_id,
+        type="client.transcript_segment",
+        ts_created=datetime.now(UTC),
+        payload={"speaker": "customer", "text": f"segment {server_seq}", "source": source},
+        server_seq=server_seq,
+    ).model_dump_json()
+
+
+@pytest.fixture
+async def resumable(db_session, monkeypatch):
+    """A session with seqs 1-8 stored and only 6-8 still in its replay buffer."""
+    monkeypatch.setattr(settings, "openrouter_api_key", "test-key")
+    monkeypatch.setattr(settings, "session_state_linger_seconds", 0)
+    session = CallSession()
+    db_session.add(session)
+    await db_session.commit()
+    db_session.add_all(
+        CallEvent(
+            session_id=session.id,
+            event_id=uuid.uuid4(),
+            server_seq=seq,
+            type="client.transcript_segment",
+            payload={"speaker": "customer", "text": f"segment {seq}", "source": "db"},
+        )
+        for seq in range(1, 9)
+    )
+    await db_session.commit()
+
+    entry = SessionEntry(SessionRuleState(), ReplayBuffer(0, 3, 1_000_000), SessionSnapshot())
+    for seq in range(1, 9):
+        frame = _frame(session.id, seq, "buffer")
+        entry.replay_buffer.append(seq, frame)
+        entry.snapshot.apply("client.transcript_segment", json.loads(frame)["payload"], seq)
+    assert entry.replay_buffer.floor_seq == 5
+
+    websocket = RecordingWebSocket()
+    websocket_service.register_connection(session.id, entry, websocket)
+    yield session.id, websocket
+    websocket_service._deregister(session.id, websocket)
+    await asyncio.sleep(0)
+
+
+async def _resume(service, session_id, websocket, last_server_seq: int) -> list[dict]:
+    await service.handle_resume(websocket, session_id, {"last_server_seq": last_server_seq})
+    await asyncio.sleep(0.01)
+    return websocket.sent
+
+
+async def test_resume_within_the_buffer_does_not_touch_the_db(resumable):
+    session_id, websocket = resumable
+
+    frames = await _resume(WebSocketService(_no_db), session_id, websocket, 6)
+
+    assert [(frame["server_seq"], frame["payload"]["source"]) for frame in frames] == [
+        (7, "buffer"),
+        (8, "buffer"),
+    ]
+
+
+async def test_resume_past_the_buffer_reads_only_the_evicted_range(resumable, session_factory):
+    session_id, websocket = resumable
+    statements: list[str] = []
+
+    def recording_factory():
+        db = session_factory()
+        execute = db.execute
+
+        async def recorded(statement, *args, **kwargs):
+            statements.append(str(statement.compile(compile_kwargs={"literal_binds": True})))
+            return await execute(statement, *args, **kwargs)
+
+        db.execute = recorded
+        return db
+
+    frames = await _resume(WebSocketService(recording_factory), session_id, websocket, 2)
+
+    # (2, floor_seq] comes from the DB, the rest from the buffer.
+    assert [(frame["server_seq"], frame["payload"]["source"]) for frame in frames] == [
+        (3, "db"),
+        (4, "db"),
+        (5, "db"),
+        (6, "buffer"),
+        (7, "buffer"),
+        (8, "buffer"),
+    ]
+    assert len(statements) == 1
+    assert "call_events.server_seq > 2" in statements[0]
+    assert "call_events.server_seq <= 5" in statements[0]
+
+
+async def test_long_gap_sends_one_resync_frame_instead_of_a_replay(resumable, monkeypatch):
+    session_id, websocket = resumable
+    monkeypatch.setattr(settings, "resync_gap_threshold", 4)
+
+    frames = await _resume(WebSocketService(_no_db), session_id, websocket, 2)
+
+    assert len(frames) == 1
+    resync = frames[0]
+    assert resync["type"] == "system.resync"
+    assert resync["server_seq"] == 8
+    assert [entry["server_seq"] for entry in resync["payload"]["transcript"]] == list(range(1, 9))
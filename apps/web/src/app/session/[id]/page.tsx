@@ -7,7 +7,7 @@ import GuidancePanel from "@/components/GuidancePanel";
 import TranscriptPanel from "@/components/TranscriptPanel";
 import { getSession } from "@/lib/api";
 import { ServerEvent, SessionWebSocket } from "@/lib/ws";
-import { useSessionStore } from "@/stores/sessionStore";
+import { RequiredQuestion, RuleAlert, useSessionStore } from "@/stores/sessionStore";
 
 function formatTimestamp(payload: Record<string, unknown>, tsCreated: string): string {
   const timestampMs = payload.timestamp_ms;
@@ -17,6 +17,26 @@ function formatTimestamp(payload: Record<string, unknown>, tsCreated: string): s
   return new Date(tsCreated).toLocaleTimeString();
 }
 
+function toRuleAlert(payload: Record<string, unknown>): RuleAlert {
+  return {
+    ruleId: String(payload.rule_id ?? "unknown_rule"),
+    kind: String(payload.kind ?? "rule_alert"),
+    severity: String(payload.severity ?? "info") as RuleAlert["severity"],
+    message: String(payload.message ?? "Rule alert triggered"),
+    matchedPattern:
+      payload.matched_pattern !== undefined ? String(payload.matched_pattern) : undefined,
+  };
+}
+
+function toRequiredQuestion(payload: Record<string, unknown>): RequiredQuestion {
+  const ruleId = String(payload.rule_id ?? "unknown_question");
+  return {
+    ruleId,
+    satisfied: Boolean(payload.satisfied),
+    label: payload.question ? String(payload.question) : ruleId.replaceAll("_", " "),
+  };
+}
+
 export default function SessionPage() {
   const params = useParams<{ id: string }>();
   const sessionId = useMemo(() => {
@@ -30,10 +50,14 @@ export default function SessionPage() {
   const setSessionId = useSessionStore((state) => state.setSessionId);
   const setStatus = useSessionStore((state) => state.setStatus);
   const addSegment = useSessionStore((state) => state.addSegment);
+  const setInterim = useSessionStore((state) => state.setInterim);
+  const correctSegment = useSessionStore((state) => state.correctSegment);
   const setFullTranscript = useSessionStore((state) => state.setFullTranscript);
   const addAlert = useSessionStore((state) => state.addAlert);
   const updateQuestionStatus = useSessionStore((state) => state.updateQuestionStatus);
   const setSuggestedReply = useSessionStore((state) => state.setSuggestedReply);
+  const streamSuggestedReply = useSessionStore((state) => state.streamSuggestedReply);
+  const hydrate = useSessionStore((state) => state.hydrate);
   const reset = useSessionStore((state) => state.reset);
   const status = useSessionStore((state) => state.status);
 
@@ -50,10 +74,25 @@ export default function SessionPage() {
           speaker,
           text,
           timestamp: formatTimestamp(event.payload, event.ts_created),
+          isFinal: event.payload.is_final !== false,
+          serverSeq: event.server_seq,
+        });
+      }
+
+      if (event.type === "server.transcript_interim") {
+        setInterim({
+          speaker: String(event.payload.speaker ?? "unknown"),
+          text: String(event.payload.text ?? ""),
+          timestamp: formatTimestamp(event.payload, event.ts_created),
           isFinal: false,
         });
       }
 
+      // A later segment completed a PII entity this one only started.
+      if (event.type === "server.redaction_correction") {
+        correctSegment(Number(event.payload.target_server_seq), String(event.payload.text ?? ""));
+      }
+
       if (event.type === "client.transcript_final" || event.type === "server.transcript_final") {
         setStatus("processing");
         setFullTranscript(String(event.payload.text ?? ""));
@@ -61,20 +100,7 @@ export default function SessionPage() {
       }
 
       if (event.type === "server.rule_alert") {
-        addAlert({
-          ruleId: String(event.payload.rule_id ?? "unknown_rule"),
-          kind: String(event.payload.kind ?? "rule_alert"),
-          severity: String(event.payload.severity ?? "info") as
-            | "info"
-            | "warning"
-            | "high"
-            | "critical",
-          message: String(event.payload.message ?? "Rule alert triggered"),
-          matchedPattern:
-            event.payload.matched_pattern !== undefined
-              ? String(event.payload.matched_pattern)
-              : undefined,
-        });
+        addAlert(toRuleAlert(event.payload));
       }
 
       if (event.type === "server.required_question_status") {
@@ -85,13 +111,51 @@ export default function SessionPage() {
         );
       }
 
+      // The suggested reply so far, while the guidance update is generated.
+      if (event.type === "server.guidance_delta") {
+        streamSuggestedReply(
+          String(event.payload.guidance_id ?? ""),
+          String(event.payload.suggested_reply ?? "")
+        );
+      }
+
       if (event.type === "server.guidance_update") {
         setSuggestedReply({
+          id: event.event_id,
           text: String(event.payload.suggested_reply ?? ""),
           rationale: String(event.payload.rationale ?? ""),
           confidence: Number(event.payload.confidence ?? 0),
         });
       }
+
+      if (event.type === "system.resync") {
+        const snapshot = event.payload as {
+          transcript?: Record<string, unknown>[];
+          alerts?: Record<string, unknown>[];
+          required_questions?: Record<string, unknown>[];
+          guidance?: Record<string, unknown> | null;
+        };
+        hydrate({
+          transcript: (snapshot.transcript ?? [])
+            .filter((entry) => entry.type === "client.transcript_segment")
+            .map((entry) => ({
+              speaker: String(entry.speaker ?? "unknown"),
+              text: String(entry.text ?? ""),
+              timestamp: formatTimestamp(entry, event.ts_created),
+              isFinal: true,
+              serverSeq: typeof entry.server_seq === "number" ? entry.server_seq : null,
+            })),
+          alerts: (snapshot.alerts ?? []).map(toRuleAlert).reverse(),
+          requiredQuestions: (snapshot.required_questions ?? []).map(toRequiredQuestion),
+          suggestedReply: snapshot.guidance
+            ? {
+                text: String(snapshot.guidance.suggested_reply ?? ""),
+                rationale: String(snapshot.guidance.rationale ?? ""),
+                confidence: Number(snapshot.guidance.confidence ?? 0),
+              }
+            : null,
+        });
+      }
     };
 
     const init = async () => {
@@ -124,11 +188,15 @@ export default function SessionPage() {
     sessionId,
     addAlert,
     addSegment,
+    correctSegment,
+    hydrate,
     reset,
     setFullTranscript,
+    setInterim,
     setSessionId,
     setStatus,
     setSuggestedReply,
+    streamSuggestedReply,
     updateQuestionStatus,
   ]);
 
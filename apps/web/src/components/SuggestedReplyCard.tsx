@@ -8,6 +8,8 @@ export default function SuggestedReplyCard() {
 
   const animationKey = useMemo(() => {
     if (!suggestedReply) return "empty";
+    // A streamed reply fades in once, not on every delta or its final update.
+    if (suggestedReply.id) return suggestedReply.id;
     return `${suggestedReply.text}-${suggestedReply.rationale}-${suggestedReply.confidence}`;
   }, [suggestedReply]);
 
@@ -15,7 +17,9 @@ export default function SuggestedReplyCard() {
     return null;
   }
 
-  const confidencePercent = `${Math.round(suggestedReply.confidence * 100)}% confidence`;
+  const confidencePercent = suggestedReply.streaming
+    ? "Generating…"
+    : `${Math.round(suggestedReply.confidence * 100)}% confidence`;
 
   return (
     <section
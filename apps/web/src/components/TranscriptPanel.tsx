@@ -5,12 +5,14 @@ import { useSessionStore } from "@/stores/sessionStore";
 
 export default function TranscriptPanel() {
   const transcript = useSessionStore((state) => state.transcript);
+  const interim = useSessionStore((state) => state.interim);
+  const segments = [...transcript, ...Object.values(interim)];
   const scrollRef = useRef<HTMLDivElement>(null);
 
   useEffect(() => {
     if (!scrollRef.current) return;
     scrollRef.current.scrollTop = scrollRef.current.scrollHeight;
-  }, [transcript]);
+  }, [transcript, interim]);
 
   return (
     <div className="flex h-full flex-col rounded-lg border border-slate-800 bg-slate-900">
@@ -20,10 +22,10 @@ export default function TranscriptPanel() {
         </h2>
       </div>
       <div ref={scrollRef} className="flex-1 space-y-3 overflow-y-auto p-4">
-        {transcript.length === 0 ? (
+        {segments.length === 0 ? (
           <p className="text-sm text-slate-400">Waiting for transcript events...</p>
         ) : (
-          transcript.map((segment, index) => {
+          segments.map((segment, index) => {
             const isCsr = segment.speaker.toLowerCase() === "csr";
             return (
               <div key={`${segment.timestamp}-${index}`} className={isCsr ? "text-right" : "text-left"}>
@@ -37,7 +39,15 @@ export default function TranscriptPanel() {
                   <p className="text-xs font-semibold uppercase tracking-wide text-slate-300">
                     {segment.speaker}
                   </p>
-                  <p className="mt-1 text-sm leading-relaxed">{segment.text}</p>
+                  <p
+                    className={
+                      segment.isFinal
+                        ? "mt-1 text-sm leading-relaxed"
+                        : "mt-1 text-sm italic leading-relaxed text-slate-300"
+                    }
+                  >
+                    {segment.text}
+                  </p>
                   <p className="mt-2 text-[11px] text-slate-400">{segment.timestamp}</p>
                 </div>
               </div>
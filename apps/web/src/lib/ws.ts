@@ -7,7 +7,10 @@ export interface ServerEvent {
     | "server.transcript_final"
     | "client.resume"
     | "server.ack"
+    | "server.transcript_interim"
+    | "server.redaction_correction"
     | "server.rule_alert"
+    | "server.guidance_delta"
     | "server.guidance_update"
     | "server.required_question_status"
     | "system.ping"
@@ -57,6 +60,13 @@ export class SessionWebSocket {
           return;
         }
 
+        // Acks can arrive before the broadcast of the same server_seq, so they
+        // must not advance the resume cursor.
+        if (event.type === "server.ack") {
+          this.onEvent(event);
+          return;
+        }
+
         if (event.server_seq && event.server_seq <= this.lastServerSeq) {
           return;
         }
@@ -5,6 +5,7 @@ export interface TranscriptSegment {
   text: string;
   timestamp: string;
   isFinal: boolean;
+  serverSeq?: number | null;
 }
 
 export interface RuleAlert {
@@ -22,15 +23,21 @@ export interface RequiredQuestion {
 }
 
 export interface SuggestedReply {
+  // event_id of the guidance update; its deltas carry the same id.
+  id?: string;
   text: string;
   rationale: string;
   confidence: number;
+  // Still being generated: only the text so far is known.
+  streaming?: boolean;
 }
 
 interface SessionState {
   sessionId: string | null;
   status: "idle" | "active" | "processing" | "completed" | "ended";
   transcript: TranscriptSegment[];
+  // Latest in-progress (not yet final) segment per speaker.
+  interim: Record<string, TranscriptSegment>;
   fullTranscript: string | null;
   alerts: RuleAlert[];
   requiredQuestions: RequiredQuestion[];
@@ -38,10 +45,16 @@ interface SessionState {
   setSessionId: (id: string) => void;
   setStatus: (status: SessionState["status"]) => void;
   addSegment: (segment: TranscriptSegment) => void;
+  setInterim: (segment: TranscriptSegment) => void;
+  correctSegment: (serverSeq: number, text: string) => void;
   setFullTranscript: (text: string) => void;
   addAlert: (alert: RuleAlert) => void;
   updateQuestionStatus: (ruleId: string, satisfied: boolean, label?: string) => void;
   setSuggestedReply: (reply: SuggestedReply) => void;
+  streamSuggestedReply: (id: string, text: string) => void;
+  hydrate: (
+    snapshot: Pick<SessionState, "transcript" | "alerts" | "requiredQuestions" | "suggestedReply">
+  ) => void;
   reset: () => void;
 }
 
@@ -49,6 +62,7 @@ export const useSessionStore = create<SessionState>((set) => ({
   sessionId: null,
   status: "idle",
   transcript: [],
+  interim: {},
   fullTranscript: null,
   alerts: [],
   requiredQuestions: [],
@@ -56,7 +70,19 @@ export const useSessionStore = create<SessionState>((set) => ({
   setSessionId: (id) => set({ sessionId: id }),
   setStatus: (status) => set({ status }),
   addSegment: (segment) =>
-    set((state) => ({ transcript: [...state.transcript, segment] })),
+    set((state) => {
+      const interim = { ...state.interim };
+      delete interim[segment.speaker];
+      return { transcript: [...state.transcript, segment], interim };
+    }),
+  setInterim: (segment) =>
+    set((state) => ({ interim: { ...state.interim, [segment.speaker]: segment } })),
+  correctSegment: (serverSeq, text) =>
+    set((state) => ({
+      transcript: state.transcript.map((segment) =>
+        segment.serverSeq === serverSeq ? { ...segment, text } : segment
+      ),
+    })),
   setFullTranscript: (text) => set({ fullTranscript: text }),
   addAlert: (alert) =>
     set((state) => {
@@ -89,11 +115,21 @@ export const useSessionStore = create<SessionState>((set) => ({
       };
     }),
   setSuggestedReply: (reply) => set({ suggestedReply: reply }),
+  streamSuggestedReply: (id, text) =>
+    set((state) => {
+      // A delta that arrives after its final update must not undo it.
+      if (state.suggestedReply?.id === id && !state.suggestedReply.streaming) {
+        return state;
+      }
+      return { suggestedReply: { id, text, rationale: "", confidence: 0, streaming: true } };
+    }),
+  hydrate: (snapshot) => set({ ...snapshot, interim: {} }),
   reset: () =>
     set({
       sessionId: null,
       status: "idle",
       transcript: [],
+      interim: {},
       fullTranscript: null,
       alerts: [],
       requiredQuestions: [],
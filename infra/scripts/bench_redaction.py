@@ -0,0 +1,82 @@
+"""
+Benchmark redacting each transcript event once versus once per consumer.
+
+The old path redacted the payload for persistence, again for the outbound
+fanout, and a rule that wanted redacted text would have needed a third pass.
+Now one ``redact_dict`` result is persisted, broadcast, buffered and handed to
+the rule engine as its redacted text.
+
+Run from apps/api:  python ../../infra/scripts/bench_redaction.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from app.services.pii_service import PIIService
+
+SEGMENTS = [
+    "Hi, my AC stopped working last night and it's really hot in here.",
+    "How much is this going to cost me? Is there a price for the visit?",
+    "Sure, call me back on 555-123-4567 or email jane.doe@example.com.",
+    "My address is on Maple Street, and I have two dogs and a cat.",
+    "I want to cancel the annual plan, it's too expensive for me right now.",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark per-event PII redaction passes.")
+    parser.add_argument("--iterations", type=int, default=50_000, help="Events per measurement")
+    return parser.parse_args()
+
+
+def payload(index: int) -> dict:
+    return {
+        "speaker": "customer",
+        "text": SEGMENTS[index % len(SEGMENTS)],
+        "timestamp_ms": index * 1000,
+        "is_final": True,
+    }
+
+
+def per_consumer(pii: PIIService, event: dict) -> tuple[dict, dict, str]:
+    stored = pii.redact_dict(event)
+    outbound = pii.redact_dict(event)
+    rule_text = pii.redact(str(event.get("text", "")))
+    return stored, outbound, rule_text
+
+
+def once(pii: PIIService, event: dict) -> tuple[dict, dict, str]:
+    redacted = pii.redact_dict(event)
+    return redacted, redacted, str(redacted.get("text", ""))
+
+
+def measure(fn, pii: PIIService, events: list[dict]) -> float:
+    started = time.perf_counter()
+    for event in events:
+        fn(pii, event)
+    return (time.perf_counter() - started) / len(events) * 1_000_000
+
+
+def main() -> None:
+    args = parse_args()
+    pii = PIIService()
+    events = [payload(index) for index in range(args.iterations)]
+
+    for event in events[: len(SEGMENTS)]:
+        if per_consumer(pii, event) != once(pii, event):
+            raise AssertionError(f"Single pass disagrees on: {event['text']}")
+
+    per_consumer_us = measure(per_consumer, pii, events)
+    once_us = measure(once, pii, events)
+    print(f"{'strategy':>14} {'us/event':>10}")
+    print(f"{'per consumer':>14} {per_consumer_us:>10.2f}")
+    print(f"{'once':>14} {once_us:>10.2f}")
+    print(f"speedup: {per_consumer_us / once_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
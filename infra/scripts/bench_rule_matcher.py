@@ -0,0 +1,104 @@
+"""
+Benchmark the single-pass RuleMatcher against per-rule, per-pattern re.search.
+
+Run from apps/api:  python ../../infra/scripts/bench_rule_matcher.py
+"""
+
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from app.services.rule_matcher import CompiledRule, RuleMatcher
+
+SEGMENTS = [
+    "Hi, my AC stopped working last night and it's really hot in here.",
+    "How much is this going to cost me? Is there a price for the visit?",
+    "Can you guarantee someone will be there today? CoolBreeze said they could.",
+    "My address is on Maple Street, and I have two dogs and a cat.",
+    "I want to cancel the annual plan, it's too expensive for me right now.",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark rule matching strategies.")
+    parser.add_argument(
+        "--sizes",
+        default="10,100,1000,10000",
+        help="Comma-separated total pattern counts to benchmark",
+    )
+    parser.add_argument(
+        "--regex-ratio",
+        type=float,
+        default=0.05,
+        help="Fraction of patterns that are regexes rather than literals",
+    )
+    parser.add_argument("--iterations", type=int, default=200, help="Segments per measurement")
+    return parser.parse_args()
+
+
+def build_rules(pattern_count: int, regex_ratio: float, rng: random.Random) -> list[CompiledRule]:
+    patterns: list[str] = []
+    for index in range(pattern_count):
+        if rng.random() < regex_ratio:
+            patterns.append(f"{_word(rng)}.*{_word(rng)}")
+        elif index % 50 == 0:
+            patterns.append(rng.choice(["price", "cost", "cancel", "CoolBreeze", "address"]))
+        else:
+            patterns.append(f"{_word(rng)} {_word(rng)}")
+
+    rules: list[CompiledRule] = []
+    for start in range(0, len(patterns), 5):
+        chunk = patterns[start : start + 5]
+        compiled = [(pattern, re.compile(pattern, re.IGNORECASE)) for pattern in chunk]
+        rules.append(CompiledRule(f"rule_{start // 5}", "keyword_alert", {}, compiled))
+    return rules
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+
+
+def naive_match(rules: list[CompiledRule], text: str) -> list[tuple[str, str]]:
+    matches = []
+    for rule in rules:
+        for source, compiled in rule.patterns:
+            if compiled.search(text):
+                matches.append((rule.rule_id, source))
+                break
+    return matches
+
+
+def measure(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for index in range(iterations):
+        fn(SEGMENTS[index % len(SEGMENTS)])
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(42)
+    print(f"{'patterns':>9} {'naive us/seg':>14} {'matcher us/seg':>15} {'speedup':>8}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        rules = build_rules(size, args.regex_ratio, rng)
+        matcher = RuleMatcher(rules)
+
+        for segment in SEGMENTS:
+            expected = naive_match(rules, segment)
+            actual = [(rule.rule_id, source) for rule, source in matcher.match(segment)]
+            if actual != expected:
+                raise AssertionError(f"Matcher disagrees with naive search on: {segment}")
+
+        naive_us = measure(lambda text, rules=rules: naive_match(rules, text), args.iterations)
+        matcher_us = measure(matcher.match, args.iterations)
+        print(f"{size:>9} {naive_us:>14.1f} {matcher_us:>15.1f} {naive_us / matcher_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
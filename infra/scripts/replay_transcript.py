@@ -9,6 +9,8 @@ import websockets
 
 ACK_TIMEOUT_SECONDS = 8.0
 MAX_ACK_RETRIES = 5
+# The API's ws_batch_max_events default; larger batches are rejected unprocessed.
+SERVER_BATCH_MAX_EVENTS = 200
 
 
 def parse_args() -> argparse.Namespace:
@@ -36,6 +38,15 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Disable inter-segment pacing and send transcript as fast as ACKs allow",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help=(
+            "Send segments as client.batch frames of up to N events (1 = one frame each, "
+            f"at most {SERVER_BATCH_MAX_EVENTS})"
+        ),
+    )
     return parser.parse_args()
 
 
@@ -68,6 +79,18 @@ def build_segment_event(
     }
 
 
+def build_batch_event(session_id: uuid.UUID, client_seq: int, events: list[dict]) -> dict:
+    return {
+        "event_id": str(uuid.uuid4()),
+        "session_id": str(session_id),
+        "type": "client.batch",
+        "ts_created": datetime.now(UTC).isoformat(),
+        "schema_version": "1.0",
+        "events": events,
+        "client_seq": client_seq,
+    }
+
+
 async def wait_for_ack(ws, expected_event_id: str, timeout_seconds: float) -> dict:
     while True:
         raw = await asyncio.wait_for(ws.recv(), timeout=timeout_seconds)
@@ -143,9 +166,18 @@ async def replay(
     simulate_resume: bool,
     speed: float,
     no_wait: bool,
+    batch_size: int = 1,
 ) -> None:
     if speed <= 0:
         raise ValueError("--speed must be > 0")
+    if batch_size < 1:
+        raise ValueError("--batch-size must be >= 1")
+    if batch_size > SERVER_BATCH_MAX_EVENTS:
+        print(
+            f"--batch-size {batch_size} is above the server limit; "
+            f"using {SERVER_BATCH_MAX_EVENTS}"
+        )
+        batch_size = SERVER_BATCH_MAX_EVENTS
 
     data = json.loads(transcript_file.read_text(encoding="utf-8"))
     segments = data.get("segments", [])
@@ -180,6 +212,12 @@ async def replay(
             try:
                 await ws.send(json.dumps(event))
                 ack = await wait_for_ack(ws, event["event_id"], ACK_TIMEOUT_SECONDS)
+                payload = ack.get("payload") or {}
+                if payload.get("acknowledged") is False:
+                    # A rejection is final; resending the same frame cannot succeed.
+                    raise RuntimeError(
+                        f"Server rejected event_id={event['event_id']}: {payload.get('error')}"
+                    )
                 ack_server_seq = ack.get("server_seq")
                 if isinstance(ack_server_seq, int):
                     last_server_seq = ack_server_seq
@@ -234,6 +272,7 @@ async def replay(
             )
             return base_delay / speed, reason
 
+        pending: list[dict] = []
         for index in range(start_index, end_index + 1):
             delay_seconds, delay_reason = _delay_for_segment(index)
             if delay_seconds > 0:
@@ -252,16 +291,38 @@ async def replay(
                 event_index=index,
                 deterministic=deterministic,
             )
-            print(f"Sent segment {index} with event_id={event['event_id']}")
+            client_seq += 1
+            pending.append(event)
+            if len(pending) < batch_size and index < end_index:
+                continue
+
+            if len(pending) == 1:
+                frame = pending[0]
+                print(f"Sent segment {index} with event_id={frame['event_id']}")
+            else:
+                frame = build_batch_event(session_id, client_seq, pending)
+                client_seq += 1
+                print(
+                    f"Sent batch of {len(pending)} segments ending at {index} "
+                    f"with event_id={frame['event_id']}"
+                )
+            pending = []
 
-            ack, _, ws = await send_event_with_ack(ws, event)
-            print(
-                "Received ACK "
-                f"event_id={ack.get('event_id')} server_seq={ack.get('server_seq')}"
-            )
+            ack, _, ws = await send_event_with_ack(ws, frame)
+            payload = ack.get("payload") or {}
+            if "first_server_seq" in payload:
+                print(
+                    "Received ACK "
+                    f"event_id={ack.get('event_id')} server_seq="
+                    f"{payload['first_server_seq']}..{payload['last_server_seq']}"
+                )
+            else:
+                print(
+                    "Received ACK "
+                    f"event_id={ack.get('event_id')} server_seq={ack.get('server_seq')}"
+                )
             elapsed = asyncio.get_running_loop().time() - replay_start
             print(f"Replay elapsed: {elapsed:.2f}s after segment {index}")
-            client_seq += 1
         return client_seq, last_server_seq
 
     if simulate_resume and segments:
@@ -339,6 +400,7 @@ def main() -> None:
             args.simulate_resume,
             args.speed,
             args.no_wait,
+            args.batch_size,
         )
     )
 
@@ -132,6 +132,9 @@ async def seed_rules() -> None:
                 )
                 seeded_count += 1
 
+        if seeded_count and existing_rules:
+            # Running API processes cache compiled rule packs per ruleset version.
+            ruleset.version += 1
         await db.commit()
         print(f"Seeded {seeded_count} rules successfully")
 
@@ -0,0 +1,124 @@
+"""
+Soak the connection registry with connect/disconnect churn and check memory stays flat.
+
+Drives the real register/fanout/deregister/release path with in-memory
+WebSockets (no server, no database) and compares tracemalloc and RSS after a
+warm-up against the end of the run.
+
+Run from apps/api:  python ../../infra/scripts/soak_connections.py
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tracemalloc
+import uuid
+from datetime import UTC, datetime
+
+sys.path.append(os.getcwd())
+
+from app.config import settings
+from app.schemas.events import EventEnvelope
+from app.services import websocket_service
+from app.services.connection_registry import SessionEntry
+from app.services.replay_buffer import ReplayBuffer
+from app.services.rule_service import SessionRuleState
+from app.services.sequence_service import _allocators
+from app.services.session_snapshot import SessionSnapshot
+
+
+class NullWebSocket:
+    async def send_text(self, frame: str) -> None:
+        pass
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        pass
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Connection churn memory soak.")
+    parser.add_argument("--cycles", type=int, default=100_000, help="Connect/disconnect cycles")
+    parser.add_argument("--warmup", type=int, default=10_000, help="Cycles before the baseline")
+    parser.add_argument(
+        "--sessions", type=int, default=50, help="Concurrent sessions the cycles rotate over"
+    )
+    parser.add_argument(
+        "--max-growth-kb",
+        type=int,
+        default=512,
+        help="Allowed tracemalloc / RSS growth after warm-up",
+    )
+    return parser.parse_args()
+
+
+def rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def churn(cycle: int, session_ids: list[uuid.UUID]) -> None:
+    # Alternate between long-lived sessions and one-off sessions that get released.
+    session_id = session_ids[cycle % len(session_ids)] if cycle % 2 else uuid.uuid4()
+    entry = websocket_service.registry.get(session_id) or SessionEntry(
+        SessionRuleState(),
+        ReplayBuffer(0, settings.replay_buffer_max_events, settings.replay_buffer_max_bytes),
+        SessionSnapshot(),
+    )
+    websocket = NullWebSocket()
+    websocket_service.register_connection(session_id, entry, websocket)
+    websocket_service._fanout(
+        session_id,
+        EventEnvelope(
+            session_id=session_id,
+            type="system.ping",
+            ts_created=datetime.now(UTC),
+            payload={},
+        ),
+    )
+    await asyncio.sleep(0)
+    websocket_service._deregister(session_id, websocket)
+    await asyncio.sleep(0)
+
+
+async def main() -> None:
+    args = parse_args()
+    settings.session_state_linger_seconds = 0
+    registry = websocket_service.registry
+    session_ids = [uuid.uuid4() for _ in range(args.sessions)]
+
+    for cycle in range(args.warmup):
+        await churn(cycle, session_ids)
+    await asyncio.sleep(0.05)
+
+    tracemalloc.start()
+    traced_before, _ = tracemalloc.get_traced_memory()
+    rss_before = rss_kb()
+    for cycle in range(args.warmup, args.warmup + args.cycles):
+        await churn(cycle, session_ids)
+    await asyncio.sleep(0.05)
+    traced_after, traced_peak = tracemalloc.get_traced_memory()
+    rss_after = rss_kb()
+
+    traced_growth_kb = (traced_after - traced_before) // 1024
+    rss_growth_kb = rss_after - rss_before
+    print(f"cycles:            {args.cycles}")
+    print(f"tracemalloc delta: {traced_growth_kb} KiB (peak {traced_peak // 1024} KiB)")
+    print(f"rss delta:         {rss_growth_kb} KiB")
+    print(f"sessions held:     {len(registry)}  connections: {registry.connection_count}")
+    print(f"heartbeat entries: {len(websocket_service.heartbeats)}  allocators: {len(_allocators)}")
+
+    assert registry.connection_count == 0
+    assert len(websocket_service.heartbeats) == 0
+    assert len(registry) == 0
+    assert traced_growth_kb < args.max_growth_kb, "tracemalloc grew during churn"
+    assert rss_growth_kb < args.max_growth_kb, "RSS grew during churn"
+    print("OK: memory is flat under churn")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,7 +6,7 @@ import uuid
 sys.path.append(os.getcwd())
 
 from app.models.call_session import CallSession
-from app.services.rule_service import RuleService
+from app.services.rule_service import RuleService, rule_scope
 
 
 async def verify_engine():
@@ -21,7 +21,9 @@ async def verify_engine():
     test_text = "I can guarantee we will have someone there today."
     print(f"2. Analyzing text: {test_text}")
 
-    events = await service.evaluate_segment(mock_session, test_text)
+    events = await service.evaluate_segment(
+        mock_session.id, rule_scope(mock_session), test_text
+    )
 
     print(f"\n--- Result: {len(events)} Rule Violations Found ---")
     for event in events: